@@ -0,0 +1,123 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from utils.auto_walk import AutoWalkMachine, WalkEvent, WalkState
+
+
+PERCENTILES = (50, 90, 99)
+
+
+# Walks, clicks and engages on a fixed script, and notes when each timed
+# transition was due and when it happened
+class ScriptedActions:
+    def __init__(self, walk_duration, engage_after):
+        self.walk_duration = walk_duration
+        self.engage_after = engage_after
+        self.machine = None
+        self.lateness = []
+        self._due = None
+
+    def is_selling(self):
+        return False
+
+    def state_changed(self, state):
+        now = time.perf_counter()
+        if state == WalkState.WAIT_FOR_TARGET and self._due is not None:
+            self.lateness.append(now - self._due)
+            self._due = None
+            # The target shows up a little after the start click, then goes away
+            threading.Timer(self.engage_after, self.machine.post, (WalkEvent.ENGAGED,)).start()
+            threading.Timer(self.engage_after * 2, self.machine.post, (WalkEvent.DISENGAGED,)).start()
+
+    def next_walk_step(self):
+        self._due = time.perf_counter() + self.walk_duration
+        return "w", self.walk_duration, True
+
+    def start_walk(self, direction):
+        self.machine.post(WalkEvent.WALK_DONE)
+
+    def start_click(self, delay):
+        return True
+
+    def max_wait_time(self):
+        return 1.0
+
+    def advance_pattern(self):
+        pass
+
+    def dig_completed(self):
+        return False
+
+    def start_sell(self):
+        return None
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def check_first_step():
+    # The first walk step is armed by reset() before the driver's first scan
+    # of the timer wheel; it must still fire once its tick has passed
+    clock = FakeClock(0.004)
+    actions = ScriptedActions(walk_duration=0.1, engage_after=0.05)
+    machine = AutoWalkMachine(actions, clock=clock)
+    actions.machine = machine
+    machine.active = True
+    machine.reset()
+    clock.now = 0.006
+    machine.step()
+    return machine.state != WalkState.MOVE
+
+
+def run(mode, steps, fps, walk_duration, engage_after):
+    actions = ScriptedActions(walk_duration, engage_after)
+    machine = AutoWalkMachine(actions, dig_disengage_delay=engage_after)
+    actions.machine = machine
+    if mode == "driver thread":
+        machine.set_active(True)
+        while len(actions.lateness) < steps:
+            time.sleep(0.01)
+        machine.set_active(False)
+    else:
+        # What the frame loop did before: transitions only checked per frame
+        machine.active = True
+        machine.reset()
+        frame_interval = 1.0 / fps
+        next_frame = time.perf_counter()
+        while len(actions.lateness) < steps:
+            machine.step()
+            next_frame += frame_interval
+            time.sleep(max(next_frame - time.perf_counter(), 0.0))
+    return np.array(actions.lateness[:steps]) * 1000.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure how late the auto-walk start click fires after the walk step ends, driven per frame and by the state machine's own thread."
+    )
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate of the per-frame loop")
+    parser.add_argument("--walk-duration", type=float, default=0.1, help="Seconds per walk step")
+    parser.add_argument("--engage-after", type=float, default=0.05, help="Seconds from click to engagement")
+    args = parser.parse_args(argv)
+
+    if not check_first_step():
+        raise SystemExit("First walk step did not fire on the fake clock")
+
+    print(f"{args.steps} walk steps of {args.walk_duration * 1000:.0f} ms")
+    for mode in (f"per frame @ {args.fps:g} fps", "driver thread"):
+        lateness = run(mode, args.steps, args.fps, args.walk_duration, args.engage_after)
+        values = "  ".join(f"p{p} {np.percentile(lateness, p):6.2f}" for p in PERCENTILES)
+        print(f"  {mode:<20} late by ms: {values}  max {lateness.max():6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from utils.click_scheduler import ClickScheduler
+
+
+DELAYS_MS = (1, 3, 8, 15, 30, 60)
+
+
+# The path delayed clicks took before the scheduler: a new thread per click
+# that sleeps for the whole delay and then fires
+def thread_per_click_errors(count):
+    errors = []
+    done = threading.Event()
+    for index in range(count):
+        delay = DELAYS_MS[index % len(DELAYS_MS)] / 1000.0
+        deadline = time.perf_counter() + delay
+
+        def fire():
+            time.sleep(delay)
+            errors.append(time.perf_counter() - deadline)
+            done.set()
+
+        done.clear()
+        threading.Thread(target=fire).start()
+        done.wait(1.0)
+    return errors
+
+
+def scheduler_errors(count):
+    scheduler = ClickScheduler(error_history=count)
+    done = threading.Event()
+    try:
+        for index in range(count):
+            done.clear()
+            scheduler.schedule(DELAYS_MS[index % len(DELAYS_MS)] / 1000.0, done.set)
+            done.wait(1.0)
+    finally:
+        scheduler.stop()
+    return list(scheduler.fire_errors)
+
+
+def print_row(label, errors):
+    values = np.asarray(errors) * 1000.0
+    print(
+        f"  {label:<18}{np.percentile(values, 50):>9.3f}{np.percentile(values, 90):>9.3f}"
+        f"{np.percentile(values, 99):>9.3f}{values.max():>9.3f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare click fire-time error of ClickScheduler against a thread per click."
+    )
+    parser.add_argument("--clicks", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    print(f"  {'fire error (ms)':<18}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    print_row("thread per click", thread_per_click_errors(args.clicks))
+    print_row("click scheduler", scheduler_errors(args.clicks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+import requests
+
+from benchmarks.mock_webhook import MockWebhookServer
+from utils.discord_delivery import (
+    PRIORITY_ALERT,
+    PRIORITY_LIVE_STATS,
+    PRIORITY_NOTIFICATION,
+    SUCCESS_STATUS_CODES,
+    DiscordDeliveryWorker,
+)
+
+
+PRIORITY_NAMES = {
+    PRIORITY_ALERT: "alert",
+    PRIORITY_NOTIFICATION: "notification",
+    PRIORITY_LIVE_STATS: "live stats",
+}
+
+
+# Live-stats edits are queued first, then notifications, then an alert, so the
+# outbox has to reorder them
+def build_workload(count):
+    stats_count = count // 2
+    workload = [(PRIORITY_LIVE_STATS, "PATCH") for _ in range(stats_count)]
+    workload += [(PRIORITY_NOTIFICATION, "POST") for _ in range(count - stats_count - 1)]
+    workload.append((PRIORITY_ALERT, "POST"))
+    return workload
+
+
+def request_url(webhook_url, method):
+    return f"{webhook_url}/messages/1000" if method == "PATCH" else webhook_url
+
+
+# The path notifications took before the worker: a thread per message and a
+# fresh connection per request, with no rate-limit handling
+def run_thread_per_request(server, workload):
+    results = [None] * len(workload)
+    threads = []
+    start = time.perf_counter()
+    for index, (priority, method) in enumerate(workload):
+        payload = {"content": f"{index}", "priority": priority}
+
+        def send(index=index, method=method, payload=payload):
+            try:
+                response = requests.request(
+                    method, request_url(server.webhook_url, method), json=payload, timeout=10
+                )
+                ok = response.status_code in SUCCESS_STATUS_CODES
+            except requests.RequestException:
+                ok = False
+            results[index] = (ok, time.perf_counter() - start)
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start, None
+
+
+def run_worker(server, workload, backoff_base):
+    worker = DiscordDeliveryWorker(backoff_base=backoff_base)
+    results = [None] * len(workload)
+    start = time.perf_counter()
+
+    def send(index, method, payload):
+        response = worker.request(method, request_url(server.webhook_url, method), json=payload)
+        ok = response is not None and response.status_code in SUCCESS_STATUS_CODES
+        results[index] = (ok, time.perf_counter() - start)
+
+    # Hold the worker until the whole burst is queued, as a backlog would be
+    gate = threading.Event()
+    worker.submit(gate.wait, priority=-1)
+    jobs = [
+        worker.submit(send, index, method, {"content": f"{index}", "priority": priority}, priority=priority)
+        for index, (priority, method) in enumerate(workload)
+    ]
+    gate.set()
+    for job in jobs:
+        job.wait()
+    elapsed = time.perf_counter() - start
+    stats = worker.get_stats()
+    worker.stop()
+    return results, elapsed, stats
+
+
+def print_row(label, workload, results, elapsed, server_state, connections):
+    delivered = sum(1 for ok, _ in results if ok)
+    print(f"{label}")
+    print(
+        f"  delivered {delivered}/{len(results)} in {elapsed:.2f}s "
+        f"({delivered / elapsed:.1f} msg/s), {connections} connections"
+    )
+    print(
+        f"  server saw {server_state.requests} requests: "
+        f"{server_state.rate_limited} rate limited, {server_state.errors} errors"
+    )
+    for priority, name in PRIORITY_NAMES.items():
+        times = [
+            result[1] * 1000.0
+            for result, (item_priority, _) in zip(results, workload)
+            if item_priority == priority and result[0]
+        ]
+        if times:
+            print(f"  {name:<13} done p50 {np.percentile(times, 50):>8.1f} ms   max {max(times):>8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Deliver a burst of webhook messages to a local mock Discord and compare the delivery worker with a thread per request."
+    )
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--limit", type=int, default=5, help="Mock requests per route per window")
+    parser.add_argument("--window", type=float, default=0.5, help="Mock rate-limit window in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of mock responses that are 502")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Mock server response time")
+    args = parser.parse_args(argv)
+
+    workload = build_workload(max(args.messages, 3))
+    for label, runner in (
+        ("thread per request", lambda server: run_thread_per_request(server, workload)),
+        ("delivery worker", lambda server: run_worker(server, workload, backoff_base=0.05)),
+    ):
+        server = MockWebhookServer(
+            limit=args.limit,
+            window=args.window,
+            error_rate=args.error_rate,
+            latency=args.latency_ms / 1000.0,
+        ).start()
+        try:
+            results, elapsed, stats = runner(server)
+        finally:
+            server.stop()
+        print_row(label, workload, results, elapsed, server.state, server.state.connections)
+        if stats is not None:
+            print(f"  worker retries {stats['retries']}, 429s {stats['rate_limited']}, failed {stats['requests_failed']}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic_clip import RESOLUTIONS, render_frame
+from core.detection import LineGradientBuffers, find_line_position
+from utils.frame_replay import FrameClip
+from utils.screen_capture import gray_conversion_code
+
+
+# The float32 kernel find_line_position used before the integer rewrite, kept
+# verbatim as the reference for timing and for checking identical output
+def find_line_position_float32(
+    gray_array, sensitivity_threshold=50, min_height_ratio=0.7, offset=0
+):
+    height, width = gray_array.shape
+    if width < 3:
+        return -1
+    thresh = sensitivity_threshold * height * 0.2
+    strong_edge_threshold = sensitivity_threshold * 0.5
+    min_pixels = height * min_height_ratio
+    left_right_diff = np.abs(
+        gray_array[:, 2:].astype(np.float32) - gray_array[:, :-2].astype(np.float32)
+    )
+    center_left_diff = np.abs(
+        gray_array[:, 1:-1].astype(np.float32) - gray_array[:, :-2].astype(np.float32)
+    )
+    gradients = left_right_diff + center_left_diff
+    vertical_sum = np.sum(gradients, axis=0)
+    strong_pixel_count = np.sum(gradients > strong_edge_threshold, axis=0)
+    valid_mask = (vertical_sum > thresh) & (strong_pixel_count >= min_pixels)
+    if not np.any(valid_mask):
+        return -1
+    best_idx = np.argmax(vertical_sum * valid_mask)
+    detected_position = best_idx + 1
+    if offset is None:
+        offset = 0.0
+    final_position = detected_position + float(offset)
+    final_position = int(round(final_position))
+    return max(0, min(final_position, width - 1))
+
+
+def load_gray_frames(clip_dir, limit):
+    clip = FrameClip(clip_dir)
+    frames = []
+    for index in range(min(len(clip), limit)):
+        frame = clip.frames[index]
+        frames.append(cv2.cvtColor(frame, gray_conversion_code(frame)))
+    return frames
+
+
+def synthetic_gray_frames(width, height, count, seed=0):
+    rng = np.random.default_rng(seed)
+    zone_w = width // 5
+    frames = []
+    for index in range(count):
+        line_x = 4 + (index * 37) % (width - 8)
+        frame = render_frame(width, height, width // 3, zone_w, line_x, rng)
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    return frames
+
+
+def time_kernel(kernel, frames, repeat):
+    samples = []
+    for _ in range(repeat):
+        for gray in frames:
+            start = time.perf_counter()
+            kernel(gray)
+            samples.append(time.perf_counter() - start)
+    samples = np.asarray(samples) * 1000.0
+    return float(np.percentile(samples, 50)), float(np.percentile(samples, 99))
+
+
+def compare(label, frames, sensitivities, repeat):
+    buffers = LineGradientBuffers()
+    mismatches = 0
+    checks = 0
+    for gray in frames:
+        for sensitivity in sensitivities:
+            for offset in (0, 5, -3):
+                expected = find_line_position_float32(gray, sensitivity, 1.0, offset)
+                actual = find_line_position(
+                    gray, sensitivity, 1.0, offset, buffers=buffers
+                )
+                checks += 1
+                mismatches += expected != actual
+
+    sensitivity = sensitivities[0]
+    old_p50, old_p99 = time_kernel(
+        lambda gray: find_line_position_float32(gray, sensitivity, 1.0, 5),
+        frames,
+        repeat,
+    )
+    new_p50, new_p99 = time_kernel(
+        lambda gray: find_line_position(gray, sensitivity, 1.0, 5, buffers=buffers),
+        frames,
+        repeat,
+    )
+    height, width = frames[0].shape
+    speedup = old_p50 / new_p50 if new_p50 > 0 else 0.0
+    print(
+        f"  {label:<8}{width:>5}x{height:<5}"
+        f"{old_p50:>9.3f}{old_p99:>9.3f}{new_p50:>9.3f}{new_p99:>9.3f}"
+        f"{speedup:>8.1f}x   {checks - mismatches}/{checks}"
+    )
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare the float32 and integer find_line_position kernels."
+    )
+    parser.add_argument(
+        "clips",
+        nargs="*",
+        help="Recorded clip directories; synthetic 720p/1080p/1440p frames are used if omitted",
+    )
+    parser.add_argument("--frames", type=int, default=120, help="Frames per clip")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    sensitivities = (100, 50, 25, 7)
+    print(
+        f"  {'source':<8}{'size':<11}{'old p50':>9}{'old p99':>9}"
+        f"{'new p50':>9}{'new p99':>9}{'speedup':>9}   identical"
+    )
+    mismatches = 0
+    if args.clips:
+        for clip_dir in args.clips:
+            frames = load_gray_frames(clip_dir, args.frames)
+            mismatches += compare("clip", frames, sensitivities, args.repeat)
+    else:
+        for name in ("720p", "1080p", "1440p"):
+            width, height = RESOLUTIONS[name]
+            frames = synthetic_gray_frames(width, height, args.frames)
+            mismatches += compare(name, frames, sensitivities, args.repeat)
+
+    if mismatches:
+        print(f"\n  {mismatches} positions differ from the float32 kernel")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
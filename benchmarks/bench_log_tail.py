@@ -0,0 +1,125 @@
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from utils.log_tail import KeywordMatcher, LogTail
+
+
+KEYWORDS = [
+    ("joining", "[FLog::Output] ! Joining game"),
+    ("joined", "[FLog::Network] serverId:"),
+    ("disconnect", "[FLog::Network] Sending disconnect with reason"),
+    ("leaving", "[DFLog::MegaReplicatorLogDisconnectCleanUpLog] Destroying MegaReplicator."),
+    ("closing", "finished destroying luaApp"),
+]
+DISCONNECT_REGEX = r"Sending disconnect with reason:\s*(\d+)"
+FILLER = [
+    "2024-05-01T12:00:00.000Z,1.000000,1a2b,6 [FLog::Graphics] Frame time {n} ms, present {n}",
+    "2024-05-01T12:00:00.000Z,1.000000,1a2b,6 [DFLog::HttpTraceLight] HttpResponse({n}) time:{n}ms status:200",
+    "2024-05-01T12:00:00.000Z,1.000000,1a2b,6 [FLog::SingleSurfaceApp] Lua memory usage {n} KB",
+]
+
+
+def synthetic_lines(count, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for index in range(count):
+        if rng.random() < 0.001:
+            name, keyword = rng.choice(KEYWORDS)
+            suffix = ": 277" if name == "disconnect" else ""
+            lines.append(f"2024-05-01T12:00:00.000Z,1.0,1a2b,6 {keyword}{suffix}\n")
+        else:
+            lines.append(rng.choice(FILLER).format(n=index) + "\n")
+    return lines
+
+
+# What process_log_file did before the tail reader: reopen per event, read
+# the new lines into a list, five substring checks and a regex per line
+def read_reopen(path, position, counts):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        f.seek(position)
+        new_lines = [line.strip() for line in f]
+        position = f.tell()
+    for line in new_lines:
+        for name, keyword in KEYWORDS:
+            if keyword in line:
+                if name == "disconnect":
+                    re.search(DISCONNECT_REGEX, line)
+                counts[name] = counts.get(name, 0) + 1
+                break
+    return position
+
+
+def read_tail(tail, matcher, counts):
+    for buffer in tail.read_chunks():
+        for name, line in matcher.scan(buffer):
+            if name == "disconnect":
+                re.search(DISCONNECT_REGEX, line)
+            counts[name] = counts.get(name, 0) + 1
+
+
+def run(lines, batch, split_lines):
+    results = {}
+    for label in ("reopen per event", "tail reader"):
+        fd, path = tempfile.mkstemp(suffix="_Player_bench.log")
+        os.close(fd)
+        counts = {}
+        position = 0
+        tail = LogTail(path).open(0)
+        matcher = KeywordMatcher(KEYWORDS)
+        cpu = 0.0
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as writer:
+                for start in range(0, len(lines), batch):
+                    text = "".join(lines[start : start + batch])
+                    if split_lines and len(text) > 1:
+                        # Leave a partial line behind for the next event
+                        cut = len(text) - random.randint(1, min(40, len(text) - 1))
+                        writer.write(text[:cut])
+                        writer.flush()
+                        began = time.process_time()
+                        if label == "tail reader":
+                            read_tail(tail, matcher, counts)
+                        cpu += time.process_time() - began
+                        writer.write(text[cut:])
+                    else:
+                        writer.write(text)
+                    writer.flush()
+                    began = time.process_time()
+                    if label == "tail reader":
+                        read_tail(tail, matcher, counts)
+                    else:
+                        position = read_reopen(path, position, counts)
+                    cpu += time.process_time() - began
+        finally:
+            tail.close()
+            os.remove(path)
+        results[label] = (cpu, counts)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Append a synthetic Roblox player log in batches and compare the tail reader with reopening the file per event."
+    )
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=50, help="Lines written per modified event")
+    parser.add_argument("--split-lines", action="store_true", help="Also fire an event mid-line before each batch completes")
+    args = parser.parse_args(argv)
+
+    lines = synthetic_lines(args.lines)
+    size = sum(len(line) for line in lines)
+    events = (len(lines) + args.batch - 1) // args.batch
+    print(f"{len(lines)} lines, {size / 1e6:.1f} MB, {events} events")
+    results = run(lines, args.batch, args.split_lines)
+    baseline = results["reopen per event"][1]
+    for label, (cpu, counts) in results.items():
+        same = "" if counts == baseline else "  MISMATCH"
+        print(f"  {label:<17} {cpu * 1000:>8.1f} ms CPU  {cpu / events * 1e6:>7.1f} us/event  {sum(counts.values())} events matched{same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.replay import DEFAULT_SYSTEM_LATENCY_MS, build_replay_params, replay_clip
+from core.detection import PREDICTION_METHODS
+from core.pipeline import PIPELINE_STAGES
+from utils.frame_replay import FrameClip
+from utils.telemetry import TelemetryJournal
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs or []:
+        if "=" not in pair:
+            raise ValueError(f"Expected key=value, got: {pair}")
+        key, value = pair.split("=", 1)
+        overrides[key.strip()] = value.strip()
+    return overrides
+
+
+class ReplayStats:
+    def __init__(self):
+        self.stage_samples = {name: [] for name in PIPELINE_STAGES}
+        self.frame_samples = []
+        self.cpu_samples = []
+        self.line_hits = 0
+        self.zone_hits = 0
+        self.tracked_frames = 0
+        self.zone_tracked_frames = 0
+        self.clicks = 0
+        self.predicted_clicks = 0
+        self.click_hits = 0
+        self.rescheduled_clicks = 0
+        self._timeline = []
+
+    def on_frame(self, frame_index, pipeline, frame_time, cpu_time):
+        for name, stage_time in pipeline.stage_times.items():
+            self.stage_samples.setdefault(name, []).append(stage_time)
+        self.frame_samples.append(frame_time)
+        self.cpu_samples.append(cpu_time)
+        frame = pipeline.frame
+        if frame.line_pos != -1:
+            self.line_hits += 1
+        if frame.raw_zone_x is not None:
+            self.zone_hits += 1
+        self._timeline.append((frame.current_time_ms, frame.line_pos))
+
+    # A click counts as a hit when the first frame at or after the moment it
+    # lands (fire time plus system latency) shows the line inside the sweet
+    # spot the click was aimed at
+    def score_clicks(self, clicks, system_latency_ms):
+        if self._timeline:
+            times = np.asarray([entry[0] for entry in self._timeline])
+        for click in clicks:
+            self.clicks += 1
+            if click["prediction_used"]:
+                self.predicted_clicks += 1
+            if not self._timeline:
+                continue
+            landing_ms = click["fire_time_ms"] + system_latency_ms
+            index = int(np.searchsorted(times, landing_ms))
+            if index >= len(self._timeline):
+                continue
+            line_pos = self._timeline[index][1]
+            start, end = click["sweet_spot_start"], click["sweet_spot_end"]
+            if line_pos != -1 and start is not None and start <= line_pos <= end:
+                self.click_hits += 1
+        self._timeline = []
+
+
+def summarize(samples):
+    if not samples:
+        return None
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary["mean"] = float(values.mean())
+    summary["max"] = float(values.max())
+    return summary
+
+
+def format_row(name, summary):
+    columns = [f"p{p}" for p in PERCENTILES] + ["mean", "max"]
+    cells = "".join(f"{summary[column]:>10.3f}" for column in columns)
+    return f"  {name:<12}{cells}"
+
+
+class JournalWriter:
+    def __init__(self, journal):
+        self.journal = journal
+        self.last_time_ms = None
+
+    def on_frame(self, frame_index, pipeline, frame_time, cpu_time):
+        frame = pipeline.frame
+        dig_tool = pipeline.dig_tool
+        # Journal the recorded frame interval, as the live loop does
+        interval = 0.0
+        if self.last_time_ms is not None:
+            interval = (frame.current_time_ms - self.last_time_ms) / 1000.0
+        self.last_time_ms = frame.current_time_ms
+        self.journal.append(
+            frame,
+            interval,
+            pipeline.stage_times,
+            dig_tool.smoothed_zone_x,
+            dig_tool.smoothed_zone_w,
+            dig_tool.running,
+            dig_tool.target_engaged,
+        )
+
+
+def run_benchmark(
+    clip_dir, overrides=None, realtime=False, repeat=1, preload=True, journal_path=None
+):
+    clip = FrameClip(clip_dir, preload=preload)
+    params = build_replay_params(clip, overrides)
+    stats = ReplayStats()
+    on_frame = stats.on_frame
+
+    journal_writer = None
+    if journal_path is not None:
+        system_latency_ms = clip.system_latency_ms
+        if system_latency_ms is None:
+            system_latency_ms = DEFAULT_SYSTEM_LATENCY_MS
+        journal_writer = JournalWriter(
+            TelemetryJournal(
+                journal_path,
+                PIPELINE_STAGES,
+                capacity=len(clip),
+                meta={"system_latency_ms": system_latency_ms, "clip": clip_dir},
+            )
+        )
+
+        def on_frame(frame_index, pipeline, frame_time, cpu_time):
+            stats.on_frame(frame_index, pipeline, frame_time, cpu_time)
+            journal_writer.on_frame(frame_index, pipeline, frame_time, cpu_time)
+
+    wall_start = time.perf_counter()
+    for _ in range(repeat):
+        dig_tool, pipeline = replay_clip(
+            clip, params=params, realtime=realtime, on_frame=on_frame
+        )
+        if journal_writer is not None:
+            # Each pass restarts the replay clock, so only the first is journaled
+            journal_writer.journal.close()
+            journal_writer = None
+            on_frame = stats.on_frame
+        line_stage = pipeline.get_stage("line_detect")
+        stats.tracked_frames += getattr(line_stage, "tracked_frames", 0)
+        zone_stage = pipeline.get_stage("zone_detect")
+        stats.zone_tracked_frames += getattr(zone_stage, "tracked_frames", 0)
+        action_stage = pipeline.get_stage("act")
+        stats.rescheduled_clicks += action_stage.rescheduled_clicks
+        stats.score_clicks(action_stage.clicks, dig_tool.system_latency_ms)
+    wall_time = time.perf_counter() - wall_start
+
+    return clip, stats, wall_time
+
+
+def click_hit_rate(stats):
+    return stats.click_hits / stats.clicks * 100 if stats.clicks else 0.0
+
+
+def print_report(clip, stats, wall_time, repeat):
+    frames = len(stats.frame_samples)
+    height, width = clip.frame_shape[:2]
+    print(f"Clip: {clip.clip_dir}")
+    print(
+        f"  {len(clip)} frames, {width}x{height}, {clip.duration:.2f}s recorded "
+        f"at {clip.recorded_fps:.1f} fps, replayed {repeat}x"
+    )
+    print()
+
+    columns = [f"p{p}" for p in PERCENTILES] + ["mean", "max"]
+    print(f"  {'stage (ms)':<12}" + "".join(f"{column:>10}" for column in columns))
+    for name, samples in stats.stage_samples.items():
+        summary = summarize(samples)
+        if summary is not None:
+            print(format_row(name, summary))
+    frame_summary = summarize(stats.frame_samples)
+    cpu_summary = summarize(stats.cpu_samples)
+    if frame_summary is not None:
+        print(format_row("frame", frame_summary))
+    if cpu_summary is not None:
+        print(format_row("cpu", cpu_summary))
+    print()
+
+    if frames and frame_summary is not None:
+        print(f"  Pipeline fps:   {1000.0 / frame_summary['mean']:.1f}")
+    if wall_time > 0:
+        print(f"  Replay fps:     {frames / wall_time:.1f}")
+    if frames:
+        print(f"  Line hit rate:  {stats.line_hits / frames * 100:.1f}%")
+        print(f"  Zone hit rate:  {stats.zone_hits / frames * 100:.1f}%")
+        print(f"  Line tracked:   {stats.tracked_frames / frames * 100:.1f}%")
+        print(f"  Zone tracked:   {stats.zone_tracked_frames / frames * 100:.1f}%")
+    print(
+        f"  Clicks:         {stats.clicks} ({stats.predicted_clicks} predicted, "
+        f"{stats.rescheduled_clicks} rescheduled)"
+    )
+    if stats.clicks:
+        print(f"  Click hit rate: {click_hit_rate(stats):.1f}%")
+
+
+def print_predictor_comparison(clip_dir, overrides, realtime, repeat, preload):
+    print(f"Clip: {clip_dir}, replayed {repeat}x per predictor")
+    print()
+    print(
+        f"  {'predictor':<12}{'clicks':>8}{'predicted':>11}{'hit rate':>10}"
+        f"{'predict p50':>13}{'predict p99':>13}{'cpu/frame':>11}"
+    )
+    for method in PREDICTION_METHODS:
+        method_overrides = dict(overrides, prediction_method=method)
+        _, stats, _ = run_benchmark(
+            clip_dir,
+            overrides=method_overrides,
+            realtime=realtime,
+            repeat=repeat,
+            preload=preload,
+        )
+        predict = summarize(stats.stage_samples["predict"])
+        cpu = summarize(stats.cpu_samples)
+        print(
+            f"  {method:<12}{stats.clicks:>8}{stats.predicted_clicks:>11}"
+            f"{click_hit_rate(stats):>9.1f}%{predict['p50']:>13.3f}"
+            f"{predict['p99']:>13.3f}{cpu['mean']:>11.3f}"
+        )
+    print()
+    print("  Stage and CPU times in ms per frame")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded clip through the detection pipeline and report per-stage latency."
+    )
+    parser.add_argument("clip", help="Clip directory written by the frame recorder")
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        metavar="KEY=VALUE",
+        help="Override a recorded parameter (repeatable)",
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Pace frames at the recorded timestamps instead of as fast as possible",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the clip N times")
+    parser.add_argument(
+        "--compare-predictors",
+        action="store_true",
+        help="Replay once per prediction_method and compare click hit rate and CPU time",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="PATH",
+        help="Also write the first replay pass to a telemetry journal for benchmarks.telemetry_report",
+    )
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="Read frames from the memory map instead of loading the clip into RAM",
+    )
+    args = parser.parse_args(argv)
+
+    overrides = parse_overrides(args.overrides)
+    repeat = max(args.repeat, 1)
+    if args.compare_predictors:
+        print_predictor_comparison(
+            args.clip, overrides, args.realtime, repeat, not args.no_preload
+        )
+        return
+
+    clip, stats, wall_time = run_benchmark(
+        args.clip,
+        overrides=overrides,
+        realtime=args.realtime,
+        repeat=repeat,
+        preload=not args.no_preload,
+        journal_path=args.journal,
+    )
+    print_report(clip, stats, wall_time, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+WEBHOOK_PATH = re.compile(r"^/api/webhooks/(\d+)/([^/?]+)(?:/messages/(\d+))?$")
+
+
+# Fixed-window limiter per route, reporting the same headers Discord does
+class MockBucket:
+    def __init__(self, name, limit, window):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.window_start = time.monotonic()
+        self.used = 0
+
+    def take(self):
+        now = time.monotonic()
+        if now - self.window_start >= self.window:
+            self.window_start = now
+            self.used = 0
+        reset_after = max(self.window - (now - self.window_start), 0.0)
+        if self.used >= self.limit:
+            return False, 0, reset_after
+        self.used += 1
+        return True, self.limit - self.used, reset_after
+
+
+class MockWebhookState:
+    def __init__(self, limit, window, error_rate, latency):
+        self.limit = limit
+        self.window = window
+        self.error_rate = error_rate
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.message_ids = itertools.count(1000)
+        self.connections = 0
+        self.requests = 0
+        self.accepted = []
+        self.rate_limited = 0
+        self.errors = 0
+
+    def bucket_for(self, method, webhook_id, message_id):
+        # Discord shares one bucket between all messages of a webhook per method
+        key = f"{method}:{webhook_id}:{'message' if message_id else 'execute'}"
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = MockBucket(f"mock-{len(self.buckets)}", self.limit, self.window)
+        return bucket
+
+
+class MockWebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.state.lock:
+            self.server.state.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def _read_payload(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/json"):
+            return json.loads(body or b"{}")
+        match = re.search(rb'name="payload_json"\r\n(?:[^\r\n]+\r\n)*\r\n(.*?)\r\n--', body, re.S)
+        return json.loads(match.group(1)) if match else {}
+
+    def _handle(self, method):
+        state = self.server.state
+        path, _, query = self.path.partition("?")
+        match = WEBHOOK_PATH.match(path)
+        payload = self._read_payload()
+        if match is None:
+            self._respond(404, {"message": "Unknown Webhook", "code": 10015})
+            return
+        webhook_id, _, message_id = match.groups()
+        if state.latency:
+            time.sleep(state.latency)
+
+        with state.lock:
+            state.requests += 1
+            bucket = state.bucket_for(method, webhook_id, message_id)
+            allowed, remaining, reset_after = bucket.take()
+            failed = allowed and random.random() < state.error_rate
+            if not allowed:
+                state.rate_limited += 1
+            elif failed:
+                state.errors += 1
+            else:
+                state.accepted.append((time.monotonic(), method, payload))
+        headers = {
+            "X-RateLimit-Limit": str(bucket.limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": bucket.name,
+        }
+
+        if not allowed:
+            headers["Retry-After"] = str(max(int(reset_after + 0.999), 1))
+            headers["X-RateLimit-Scope"] = "shared"
+            body = {"message": "You are being rate limited.", "retry_after": round(reset_after, 3), "global": False}
+            self._respond(429, body, headers)
+        elif failed:
+            self._respond(502, {"message": "Bad Gateway"}, headers)
+        elif method == "PATCH":
+            self._respond(200, {"id": message_id, "channel_id": "1"}, headers)
+        elif "wait=true" in query:
+            self._respond(200, {"id": str(next(state.message_ids)), "channel_id": "1"}, headers)
+        else:
+            self._respond(204, None, headers)
+
+    def _respond(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+
+# Local stand-in for a Discord webhook: executes and message edits succeed,
+# each route is rate limited per window with Discord's headers and 429 body,
+# and a share of accepted requests can be turned into 502s
+class MockWebhookServer:
+    def __init__(self, host="127.0.0.1", port=0, limit=5, window=2.0, error_rate=0.0, latency=0.0):
+        self.server = ThreadingHTTPServer((host, port), MockWebhookHandler)
+        self.server.daemon_threads = True
+        self.server.state = MockWebhookState(limit, window, error_rate, latency)
+        self.thread = None
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def webhook_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/webhooks/1234/mock-token"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="MockWebhook", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a local mock Discord webhook, for pointing the Webhook URL setting at offline."
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--limit", type=int, default=5, help="Requests per route per window")
+    parser.add_argument("--window", type=float, default=2.0, help="Rate-limit window in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 502")
+    args = parser.parse_args(argv)
+
+    server = MockWebhookServer(
+        port=args.port, limit=args.limit, window=args.window, error_rate=args.error_rate
+    )
+    print(f"Webhook URL: {server.webhook_url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state = server.state
+        print(
+            f"{state.requests} requests over {state.connections} connections, "
+            f"{len(state.accepted)} accepted, {state.rate_limited} rate limited, {state.errors} errors"
+        )
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
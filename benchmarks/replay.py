@@ -0,0 +1,255 @@
+import queue
+import threading
+import time
+
+from core.detection import create_line_predictor
+from core.pipeline import (
+    DIG_CLICK_KEY,
+    CaptureStage,
+    DecisionStage,
+    FramePipeline,
+    PipelineStage,
+)
+from utils.config_management import DEFAULT_PARAMS, ParamSnapshot, _coerce_param_value
+from utils.frame_replay import FrameClip, ReplayCapture
+from utils.thread_utils import StateSignal
+
+
+DEFAULT_SYSTEM_LATENCY_MS = 50
+
+
+class HeadlessAutomation:
+    def __init__(self):
+        self.is_selling = False
+        self.sell_count = 0
+        self.sell_button_position = None
+        self.walk_pattern_index = 0
+        self.engagement_signal = StateSignal()
+
+    def update_target_lock_activity(self):
+        pass
+
+    def update_click_activity(self):
+        pass
+
+    def update_dig_activity(self):
+        pass
+
+    def get_current_status(self):
+        return "Replay"
+
+
+# Tracks the delayed click ClickScheduler would be holding, on the replay clock
+class ReplayClickScheduler:
+    def __init__(self):
+        self.pending = {}
+
+    def is_pending(self, key):
+        return key in self.pending
+
+    def cancel_all(self):
+        self.pending.clear()
+
+
+# Carries the attributes the pipeline stages read and write on DigTool,
+# without Tk, input hooks or a live capture backend.
+class HeadlessDigTool:
+    def __init__(self, camera, game_area=None, system_latency_ms=None):
+        self.cam = camera
+        self.game_area = game_area
+        self.region_key = "replay"
+        self.running = True
+        self.click_lock = threading.Lock()
+        self.click_scheduler = ReplayClickScheduler()
+        self.results_queue = queue.Queue(maxsize=1)
+        self.velocity_calculator = create_line_predictor()
+        self.automation_manager = HeadlessAutomation()
+        self.base_line_movement_check_frames = 30
+        self.min_movement_threshold = 50
+        self.system_latency_ms = (
+            DEFAULT_SYSTEM_LATENCY_MS if system_latency_ms is None else system_latency_ms
+        )
+        self.reset_detection_state(0.0)
+
+    def reset_detection_state(self, start_time):
+        self.blind_until = 0
+        self.smoothed_zone_x = None
+        self.smoothed_zone_w = None
+        self.is_color_locked = False
+        self.locked_color_hsv = None
+        self.locked_color_hex = None
+        self.is_low_sat_lock = False
+        self.frames_since_last_zone_detection = 0
+        self.target_engaged = False
+        self.line_moving_history = []
+        self.manual_dig_target_disengaged_time = 0
+        self.manual_dig_was_engaged = False
+        self.auto_walk_state = "move"
+        self._hsv_lower_bound_cache = None
+        self._hsv_upper_bound_cache = None
+        self._last_hsv_color = None
+        self._last_is_low_sat = None
+        self._current_time_cache = start_time
+        self._current_time_ms_cache = start_time * 1000
+        self.click_count = 0
+        self.dig_count = 0
+        self.startup_time = start_time * 1000
+        self.click_scheduler.cancel_all()
+        if hasattr(self, "_line_detection_stats"):
+            del self._line_detection_stats
+        self.velocity_calculator.reset()
+
+
+class ReplayCaptureStage(CaptureStage):
+    def process(self, frame):
+        if not super().process(frame):
+            return False
+        # Stamp frames with their recorded grab time rather than replay wall time
+        frame.capture_timestamp = self.dig_tool._current_time_cache
+        return True
+
+
+class ReplayDecisionStage(DecisionStage):
+    def get_system_latency(self):
+        return self.dig_tool.system_latency_ms / 1000.0
+
+
+# Stands in for ActionStage: applies the same click gate and blindness window,
+# holds click_lock while a delayed click is pending on the replay clock, moves
+# the pending click when a fresher prediction arrives, and records the click
+# instead of sending input.
+class ReplayActionStage(PipelineStage):
+    name = "act"
+
+    def __init__(self, dig_tool_instance):
+        super().__init__(dig_tool_instance)
+        self.clicks = []
+        self.rescheduled_clicks = 0
+
+    def process(self, frame):
+        dig_tool = self.dig_tool
+        current_time_ms = frame.current_time_ms
+        pending = dig_tool.click_scheduler.pending
+
+        click = pending.get(DIG_CLICK_KEY)
+        if click is not None and current_time_ms >= click["fire_time_ms"]:
+            del pending[DIG_CLICK_KEY]
+            if dig_tool.click_lock.locked():
+                dig_tool.click_lock.release()
+            click = None
+        if not frame.params.reschedule_pending_clicks:
+            click = None
+
+        if not (
+            dig_tool.running
+            and dig_tool.target_engaged
+            and current_time_ms >= dig_tool.blind_until
+            and frame.sweet_spot_center is not None
+            and (not dig_tool.click_lock.locked() or click is not None)
+            and frame.should_click
+        ):
+            return True
+
+        if click is not None:
+            if frame.prediction_used and frame.click_delay > 0:
+                dig_tool.blind_until = current_time_ms + frame.params.post_click_blindness
+                click["fire_time_ms"] = current_time_ms + frame.click_delay * 1000.0
+                click["sweet_spot_start"] = frame.sweet_spot_start
+                click["sweet_spot_end"] = frame.sweet_spot_end
+                click["rescheduled"] += 1
+                frame.click_rescheduled = True
+                self.rescheduled_clicks += 1
+            return True
+
+        dig_tool.blind_until = current_time_ms + frame.params.post_click_blindness
+        fire_time_ms = current_time_ms + frame.click_delay * 1000.0
+        click = {
+            "decision_time_ms": current_time_ms,
+            "fire_time_ms": fire_time_ms,
+            "line_pos": frame.line_pos,
+            "sweet_spot_center": frame.sweet_spot_center,
+            "sweet_spot_start": frame.sweet_spot_start,
+            "sweet_spot_end": frame.sweet_spot_end,
+            "prediction_used": frame.prediction_used,
+            "confidence": frame.confidence,
+            "rescheduled": 0,
+        }
+        if frame.click_delay > 0:
+            dig_tool.click_lock.acquire()
+            pending[DIG_CLICK_KEY] = click
+
+        dig_tool.click_count += 1
+        frame.click_sent = True
+        self.clicks.append(click)
+        return True
+
+
+def build_replay_params(clip=None, overrides=None):
+    values = dict(DEFAULT_PARAMS)
+    if clip is not None:
+        for key, value in clip.params.items():
+            if key in values:
+                values[key] = _coerce_param_value(value, DEFAULT_PARAMS[key])
+    for key, value in (overrides or {}).items():
+        if key not in values:
+            raise KeyError(f"Unknown parameter: {key}")
+        if isinstance(DEFAULT_PARAMS[key], bool) and isinstance(value, str):
+            value = value.strip().lower() in ("1", "true", "yes", "on")
+        values[key] = _coerce_param_value(value, DEFAULT_PARAMS[key])
+    values.pop("system_latency", None)
+    return ParamSnapshot(values)
+
+
+def build_replay_pipeline(dig_tool):
+    pipeline = FramePipeline(dig_tool)
+    pipeline.replace_stage("capture", ReplayCaptureStage(dig_tool))
+    pipeline.replace_stage("decide", ReplayDecisionStage(dig_tool))
+    pipeline.replace_stage("act", ReplayActionStage(dig_tool))
+    return pipeline
+
+
+def replay_clip(clip, params=None, realtime=False, system_latency_ms=None, on_frame=None):
+    if not isinstance(clip, FrameClip):
+        clip = FrameClip(clip)
+    if params is None:
+        params = build_replay_params(clip)
+    if system_latency_ms is None:
+        system_latency_ms = clip.system_latency_ms
+
+    camera = ReplayCapture(clip, realtime=realtime)
+    dig_tool = HeadlessDigTool(camera, clip.game_area, system_latency_ms)
+    dig_tool.velocity_calculator = create_line_predictor(params.prediction_method)
+    pipeline = build_replay_pipeline(dig_tool)
+    game_fps = max(params.target_fps, 1)
+    dig_tool.velocity_calculator.update_fps(game_fps)
+
+    # The replay clock follows the recorded timestamps, so blindness windows,
+    # velocity and click timing see the same time base as the live session
+    clock_origin = time.time()
+    dig_tool.reset_detection_state(clock_origin)
+
+    while True:
+        next_index = camera.frame_index + 1
+        if next_index >= len(clip):
+            break
+        now = clock_origin + float(clip.timestamps[next_index])
+        dig_tool._current_time_cache = now
+        dig_tool._current_time_ms_cache = now * 1000
+
+        frame_start_time = time.perf_counter()
+        cpu_start = time.process_time()
+        if not pipeline.process_frame(frame_start_time, now * 1000, params):
+            break
+        frame_time = time.perf_counter() - frame_start_time
+        cpu_time = time.process_time() - cpu_start
+
+        if on_frame is not None:
+            on_frame(camera.frame_index, pipeline, frame_time, cpu_time)
+
+        # Stand in for the UI thread so the publish stage keeps doing its work
+        try:
+            dig_tool.results_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    return dig_tool, pipeline
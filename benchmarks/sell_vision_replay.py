@@ -0,0 +1,155 @@
+import argparse
+
+import numpy as np
+
+from utils.frame_replay import FrameClip
+from utils.sell_vision import (
+    POLL_INTERVAL,
+    SELL_PROCESSED_MIN_WAIT,
+    SELL_PROCESSED_TIMEOUT,
+    UI_SELL_PROCESSED_TIMEOUT,
+    SellScreenMatcher,
+    SellVision,
+)
+
+
+# step_delay after each key of a UI navigation sell
+UI_STEP_DELAY = 0.5
+
+
+# Replay time only moves when the sell steps sleep, like the live steps
+# between two polls; grabs cost nothing
+class ReplayClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+
+# Hands out the recorded frame that was on screen at the replay time. Sell
+# clips are recorded at the live poll times, so this is what a poll at the
+# same moment saw; past the end of the clip the grab fails like a live one.
+class ClipCamera:
+    def __init__(self, clip, clock):
+        self.clip = clip
+        self.clock = clock
+        self.grabs = 0
+
+    def capture(self, bbox=None, region_key=None, bgra=False):
+        now = self.clock.time()
+        if now > self.clip.duration + POLL_INTERVAL:
+            return None
+        index = max(int(np.searchsorted(self.clip.timestamps, now, side="right")) - 1, 0)
+        self.grabs += 1
+        return self.clip.frames[index]
+
+
+def run_button_click(vision, params, template_frame):
+    open_s = params["auto_sell_inventory_open_delay"] / 1000.0
+    sell_s = params["sell_delay"] / 1000.0
+    close_s = params["auto_sell_inventory_close_delay"] / 1000.0
+    timeline = []
+
+    vision.mark_closed()
+    opened = vision.wait_inventory_open(open_s)
+    timeline.append(("inventory_open", vision.clock()))
+    if template_frame is not None or vision.matcher.has_button_template():
+        button_seen = vision.wait_sell_button(sell_s)
+    else:
+        button_seen = False
+        vision.pause(sell_s)
+    if not button_seen and opened:
+        vision.learn_sell_button()
+    timeline.append(("sell_click", vision.clock()))
+    before = vision.snapshot()
+    vision.wait_sell_processed(SELL_PROCESSED_TIMEOUT, SELL_PROCESSED_MIN_WAIT, before)
+    timeline.append(("inventory_key", vision.clock()))
+    vision.wait_inventory_closed(close_s)
+    timeline.append(("done", vision.clock()))
+    fixed = open_s + sell_s + SELL_PROCESSED_TIMEOUT + close_s
+    return timeline, fixed
+
+
+def run_ui_navigation(vision, params):
+    open_s = params["auto_sell_inventory_open_delay"] / 1000.0
+    close_s = params["auto_sell_inventory_close_delay"] / 1000.0
+    # The navigation key wraps the user sequence, and enter waits the sell delay
+    steps = ["nav"] + [step.strip().lower() for step in params["auto_sell_ui_sequence"].split(",") if step.strip()] + ["nav"]
+    sell_s = params["sell_delay"] / 1000.0
+    steps_s = len(steps) * UI_STEP_DELAY + steps.count("enter") * sell_s
+    timeline = []
+
+    vision.mark_closed()
+    vision.wait_inventory_open(open_s)
+    timeline.append(("inventory_open", vision.clock()))
+    # The live sell compares against the screen just before the first enter
+    before = None
+    for step in steps:
+        if step == "enter":
+            vision.pause(sell_s)
+            if before is None:
+                before = vision.snapshot()
+                timeline.append(("sell_enter", vision.clock()))
+        vision.pause(UI_STEP_DELAY)
+    if before is None:
+        before = vision.snapshot()
+    timeline.append(("sequence_sent", vision.clock()))
+    vision.wait_sell_processed(UI_SELL_PROCESSED_TIMEOUT, SELL_PROCESSED_MIN_WAIT, before)
+    timeline.append(("inventory_key", vision.clock()))
+    vision.wait_inventory_closed(close_s)
+    timeline.append(("done", vision.clock()))
+    fixed = open_s + steps_s + UI_SELL_PROCESSED_TIMEOUT + close_s
+    return timeline, fixed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded auto-sell clip through the sell step matchers and show when each step would have been confirmed."
+    )
+    parser.add_argument("clip", help="Clip directory from debug/sell_clips")
+    parser.add_argument("--method", choices=["button_click", "ui_navigation"], help="Defaults to the method recorded with the clip")
+    parser.add_argument("--template-frame", type=int, help="Learn the sell button from this frame instead of after the sell delay")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args(argv)
+
+    clip = FrameClip(args.clip)
+    params = {
+        "auto_sell_inventory_open_delay": 900,
+        "auto_sell_inventory_close_delay": 900,
+        "sell_delay": 1000,
+        "auto_sell_ui_sequence": "down,up,enter",
+    }
+    params.update({key: value for key, value in clip.params.items() if value is not None})
+    method = args.method or params.get("auto_sell_method", "button_click")
+
+    clock = ReplayClock()
+    camera = ClipCamera(clip, clock)
+    matcher = SellScreenMatcher()
+    if args.template_frame is not None:
+        matcher.learn_sell_button(clip.frames[args.template_frame])
+    vision = SellVision(
+        camera, clip.game_area or (0, 0, 1, 1), matcher, clock=clock.time, sleep=clock.sleep, poll_interval=args.poll_interval
+    )
+
+    if method == "ui_navigation":
+        timeline, fixed = run_ui_navigation(vision, params)
+    else:
+        timeline, fixed = run_button_click(vision, params, args.template_frame)
+
+    print(f"{len(clip)} frames over {clip.duration:.2f}s, {method}, {camera.grabs} grabs")
+    for name, elapsed in vision.step_times.items():
+        result = "timed out" if elapsed is None else f"confirmed after {elapsed * 1000:.0f} ms"
+        print(f"  {name:<17} {result}")
+    for name, at in timeline:
+        print(f"  {name:<17} at {at * 1000:>7.0f} ms")
+    done = timeline[-1][1]
+    print(f"  sell took {done:.2f}s, fixed delays {fixed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
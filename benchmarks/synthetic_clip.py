@@ -0,0 +1,105 @@
+import argparse
+
+import cv2
+import numpy as np
+
+from utils.frame_replay import FrameRecorder
+
+
+RESOLUTIONS = {
+    "720p": (1280, 120),
+    "1080p": (1920, 180),
+    "1440p": (2560, 240),
+}
+
+
+# Approximates the dig minigame bar: a dark strip with a saturated target zone
+# and a thin bright line sweeping back and forth across it.
+def render_frame(width, height, zone_x, zone_w, line_x, rng, noise=6):
+    frame = np.full((height, width, 3), 34, dtype=np.uint8)
+    cv2.rectangle(frame, (zone_x, 0), (zone_x + zone_w, height - 1), (40, 70, 210), -1)
+    if noise:
+        # Luma-only noise keeps the background unsaturated, like the game's grey bar
+        jitter = rng.integers(-noise, noise + 1, size=(height, width, 1), dtype=np.int16)
+        frame = np.clip(frame.astype(np.int16) + jitter, 0, 255).astype(np.uint8)
+    frame[:, max(line_x - 1, 0) : line_x + 2] = (245, 245, 245)
+    return frame
+
+
+def generate_clip(
+    clip_dir,
+    frames=600,
+    width=800,
+    height=200,
+    fps=120,
+    line_speed=900.0,
+    zone_width_percent=20,
+    seed=0,
+    bgra=True,
+):
+    rng = np.random.default_rng(seed)
+    zone_w = max(int(width * zone_width_percent / 100), 1)
+    zone_x = int(rng.integers(width // 8, width - zone_w - width // 8))
+    recorder = FrameRecorder(
+        clip_dir,
+        params={"target_fps": fps, "screenshot_fps": fps},
+        game_area=(0, 0, width, height),
+    )
+
+    line_x = 4.0
+    direction = 1.0
+    frame_interval = 1.0 / fps
+    try:
+        for index in range(frames):
+            frame = render_frame(width, height, zone_x, zone_w, int(line_x), rng)
+            if bgra:
+                # Live recordings keep the 4-channel layout mss hands out
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+            recorder.add_frame(frame, index * frame_interval)
+
+            line_x += direction * line_speed * frame_interval
+            if line_x >= width - 4 or line_x <= 4:
+                direction = -direction
+                line_x = min(max(line_x, 4), width - 4)
+    finally:
+        recorder.close()
+    return recorder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic minigame clip for the replay benchmarks."
+    )
+    parser.add_argument("clip", help="Output clip directory")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument(
+        "--resolution",
+        choices=sorted(RESOLUTIONS),
+        help="Use a preset game-area size instead of --width/--height",
+    )
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=200)
+    parser.add_argument("--fps", type=int, default=120)
+    parser.add_argument("--line-speed", type=float, default=900.0, help="Pixels per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--bgr", action="store_true", help="Write 3-channel frames instead of BGRA"
+    )
+    args = parser.parse_args(argv)
+
+    width, height = RESOLUTIONS.get(args.resolution, (args.width, args.height))
+    recorder = generate_clip(
+        args.clip,
+        frames=args.frames,
+        width=width,
+        height=height,
+        fps=args.fps,
+        line_speed=args.line_speed,
+        seed=args.seed,
+        bgra=not args.bgr,
+    )
+    print(f"Wrote {recorder.frame_count} frames ({width}x{height}) to {args.clip}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import time
+
+import numpy as np
+
+from utils.telemetry import (
+    FLAG_CLICK_RESCHEDULED,
+    FLAG_CLICK_SENT,
+    FLAG_PREDICTION_USED,
+    FLAG_RUNNING,
+    load_telemetry,
+)
+
+
+PERCENTILES = (50, 90, 99)
+DEFAULT_SYSTEM_LATENCY_MS = 50
+
+
+def percentile_row(label, values_ms):
+    if len(values_ms) == 0:
+        return f"  {label:<14}" + "".join(f"{'-':>10}" for _ in range(len(PERCENTILES) + 1))
+    cells = "".join(f"{np.percentile(values_ms, p):>10.3f}" for p in PERCENTILES)
+    return f"  {label:<14}{cells}{values_ms.max():>10.3f}"
+
+
+# Mirrors ReplayStats.score_clicks: a click is a hit when the first frame at or
+# after it lands (decision time + click delay + system latency) shows the line
+# inside the sweet spot it was aimed at. The last rescheduled delay wins.
+def score_clicks(records, system_latency_ms):
+    flags = records["flags"]
+    timestamps = records["timestamp"]
+    click_indices = np.flatnonzero(flags & FLAG_CLICK_SENT)
+    reschedule_indices = np.flatnonzero(flags & FLAG_CLICK_RESCHEDULED)
+
+    landing = timestamps[click_indices] + records["click_delay"][click_indices]
+    targets = click_indices.copy()
+    if len(reschedule_indices) and len(click_indices):
+        # Each reschedule belongs to the most recent click before it
+        owners = np.searchsorted(click_indices, reschedule_indices, side="right") - 1
+        valid = owners >= 0
+        for owner, index in zip(owners[valid], reschedule_indices[valid]):
+            landing[owner] = timestamps[index] + records["click_delay"][index]
+            targets[owner] = index
+    landing = landing + system_latency_ms / 1000.0
+
+    landing_index = np.searchsorted(timestamps, landing)
+    in_range = landing_index < len(records)
+    landing_index = np.minimum(landing_index, len(records) - 1)
+    line_at_landing = records["line_pos"][landing_index].astype(np.float64)
+    start = records["sweet_spot_start"][targets]
+    end = records["sweet_spot_end"][targets]
+    seen = in_range & (line_at_landing >= 0) & ~np.isnan(start)
+    hits = seen & (line_at_landing >= start) & (line_at_landing <= end)
+    error = np.where(seen, line_at_landing - (start + end) * 0.5, np.nan)
+    predicted = (flags[click_indices] & FLAG_PREDICTION_USED) != 0
+    return {
+        "clicks": len(click_indices),
+        "predicted": int(predicted.sum()),
+        "rescheduled": len(reschedule_indices),
+        "scored": int(seen.sum()),
+        "hits": int(hits.sum()),
+        "error": error,
+        "predicted_mask": predicted,
+    }
+
+
+def find_stalls(timestamps, threshold_ms):
+    if len(timestamps) < 2:
+        return []
+    intervals = np.diff(timestamps) * 1000.0
+    stalled = np.flatnonzero(intervals > threshold_ms)
+    episodes = []
+    for index in stalled:
+        episodes.append((float(timestamps[index]), float(intervals[index])))
+    return episodes
+
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+
+def print_report(header, records, system_latency_ms, stall_ms, top):
+    print(f"Records:        {len(records)} of {header['record_count']} written")
+    if header["dropped_records"]:
+        print(f"                {header['dropped_records']} oldest records overwritten")
+    if len(records) == 0:
+        return
+    timestamps = records["timestamp"]
+    duration = float(timestamps[-1] - timestamps[0])
+    print(f"Span:           {format_time(timestamps[0])} to {format_time(timestamps[-1])} ({duration / 60:.1f} min)")
+    running = (records["flags"] & FLAG_RUNNING) != 0
+    print(f"Running:        {running.mean() * 100:.1f}% of frames")
+    print()
+
+    print(f"  {'time (ms)':<14}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'max':>10}")
+    print(percentile_row("frame", records["frame_time"].astype(np.float64) * 1000.0))
+    print(percentile_row("capture wait", records["capture_time"].astype(np.float64) * 1000.0))
+    for name in header["stages"]:
+        print(percentile_row(name, records[f"stage_{name}"].astype(np.float64) * 1000.0))
+    print()
+
+    if duration > 0:
+        print(f"  Average fps:    {(len(records) - 1) / duration:.1f}")
+    print(f"  Line hit rate:  {(records['line_pos'] >= 0).mean() * 100:.1f}%")
+    print(f"  Zone hit rate:  {(~np.isnan(records['raw_zone_x'])).mean() * 100:.1f}%")
+
+    clicks = score_clicks(records, system_latency_ms)
+    print(
+        f"  Clicks:         {clicks['clicks']} ({clicks['predicted']} predicted, "
+        f"{clicks['rescheduled']} rescheduled)"
+    )
+    if clicks["scored"]:
+        print(
+            f"  Click hit rate: {clicks['hits'] / clicks['scored'] * 100:.1f}% "
+            f"of {clicks['scored']} scored, at {system_latency_ms:.0f} ms latency"
+        )
+        for label, mask in (
+            ("all", np.ones(len(clicks["error"]), dtype=bool)),
+            ("predicted", clicks["predicted_mask"]),
+        ):
+            error = np.abs(clicks["error"][mask])
+            error = error[~np.isnan(error)]
+            if len(error):
+                print(
+                    f"  Aim error ({label}): p50 {np.percentile(error, 50):.1f} px, "
+                    f"p90 {np.percentile(error, 90):.1f} px"
+                )
+    print()
+
+    stalls = find_stalls(timestamps, stall_ms)
+    stalled_time = sum(length for _, length in stalls)
+    print(f"  Stalls > {stall_ms:.0f} ms: {len(stalls)} ({stalled_time / 1000.0:.1f}s total)")
+    for start, length in sorted(stalls, key=lambda stall: stall[1], reverse=True)[:top]:
+        print(f"    {format_time(start)}  {length:>9.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Summarize a frame telemetry journal: frame timing, hit rates, click accuracy and stalls."
+    )
+    parser.add_argument("journal", help="Telemetry journal written with Record Frame Telemetry enabled")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=None,
+        help="System latency used to score clicks (defaults to the value stored in the journal)",
+    )
+    parser.add_argument(
+        "--stall-ms", type=float, default=100.0, help="Frame gap that counts as a stall"
+    )
+    parser.add_argument("--top", type=int, default=5, help="Longest stalls to list")
+    parser.add_argument(
+        "--running-only",
+        action="store_true",
+        help="Only analyse frames recorded while the bot was running",
+    )
+    args = parser.parse_args(argv)
+
+    header, records = load_telemetry(args.journal)
+    if args.running_only:
+        records = records[(records["flags"] & FLAG_RUNNING) != 0]
+    system_latency_ms = args.latency_ms
+    if system_latency_ms is None:
+        system_latency_ms = header.get("system_latency_ms") or DEFAULT_SYSTEM_LATENCY_MS
+    print_report(header, records, float(system_latency_ms), args.stall_ms, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,36 @@
 
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import autoit
 from pynput.keyboard import Key
 from utils.debug_logger import logger
 from utils.config_management import get_param
+from utils.screen_capture import ScreenCapture
+from utils.sell_vision import (
+    SELL_PROCESSED_MIN_WAIT,
+    SELL_PROCESSED_TIMEOUT,
+    UI_SELL_PROCESSED_TIMEOUT,
+    SellScreenMatcher,
+    SellVision,
+    region_around,
+)
 from utils.system_utils import find_and_focus_roblox_window
+from utils.thread_utils import StateSignal
+
+
+# Watched area for UI navigation sells when no sell button position is set
+UI_SELL_REGION_SIZE = (320, 240)
+SELL_CLIP_MAX_FRAMES = 2000
 
 
 class AutoSellManager:
 
-    def __init__(self, dig_tool, keyboard_controller, shift_manager):
+    def __init__(self, dig_tool, keyboard_controller, shift_manager, engagement_signal=None):
         self.dig_tool = dig_tool
         self.keyboard_controller = keyboard_controller
         self.shift_manager = shift_manager
+        self.engagement_signal = engagement_signal or StateSignal()
         
 
         self.sell_button_position = None
@@ -29,6 +46,18 @@ class AutoSellManager:
         self.engagement_monitoring_thread = None
         self.stop_engagement_monitoring = False
 
+        # Sells run one at a time on their own thread; sell_job is the future
+        # of the latest one, so the frame loop can check it without waiting
+        self._sell_executor = None
+        self.sell_job = None
+
+        # Sell steps wait on a small region around the sell button; the
+        # button template learned there is kept between sells
+        self.sell_matcher = SellScreenMatcher()
+        self._sell_camera = None
+        self._sell_vision = None
+        self._sell_recorder = None
+
     def is_auto_sell_ready(self):
         if not self.dig_tool.running or not get_param(self.dig_tool, "auto_sell_enabled") or self.is_selling:
             return False
@@ -143,17 +172,103 @@ class AutoSellManager:
             logger.error(f"Error calculating walkspeed dig count: {e}")
             return 0
 
+    def start_auto_sell(self):
+        if self.sell_job is not None and not self.sell_job.done():
+            logger.warning("Auto-sell already in progress, skipping")
+            return self.sell_job
+        if self._sell_executor is None:
+            self._sell_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AutoSell")
+        self.sell_job = self._sell_executor.submit(self.perform_auto_sell)
+        return self.sell_job
+
+    def shutdown(self):
+        self.stop_engagement_monitoring = True
+        self.engagement_signal.interrupt()
+        if self._sell_executor is not None:
+            self._sell_executor.shutdown(wait=False)
+            self._sell_executor = None
+        if self._sell_camera is not None:
+            self._sell_camera.close()
+            self._sell_camera = None
+
     def perform_auto_sell(self):
      
         auto_sell_method = get_param(self.dig_tool, "auto_sell_method")
         
-        if auto_sell_method == "button_click":
-            return self._perform_auto_sell_button_click()
-        elif auto_sell_method == "ui_navigation":
-            return self._perform_auto_sell_ui_navigation()
-        else:
-            logger.error(f"Unknown auto_sell_method: {auto_sell_method}")
-            return False
+        self._sell_vision = self._create_sell_vision(auto_sell_method)
+        try:
+            if auto_sell_method == "button_click":
+                return self._perform_auto_sell_button_click()
+            elif auto_sell_method == "ui_navigation":
+                return self._perform_auto_sell_ui_navigation()
+            else:
+                logger.error(f"Unknown auto_sell_method: {auto_sell_method}")
+                return False
+        finally:
+            self._finish_sell_vision()
+
+    def _create_sell_vision(self, auto_sell_method):
+        # Without visual confirmation the vision has no camera, and every
+        # step sleeps out its old fixed delay
+        if not get_param(self.dig_tool, "auto_sell_visual_confirmation"):
+            return SellVision(None, None, self.sell_matcher)
+        try:
+            if self._sell_camera is None:
+                self._sell_camera = ScreenCapture()
+            bbox = self._sell_region(auto_sell_method)
+            camera = self._sell_camera
+            if bbox is not None and get_param(self.dig_tool, "debug_enabled"):
+                camera = self._record_sell_clip(camera, bbox, auto_sell_method)
+            return SellVision(camera, bbox, self.sell_matcher)
+        except Exception as e:
+            logger.warning(f"Sell step confirmation unavailable, using fixed delays: {e}")
+            return SellVision(None, None, self.sell_matcher)
+
+    def _sell_region(self, auto_sell_method):
+        if self.sell_button_position and len(self.sell_button_position) == 2:
+            return region_around(self.sell_button_position)
+        if auto_sell_method != "ui_navigation":
+            return None
+        monitor = self._sell_camera.primary_monitor_bbox()
+        if not monitor:
+            return None
+        center = ((monitor[0] + monitor[2]) // 2, (monitor[1] + monitor[3]) // 2)
+        return region_around(center, UI_SELL_REGION_SIZE)
+
+    def _record_sell_clip(self, camera, bbox, auto_sell_method):
+        # Debug runs keep what the sell steps saw, for replaying the matchers
+        import os
+        from utils.frame_replay import FrameRecorder, RecordingCapture
+
+        clip_dir = os.path.join(
+            self.dig_tool.debug_dir, "sell_clips", time.strftime(f"sell_{self.sell_count + 1}_%Y%m%d_%H%M%S")
+        )
+        params = {
+            "auto_sell_method": auto_sell_method,
+            "sell_button_position": list(self.sell_button_position) if self.sell_button_position else None,
+            "auto_sell_inventory_open_delay": get_param(self.dig_tool, "auto_sell_inventory_open_delay"),
+            "auto_sell_inventory_close_delay": get_param(self.dig_tool, "auto_sell_inventory_close_delay"),
+            "sell_delay": get_param(self.dig_tool, "sell_delay"),
+            "auto_sell_ui_sequence": get_param(self.dig_tool, "auto_sell_ui_sequence"),
+        }
+        self._sell_recorder = FrameRecorder(
+            clip_dir, params=params, game_area=bbox, max_frames=SELL_CLIP_MAX_FRAMES
+        )
+        return RecordingCapture(camera, self._sell_recorder)
+
+    def _finish_sell_vision(self):
+        vision, self._sell_vision = self._sell_vision, None
+        if vision is not None and vision.step_times:
+            logger.debug(f"Sell steps confirmed after: {vision.step_times}")
+        if self._sell_recorder is not None:
+            try:
+                self._sell_recorder.close()
+            except Exception as e:
+                logger.warning(f"Failed to save sell clip: {e}")
+            self._sell_recorder = None
+
+    def _current_sell_vision(self):
+        return self._sell_vision or SellVision(None, None, self.sell_matcher)
 
     def _restore_shifts_on_error(self):
         try:
@@ -174,6 +289,7 @@ class AutoSellManager:
                 return
 
             logger.info(f"Starting auto-sell sequence #{self.sell_count + 1}")
+            vision = self._current_sell_vision()
             self.is_selling = True
             self.dig_tool.update_status("Auto-selling...")
             
@@ -191,13 +307,16 @@ class AutoSellManager:
                     logger.info(f"Disabled shift keys for auto-sell: {disabled_shifts}")
                     time.sleep(0.2)
 
+                vision.mark_closed()
                 inventory_key = get_param(self.dig_tool, "auto_sell_inventory_key")
                 self.keyboard_controller.press(inventory_key)
                 self.keyboard_controller.release(inventory_key)
 
+                # Each wait ends as soon as the screen confirms the step, with
+                # the configured delay as its timeout
                 inventory_open_delay = get_param(self.dig_tool, "auto_sell_inventory_open_delay")
                 inventory_open_delay_seconds = inventory_open_delay / 1000.0
-                time.sleep(inventory_open_delay_seconds)
+                inventory_opened = vision.wait_inventory_open(inventory_open_delay_seconds)
                 
                 if not self.sell_button_position or len(self.sell_button_position) != 2:
                     logger.error("Auto-sell failed: no sell button position set or invalid format")
@@ -210,20 +329,29 @@ class AutoSellManager:
                 y = self.sell_button_position[1]
                 sell_delay = get_param(self.dig_tool, "sell_delay")
                 sell_delay_seconds = sell_delay / 1000.0
-                time.sleep(sell_delay_seconds)
-
+                if self.sell_matcher.has_button_template(self.sell_button_position):
+                    button_seen = vision.wait_sell_button(sell_delay_seconds)
+                else:
+                    button_seen = False
+                    vision.pause(sell_delay_seconds)
+                if not button_seen and inventory_opened:
+                    # The full delay has passed with the panel open, so the
+                    # button is there now; remember what it looks like
+                    vision.learn_sell_button(self.sell_button_position)
+
+                before_click = vision.snapshot()
                 success = self.autoit_click(x, y)
 
                 if success:
                     logger.info("Sell click successful")
-                    time.sleep(2.5)
+                    vision.wait_sell_processed(SELL_PROCESSED_TIMEOUT, SELL_PROCESSED_MIN_WAIT, before_click)
                     inventory_key = get_param(self.dig_tool, "auto_sell_inventory_key")
                     self.keyboard_controller.press(inventory_key)
                     self.keyboard_controller.release(inventory_key)
                     
                     inventory_close_delay = get_param(self.dig_tool, "auto_sell_inventory_close_delay")
                     inventory_close_delay_seconds = inventory_close_delay / 1000.0
-                    time.sleep(inventory_close_delay_seconds)
+                    vision.wait_inventory_closed(inventory_close_delay_seconds)
 
                     self._process_sell_completion()
                 else:
@@ -266,6 +394,7 @@ class AutoSellManager:
                 return False
 
             logger.info(f"Starting UI navigation auto-sell sequence #{self.sell_count + 1}")
+            vision = self._current_sell_vision()
             self.is_selling = True
             self.dig_tool.update_status("Auto-selling (UI Navigation)...")
             
@@ -300,8 +429,12 @@ class AutoSellManager:
 
                 logger.info(f"Using sequence: '{sell_sequence}' (user: '{user_sequence}')")
 
+                vision.mark_closed()
                 self._send_key_safe(inventory_key)
-                time.sleep(inventory_open_delay_seconds)
+                vision.wait_inventory_open(inventory_open_delay_seconds)
+                # Taken just before the sell input so navigating the menu does not
+                # count as the sell going through
+                before_sell = None
 
                 if sell_sequence:
                     sequence_steps = [step.strip() for step in sell_sequence.split(',') if step.strip()]
@@ -313,6 +446,8 @@ class AutoSellManager:
                         if step:
                             if step.lower() == "enter":
                                 time.sleep(sell_delay_seconds)
+                                if before_sell is None:
+                                    before_sell = vision.snapshot()
                             
                             logger.info(f"Sending '{step}' key")
                             self._send_key_safe(step)
@@ -320,9 +455,11 @@ class AutoSellManager:
                 else:
                     logger.warning("No sell sequence found in config!")
 
-                time.sleep(3.0)
+                if before_sell is None:
+                    before_sell = vision.snapshot()
+                vision.wait_sell_processed(UI_SELL_PROCESSED_TIMEOUT, SELL_PROCESSED_MIN_WAIT, before_sell)
                 self._send_key_safe(inventory_key)
-                time.sleep(inventory_close_delay_seconds)
+                vision.wait_inventory_closed(inventory_close_delay_seconds)
 
                 self._process_sell_completion("UI Nav")
 
@@ -349,6 +486,7 @@ class AutoSellManager:
 
     def _monitor_post_sell_engagement(self):
         self.stop_engagement_monitoring = True
+        self.engagement_signal.interrupt()
         
         if self.engagement_monitoring_thread and self.engagement_monitoring_thread.is_alive():
             logger.debug("Stopping previous engagement monitoring thread")
@@ -375,35 +513,28 @@ class AutoSellManager:
                 logger.debug("Post-sell engagement monitoring disabled (timeout <= 0)")
                 return
                 
-            target_check_interval = 0.1
             engagement_start_time = time.time()
             
             logger.info(f"Monitoring target engagement for {target_engagement_timeout}s after auto-sell")
             
-            checks_performed = 0
-            while time.time() - engagement_start_time < target_engagement_timeout:
-                if not self.dig_tool.running or self.stop_engagement_monitoring:
-                    if self.stop_engagement_monitoring:
-                        logger.debug("Post-sell engagement monitoring stopped (new auto-sell started)")
-                    else:
-                        logger.info("Post-sell engagement monitoring aborted: tool stopped")
-                    return
-                    
-                try:
-                    target_engaged = hasattr(self.dig_tool, 'target_engaged') and self.dig_tool.target_engaged
-                    checks_performed += 1
-                    
-                    if target_engaged:
-                        logger.info(f"Target engagement detected after {time.time() - engagement_start_time:.1f}s")
-                        return
-                except Exception as e:
-                    logger.warning(f"Error checking target engagement: {e}")
-                
-                time.sleep(target_check_interval)
+            # Woken by the detection loop's engagement updates rather than polling
+            engaged = self.engagement_signal.wait_for(
+                True,
+                target_engagement_timeout,
+                cancel=lambda: not self.dig_tool.running or self.stop_engagement_monitoring,
+            )
+            if engaged:
+                logger.info(f"Target engagement detected after {time.time() - engagement_start_time:.1f}s")
+                return
+            if self.stop_engagement_monitoring:
+                logger.debug("Post-sell engagement monitoring stopped (new auto-sell started)")
+                return
+            if not self.dig_tool.running:
+                logger.info("Post-sell engagement monitoring aborted: tool stopped")
+                return
             
-            if not self.stop_engagement_monitoring:
-                logger.warning(f"No target engagement detected after {target_engagement_timeout}s, applying fallback")
-                self._apply_auto_sell_fallback()
+            logger.warning(f"No target engagement detected after {target_engagement_timeout}s, applying fallback")
+            self._apply_auto_sell_fallback()
             
         except Exception as e:
             logger.error(f"Error in post-sell engagement monitoring: {e}")
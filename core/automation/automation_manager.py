@@ -5,6 +5,7 @@ import time
 import gc
 from pynput.keyboard import Controller as KeyboardController
 from utils.debug_logger import logger
+from utils.thread_utils import StateSignal
 
 from .shift_manager import ShiftManager
 from .movement import MovementManager
@@ -23,7 +24,11 @@ class AutomationManager:
         self.movement_manager = MovementManager(dig_tool_instance, self.keyboard_controller, self.shift_manager)
         self.auto_shovel_manager = AutoShovelManager(dig_tool_instance, self.keyboard_controller)
         self.pattern_manager = PatternManager(dig_tool_instance, self.keyboard_controller, self.shift_manager)
-        self.auto_sell_manager = AutoSellManager(dig_tool_instance, self.keyboard_controller, self.shift_manager)
+        # Updated by the detection loop every frame; waiters wake on changes
+        self.engagement_signal = StateSignal()
+        self.auto_sell_manager = AutoSellManager(
+            dig_tool_instance, self.keyboard_controller, self.shift_manager, self.engagement_signal
+        )
         
         self.last_successful_direction = None
         
@@ -273,6 +278,9 @@ class AutomationManager:
     def perform_auto_sell(self):
         return self.auto_sell_manager.perform_auto_sell()
 
+    def start_auto_sell(self):
+        return self.auto_sell_manager.start_auto_sell()
+
     def test_sell_button_click(self):
         return self.auto_sell_manager.test_sell_button_click()
 
@@ -315,7 +323,7 @@ class AutomationManager:
             return "AUTO SELLING"
         elif self.is_walking:
             return "WALKING"
-        elif hasattr(self.dig_tool, 'param_vars') and self.dig_tool.param_vars.get("auto_walk_enabled", {}).get():
+        elif hasattr(self.dig_tool, 'param_snapshot') and self.dig_tool.param_snapshot.current.get("auto_walk_enabled"):
             auto_shovel_status = self.get_auto_shovel_status()
             if "disabled" not in auto_shovel_status.lower():
                 return f"AUTO WALKING ({auto_shovel_status})"
@@ -396,6 +404,7 @@ class AutomationManager:
 
             self.sell_button_position = None
             self.is_selling = False
+            self.auto_sell_manager.shutdown()
             self.movement_manager.is_walking = False
 
             if hasattr(self, "keyboard_controller"):
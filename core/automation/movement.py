@@ -118,7 +118,9 @@ class MovementManager:
                 duration = base_duration * duration_multiplier
 
                 if total_items > 35 or initial_decrease > 0:
-                    logger.debug(f"Dynamic walkspeed applied: {duration_multiplier:.2f}x duration")
+                    logger.debug(
+                        "Dynamic walkspeed applied: %.2fx duration", duration_multiplier
+                    )
 
             if "+" in direction:
                 keys_to_press = direction.lower().split("+")
@@ -131,9 +133,9 @@ class MovementManager:
                             converted_key = self.convert_key_name(key)
                             converted_keys.append(converted_key)
                             self.keyboard_controller.press(converted_key)
-                            logger.debug(f"Pressed key '{key}' -> {converted_key}")
+                            logger.debug("Pressed key '%s' -> %s", key, converted_key)
                         except Exception as e:
-                            logger.warning(f"Failed to press key '{key}': {e}")
+                            logger.warning("Failed to press key '%s': %s", key, e)
 
                 time.sleep(duration)
 
@@ -141,7 +143,7 @@ class MovementManager:
                     try:
                         self.keyboard_controller.release(converted_key)
                     except Exception as e:
-                        logger.warning(f"Failed to release key {converted_key}: {e}")
+                        logger.warning("Failed to release key %s: %s", converted_key, e)
 
             elif len(direction) == 1:
                 try:
@@ -149,10 +151,10 @@ class MovementManager:
                     self.keyboard_controller.press(converted_key)
                     time.sleep(duration)
                     self.keyboard_controller.release(converted_key)
-                    logger.debug(f"Single key '{direction}' -> {converted_key}")
+                    logger.debug("Single key '%s' -> %s", direction, converted_key)
                 except Exception as e:
                     logger.warning(
-                        f"Failed to press/release single key '{direction}': {e}"
+                        "Failed to press/release single key '%s': %s", direction, e
                     )
             else:
                 try:
@@ -160,7 +162,7 @@ class MovementManager:
                     self.keyboard_controller.press(converted_key)
                     time.sleep(duration)
                     self.keyboard_controller.release(converted_key)
-                    logger.debug(f"Long key name '{direction}' -> {converted_key}")
+                    logger.debug("Long key name '%s' -> %s", direction, converted_key)
                 except Exception:
                     try:
                         for key in direction.lower():
@@ -172,7 +174,7 @@ class MovementManager:
                             if key in ["w", "a", "s", "d"]:
                                 converted_key = self.convert_key_name(key)
                                 self.keyboard_controller.release(converted_key)
-                        logger.debug(f"Legacy multi-key '{direction}'")
+                        logger.debug("Legacy multi-key '%s'", direction)
                     except Exception as e:
                         logger.error(f"Failed to execute movement '{direction}': {e}")
                         return False
@@ -190,7 +192,7 @@ class MovementManager:
                 
                 if record_movement_callback:
                     record_movement_callback(direction)
-                    logger.debug(f"Recorded movement during walk: {direction}")
+                    logger.debug("Recorded movement during walk: %s", direction)
 
                 walk_duration = get_param(self.dig_tool, "walk_duration") / 1000.0
 
@@ -215,7 +217,10 @@ class MovementManager:
                     walk_duration = base_duration * duration_multiplier
 
                     if total_items > 35 or initial_decrease > 0:
-                        logger.debug(f"Dynamic walkspeed applied: {duration_multiplier:.2f}x duration")
+                        logger.debug(
+                            "Dynamic walkspeed applied: %.2fx duration",
+                            duration_multiplier,
+                        )
 
                 if "+" in direction:
                     keys_to_press = direction.lower().split("+")
@@ -232,9 +237,11 @@ class MovementManager:
                                 if self.shift_manager.is_shift_key(key):
                                     self.shift_manager.toggle_shiftlock_on_shift_press(key)
 
-                                logger.debug(f"Pressed key '{key}' -> {converted_key}")
+                                logger.debug(
+                                    "Pressed key '%s' -> %s", key, converted_key
+                                )
                             except Exception as e:
-                                logger.warning(f"Failed to press key '{key}': {e}")
+                                logger.warning("Failed to press key '%s': %s", key, e)
 
                     time.sleep(walk_duration)
 
@@ -243,7 +250,7 @@ class MovementManager:
                             self.keyboard_controller.release(converted_key)
                         except Exception as e:
                             logger.warning(
-                                f"Failed to release key {converted_key}: {e}"
+                                "Failed to release key %s: %s", converted_key, e
                             )
 
                 elif len(direction) == 1:
@@ -256,10 +263,10 @@ class MovementManager:
 
                         time.sleep(walk_duration)
                         self.keyboard_controller.release(converted_key)
-                        logger.debug(f"Single key '{direction}' -> {converted_key}")
+                        logger.debug("Single key '%s' -> %s", direction, converted_key)
                     except Exception as e:
                         logger.warning(
-                            f"Failed to press/release single key '{direction}': {e}"
+                            "Failed to press/release single key '%s': %s", direction, e
                         )
                 else:
                     try:
@@ -270,7 +277,9 @@ class MovementManager:
                             self.shift_manager.toggle_shiftlock_on_shift_press(direction.lower())
                         time.sleep(walk_duration)
                         self.keyboard_controller.release(converted_key)
-                        logger.debug(f"Long key name '{direction}' -> {converted_key}")
+                        logger.debug(
+                            "Long key name '%s' -> %s", direction, converted_key
+                        )
                     except Exception:
                         keys_to_press = list(direction.lower())
 
@@ -280,7 +289,7 @@ class MovementManager:
                                     self.keyboard_controller.press(key)
                                 except Exception as e:
                                     logger.warning(
-                                        f"Failed to press legacy key '{key}': {e}"
+                                        "Failed to press legacy key '%s': %s", key, e
                                     )
 
                         time.sleep(walk_duration)
@@ -291,7 +300,7 @@ class MovementManager:
                                     self.keyboard_controller.release(key)
                                 except Exception as e:
                                     logger.warning(
-                                        f"Failed to release legacy key '{key}': {e}"
+                                        "Failed to release legacy key '%s': %s", key, e
                                     )
 
             self.is_walking = False
@@ -392,7 +401,10 @@ class MovementManager:
                     duration = base_duration * duration_multiplier
 
                     if total_items > 35 or initial_decrease > 0:
-                        logger.debug(f"Dynamic walkspeed applied: {duration_multiplier:.2f}x duration")
+                        logger.debug(
+                            "Dynamic walkspeed applied: %.2fx duration",
+                            duration_multiplier,
+                        )
                 
                 if isinstance(direction, str):
                     if direction.lower() in self.key_mapping:
@@ -402,7 +414,7 @@ class MovementManager:
                 else:
                     key = direction
 
-                logger.debug(f"Executing movement '{direction}' for {duration}s")
+                logger.debug("Executing movement '%s' for %ss", direction, duration)
                 
                 if hasattr(key, 'name'):
                     self.keyboard_controller.press(key)
@@ -1,3 +1,4 @@
+import fnmatch
 import os
 import re
 import threading
@@ -9,25 +10,51 @@ from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
 from utils.debug_logger import logger
+from utils.log_tail import KeywordMatcher, LogTail
+from utils.process_watch import RESCAN_BACKOFF_MAX, RESCAN_BACKOFF_MIN, ProcessWatcher
 from utils.system_utils import find_and_focus_roblox_window
 
 
+# Full directory scans are only a consistency check behind the watcher events
+LOG_RESCAN_INTERVAL = 30.0
+
+
 class RobloxLogFileHandler(FileSystemEventHandler):
     def __init__(self, monitor):
         super().__init__()
         self.monitor = monitor
 
+    def on_created(self, event):
+        if not event.is_directory:
+            self.monitor.note_log_file(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.monitor.note_log_file(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.monitor.forget_log_file(event.src_path)
+
     def on_modified(self, event):
-        if not event.is_directory and event.src_path == str(
-            self.monitor.current_log_file
-        ):
+        if event.is_directory:
+            return
+        self.monitor.note_log_file(event.src_path)
+        if event.src_path == str(self.monitor.current_log_file):
             self.monitor.process_log_file()
 
 
 class RobloxStatusMonitor:
-    def __init__(self, dig_tool_instance=None):
+    def __init__(
+        self,
+        dig_tool_instance=None,
+        log_path=None,
+        rescan_interval=LOG_RESCAN_INTERVAL,
+        process_rescan_backoff=(RESCAN_BACKOFF_MIN, RESCAN_BACKOFF_MAX),
+    ):
         self._stop_event = threading.Event()
         self.dig_tool = dig_tool_instance
+        self.process_watcher = ProcessWatcher("RobloxPlayer", *process_rescan_backoff)
         self.current_log_file = None
         self.current_file_position = 0
         self.log_observer = None
@@ -45,7 +72,30 @@ class RobloxStatusMonitor:
         )
         self.closing_keyword = "finished destroying luaApp"
         self.disconnect_regex = r"Sending disconnect with reason:\s*(\d+)"
-        self.log_path = Path.home() / "AppData" / "Local" / "Roblox" / "logs"
+        # A line reports the keyword that starts first in it
+        self.log_matcher = KeywordMatcher(
+            [
+                ("joining", self.joining_keyword),
+                ("joined", self.joined_keyword),
+                ("disconnect", self.disconnect_keyword),
+                ("leaving", self.leaving_keyword),
+                ("closing", self.closing_keyword),
+            ]
+        )
+        self.log_tail = None
+        self._log_tail_lock = threading.Lock()
+        self.log_path = (
+            Path(log_path)
+            if log_path is not None
+            else Path.home() / "AppData" / "Local" / "Roblox" / "logs"
+        )
+        # Newest player log as (path, mtime), kept current by watcher events
+        self.rescan_interval = rescan_interval
+        self._latest_log = None
+        self._latest_log_lock = threading.Lock()
+        self._latest_log_changed = threading.Event()
+        self._last_rescan_time = 0
+        self.log_rescans = 0
         self._last_notification_time = {}
         self._notification_cooldown = 10
         self._notification_lock = threading.Lock()
@@ -70,6 +120,7 @@ class RobloxStatusMonitor:
         with self._notification_lock:
             try:
                 from utils.config_management import get_param
+                from utils.discord_delivery import PRIORITY_ALERT
 
                 discord_enabled = get_param(self.dig_tool, "discord_enabled")
                 if not discord_enabled:
@@ -116,21 +167,68 @@ class RobloxStatusMonitor:
                         message=message,
                         user_id=user_id if user_id and user_id.strip() else None,
                         color=color,
+                        priority=PRIORITY_ALERT,
                     )
             except Exception as e:
                 logger.debug(f"Error sending Discord notification: {e}")
 
     def get_latest_log_file(self):
-        if not self.log_path.exists():
-            return None
+        with self._latest_log_lock:
+            return self._latest_log[0] if self._latest_log else None
+
+    def is_player_log(self, path):
+        name = os.path.basename(str(path))
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.file_patterns)
+
+    def note_log_file(self, path):
+        if not self.is_player_log(path):
+            return
+        try:
+            file_time = os.stat(path).st_mtime
+        except OSError:
+            return
+        path = Path(path)
+        with self._latest_log_lock:
+            if self._latest_log is not None:
+                latest_path, latest_time = self._latest_log
+                if latest_path == path:
+                    self._latest_log = (path, max(file_time, latest_time))
+                    return
+                if file_time < latest_time:
+                    return
+            self._latest_log = (path, file_time)
+        self._latest_log_changed.set()
+
+    def forget_log_file(self, path):
+        with self._latest_log_lock:
+            if self._latest_log is None or self._latest_log[0] != Path(path):
+                return
+        self.rescan_log_directory()
+
+    def rescan_log_directory(self):
+        # Globs and stats every player log, so only run at startup, when the
+        # indexed file disappears, and every rescan_interval as a check
+        self._last_rescan_time = time.time()
+        self.log_rescans += 1
         latest_file, latest_time = None, 0
-        for pattern in self.file_patterns:
-            for log_file in self.log_path.glob(pattern):
-                if (
-                    log_file.is_file()
-                    and (file_time := log_file.stat().st_mtime) > latest_time
-                ):
-                    latest_time, latest_file = file_time, log_file
+        if self.log_path.exists():
+            for pattern in self.file_patterns:
+                for log_file in self.log_path.glob(pattern):
+                    try:
+                        if (
+                            log_file.is_file()
+                            and (file_time := log_file.stat().st_mtime) > latest_time
+                        ):
+                            latest_time, latest_file = file_time, log_file
+                    except OSError:
+                        continue
+        with self._latest_log_lock:
+            previous = self._latest_log[0] if self._latest_log else None
+            self._latest_log = (latest_file, latest_time) if latest_file else None
+        if latest_file != previous:
+            if previous is not None:
+                logger.debug("Log rescan found %s, index had %s", latest_file, previous)
+            self._latest_log_changed.set()
         return latest_file
 
     def process_log_file(self):
@@ -140,24 +238,44 @@ class RobloxStatusMonitor:
             self.dig_tool, "auto_rejoin_enabled"
         ):
             return
-        try:
-            with open(
-                str(self.current_log_file), "r", encoding="utf-8", errors="ignore"
-            ) as f:
-                f.seek(self.current_file_position)
-                new_lines = [line.strip() for line in f]
-                self.current_file_position = f.tell()
-                for line in new_lines:
-                    self.parse_log_line(line)
-        except (PermissionError, FileNotFoundError, OSError) as e:
-            logger.debug(f"Error reading Roblox log file: {e}")
+        with self._log_tail_lock:
+            try:
+                if self.log_tail is None or self.log_tail.path != Path(
+                    self.current_log_file
+                ):
+                    self._open_log_tail(self.current_file_position)
+                self._read_log_tail()
+            except (PermissionError, FileNotFoundError, OSError) as e:
+                logger.debug(f"Error reading Roblox log file: {e}")
+                self._close_log_tail()
+
+    def _open_log_tail(self, position):
+        # Called with _log_tail_lock held
+        self._close_log_tail()
+        self.log_tail = LogTail(self.current_log_file).open(position)
+        self.current_file_position = self.log_tail.position
+
+    def _close_log_tail(self):
+        if self.log_tail is not None:
+            self.log_tail.close()
+            self.log_tail = None
+
+    def _read_log_tail(self):
+        for buffer in self.log_tail.read_chunks():
+            for event, line in self.log_matcher.scan(buffer):
+                self._handle_log_event(event, line)
+        self.current_file_position = self.log_tail.line_offset()
 
     def parse_log_line(self, line):
-        if self.joining_keyword in line:
+        if event := self.log_matcher.match_line(line):
+            self._handle_log_event(event, line)
+
+    def _handle_log_event(self, event, line):
+        if event == "joining":
             logger.info("Roblox: Game joining detected")
             self.reset_status(preserve_automation_state=True)
             self.is_joining = True
-        elif self.joined_keyword in line:
+        elif event == "joined":
             current_time = time.time()
             if current_time - self._last_processed_joined_time < 5:
                 return
@@ -182,7 +300,7 @@ class RobloxStatusMonitor:
                     self.dig_tool.rejoiner._max_attempts_reached = False
                     self.dig_tool.rejoiner.rejoin_attempts = 0
                 self._resume_automation_after_rejoin()
-        elif self.disconnect_keyword in line:
+        elif event == "disconnect":
             reason = (
                 (match := re.search(self.disconnect_regex, line))
                 and match.group(1)
@@ -206,12 +324,12 @@ class RobloxStatusMonitor:
                 ),
                 color=0xFF4757,
             )
-        elif self.leaving_keyword in line:
+        elif event == "leaving":
             logger.info("Roblox: Player left game")
             self.reset_status(clear_notifications=False, preserve_automation_state=True)
             self.is_game_left = True
             self._pause_automation_on_disconnect()
-        elif self.closing_keyword in line:
+        elif event == "closing":
             logger.info("Roblox: Application closed")
             self.reset_status(clear_notifications=False, preserve_automation_state=True)
             self.is_roblox_closed = True
@@ -241,44 +359,30 @@ class RobloxStatusMonitor:
                 time.sleep(check_interval)
                 continue
             next_interval = check_interval
+            if time.time() - self._last_rescan_time >= self.rescan_interval:
+                self.rescan_log_directory()
+            self._latest_log_changed.clear()
             if (latest_file := self.get_latest_log_file()) and str(latest_file) != str(
                 self.current_log_file
             ):
                 old_file = self.current_log_file
                 self.current_log_file = latest_file
                 logger.info(f"Switching to new log file: {self.current_log_file}")
-                try:
-                    with open(
-                        str(self.current_log_file),
-                        "r",
-                        encoding="utf-8",
-                        errors="ignore",
-                    ) as f:
-                        if old_file is None:
-                            f.seek(0, 2)
-                            self.current_file_position = f.tell()
-                        else:
-                            content = f.read()
-                            self.current_file_position = f.tell()
-                            lines = content.strip().split("\n")
+                # A new player log means a client started, possibly under a new PID
+                self.process_watcher.reset()
+                with self._log_tail_lock:
+                    try:
+                        # A fresh session's log is streamed from the start; on
+                        # the first pick only lines written from now on count
+                        self._open_log_tail(None if old_file is None else 0)
+                        if old_file is not None:
+                            self._read_log_tail()
                             logger.info(
-                                f"Processing {len(lines)} lines from new log file"
+                                f"Processed {self.log_tail.bytes_read} bytes from new log file"
                             )
-                            for line in lines:
-                                if line.strip():
-                                    self.parse_log_line(line.strip())
-                except Exception as e:
-                    logger.debug(f"Error reading new log file: {e}")
-                    try:
-                        with open(
-                            str(self.current_log_file),
-                            "r",
-                            encoding="utf-8",
-                            errors="ignore",
-                        ) as f:
-                            f.seek(0, 0)
-                            self.current_file_position = f.tell()
-                    except Exception:
+                    except Exception as e:
+                        logger.debug(f"Error reading new log file: {e}")
+                        self._close_log_tail()
                         self.current_file_position = 0
                 if old_file:
                     self.reset_status(
@@ -289,17 +393,22 @@ class RobloxStatusMonitor:
                 time_since_rejoin = time.time() - self.last_rejoin_attempt
                 if time_since_rejoin < 30:
                     next_interval = 0.5
-            time.sleep(next_interval)
+            # Watcher events wake the loop as soon as a newer log shows up
+            self._latest_log_changed.wait(next_interval)
 
     def start(self):
         logger.info("Starting Roblox status monitoring...")
+        self._last_rescan_time = 0
         threading.Thread(target=self.monitor_log_files, daemon=True).start()
         self.start_file_watcher()
 
     def stop(self):
         logger.info("Stopping Roblox status monitoring...")
         self._stop_event.set()
+        self._latest_log_changed.set()
         self.stop_file_watcher()
+        with self._log_tail_lock:
+            self._close_log_tail()
 
     def can_rejoin(self):
         return (
@@ -311,14 +420,8 @@ class RobloxStatusMonitor:
 
     def is_roblox_running(self):
         try:
-            import psutil
-
-            return any(
-                "RobloxPlayer" in proc.name()
-                for proc in psutil.process_iter()
-                if proc.name()
-            )
-        except:
+            return self.process_watcher.is_running()
+        except Exception:
             return True
 
     def _pause_automation_on_disconnect(self):
@@ -443,6 +546,8 @@ class RobloxRejoiner:
             self.kill_roblox()
             time.sleep(1)
             webbrowser.open(url)
+            # The new client gets a new PID, so look for it on the next check
+            self.status_monitor.process_watcher.reset()
             return True
         except Exception as e:
             logger.error(f"Failed to launch Roblox: {e}")
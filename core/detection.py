@@ -1,5 +1,5 @@
 import numpy as np
-import collections
+import math
 import cv2
 
 
@@ -113,29 +113,92 @@ def apply_line_exclusion(mask, cursor_pos, game_area, line_exclusion_radius):
     return mask
 
 
+class LineGradientBuffers:
+    def __init__(self):
+        self.height = 0
+        self.width = 0
+        self.left_right_diff = None
+        self.center_left_diff = None
+        self.gradients = None
+        self.strong_mask = None
+        self.vertical_sum = None
+        self.strong_count = None
+
+    def get(self, height, width):
+        # Grow-only, so narrow tracking windows reuse the full-scan buffers
+        if height > self.height or width > self.width:
+            self.height = max(height, self.height)
+            self.width = max(width, self.width)
+            shape = (self.height, self.width)
+            self.left_right_diff = np.empty(shape, dtype=np.uint8)
+            self.center_left_diff = np.empty(shape, dtype=np.uint8)
+            self.gradients = np.empty(shape, dtype=np.uint16)
+            self.strong_mask = np.empty(shape, dtype=np.uint8)
+            self.vertical_sum = np.empty((1, self.width), dtype=np.float32)
+            self.strong_count = np.empty((1, self.width), dtype=np.int32)
+        return (
+            self.left_right_diff[:height, :width],
+            self.center_left_diff[:height, :width],
+            self.gradients[:height, :width],
+            self.strong_mask[:height, :width],
+            self.vertical_sum[:, :width],
+            self.strong_count[:, :width],
+        )
+
+
 def find_line_position(
-    gray_array, sensitivity_threshold=50, min_height_ratio=0.7, offset=0
+    gray_array,
+    sensitivity_threshold=50,
+    min_height_ratio=0.7,
+    offset=0,
+    search_range=None,
+    buffers=None,
 ):
     height, width = gray_array.shape
-    if width < 3:
+    # search_range limits candidate columns to [start, end); each column's
+    # gradient only depends on its neighbours, so a window gives the same
+    # per-column scores as a full scan
+    column_offset = 0
+    if search_range is not None:
+        start, end = search_range
+        column_offset = max(start - 1, 0)
+        gray_array = gray_array[:, column_offset : min(end + 1, width)]
+    if gray_array.shape[1] < 3:
         return -1
+    if buffers is None:
+        buffers = LineGradientBuffers()
     thresh = sensitivity_threshold * height * 0.2
     strong_edge_threshold = sensitivity_threshold * 0.5
     min_pixels = height * min_height_ratio
-    left_right_diff = np.abs(
-        gray_array[:, 2:].astype(np.float32) - gray_array[:, :-2].astype(np.float32)
+
+    # Gradients are at most 510, so uint16 holds them exactly and the float32
+    # column sums stay exact below 2**24, matching the old float32 kernel
+    (
+        left_right_diff,
+        center_left_diff,
+        gradients,
+        strong_mask,
+        vertical_sum,
+        strong_count,
+    ) = buffers.get(height, gray_array.shape[1] - 2)
+    cv2.absdiff(gray_array[:, 2:], gray_array[:, :-2], dst=left_right_diff)
+    cv2.absdiff(gray_array[:, 1:-1], gray_array[:, :-2], dst=center_left_diff)
+    cv2.add(left_right_diff, center_left_diff, dst=gradients, dtype=cv2.CV_16U)
+    cv2.reduce(gradients, 0, cv2.REDUCE_SUM, dst=vertical_sum, dtype=cv2.CV_32F)
+
+    # Integer gradients: g > t is g > floor(t), and count >= m is count >= ceil(m)
+    cv2.compare(
+        gradients, math.floor(strong_edge_threshold), cv2.CMP_GT, dst=strong_mask
     )
-    center_left_diff = np.abs(
-        gray_array[:, 1:-1].astype(np.float32) - gray_array[:, :-2].astype(np.float32)
+    cv2.reduce(strong_mask, 0, cv2.REDUCE_SUM, dst=strong_count, dtype=cv2.CV_32S)
+    vertical_sum = vertical_sum[0]
+    valid_mask = (vertical_sum > thresh) & (
+        strong_count[0] >= math.ceil(min_pixels) * 255
     )
-    gradients = left_right_diff + center_left_diff
-    vertical_sum = np.sum(gradients, axis=0)
-    strong_pixel_count = np.sum(gradients > strong_edge_threshold, axis=0)
-    valid_mask = (vertical_sum > thresh) & (strong_pixel_count >= min_pixels)
     if not np.any(valid_mask):
         return -1
     best_idx = np.argmax(vertical_sum * valid_mask)
-    detected_position = best_idx + 1
+    detected_position = best_idx + 1 + column_offset
     if offset is None:
         offset = 0.0
     final_position = detected_position + float(offset)
@@ -143,92 +206,210 @@ def find_line_position(
     return max(0, min(final_position, width - 1))
 
 
+class ZoneProjectionBuffers:
+    def __init__(self):
+        self.width = 0
+        self.column_counts = None
+
+    def get(self, width):
+        if width > self.width:
+            self.width = width
+            self.column_counts = np.empty((1, self.width), dtype=np.int32)
+        return self.column_counts[:, :width]
+
+
+def find_zone_span(mask, gap_tolerance=28, column_offset=0, buffers=None):
+    # Column-occupancy projection of the zone mask: occupied columns are
+    # grouped into runs, bridging gaps up to gap_tolerance columns the way the
+    # old closing pass bridged the hole left by the line, and the run holding
+    # the most mask pixels is the zone. Returns its bounding (x, width, height)
+    # in full-frame columns, or None for an empty mask.
+    height, width = mask.shape
+    if height == 0 or width == 0:
+        return None
+    if buffers is None:
+        buffers = ZoneProjectionBuffers()
+    column_counts = buffers.get(width)
+    cv2.reduce(mask, 0, cv2.REDUCE_SUM, dst=column_counts, dtype=cv2.CV_32S)
+    counts = column_counts[0]
+    occupied = np.flatnonzero(counts)
+    if len(occupied) == 0:
+        return None
+
+    breaks = np.flatnonzero(np.diff(occupied) > gap_tolerance + 1)
+    if len(breaks) == 0:
+        start, end = occupied[0], occupied[-1]
+    else:
+        starts = occupied[np.r_[0, breaks + 1]]
+        ends = occupied[np.r_[breaks, len(occupied) - 1]]
+        # Columns between runs are empty, so summing from each run start to
+        # the next gives each run's pixel count
+        run = int(np.argmax(np.add.reduceat(counts, starts)))
+        start, end = starts[run], ends[run]
+
+    _, _, _, span_height = cv2.boundingRect(mask[:, start : end + 1])
+    return int(start) + column_offset, int(end - start) + 1, span_height
+
+
+class SampleWindow:
+    def __init__(self, capacity, columns=None):
+        self.capacity = max(int(capacity), 1)
+        self.columns = columns
+        # Twice the capacity so an append only occasionally slides the newest
+        # samples back to the front, and the live window stays one contiguous,
+        # oldest-first view without any per-sample allocation
+        shape = (self.capacity * 2,) if columns is None else (self.capacity * 2, columns)
+        self._data = np.zeros(shape, dtype=np.float64)
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        end = self._start + self._count
+        if end == len(self._data):
+            keep = self.capacity - 1
+            self._data[:keep] = self._data[end - keep : end]
+            self._start = 0
+            self._count = keep
+            end = keep
+        self._data[end] = value
+        if self._count == self.capacity:
+            self._start += 1
+        else:
+            self._count += 1
+
+    def values(self):
+        return self._data[self._start : self._start + self._count]
+
+    def resize(self, capacity):
+        capacity = max(int(capacity), 1)
+        recent = self.values()[-capacity:]
+        data = np.zeros((capacity * 2,) + self._data.shape[1:], dtype=np.float64)
+        data[: len(recent)] = recent
+        self._data = data
+        self.capacity = capacity
+        self._start = 0
+        self._count = len(recent)
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+
+
 class VelocityCalculator:
     def __init__(self, history_length=12):
-        self.position_history = collections.deque(maxlen=history_length)
-        self.velocity_history = collections.deque(maxlen=6)
+        self.position_history = SampleWindow(history_length, columns=2)
+        self.velocity_history = SampleWindow(6)
         self._smoothing_weights = np.array([0.15, 0.25, 0.35, 0.25], dtype=np.float32)
         self._time_interval = 1.0 / 120.0
         self._fps = 120.0
         self._adaptive_history_length = history_length
+        self._exp_weight_cache = {}
+        self._smoothing_weight_cache = {}
+        self._allocate_scratch()
+        self.current_velocity = 0.0
+        self._acceleration = 0
+        self._consistency = 0.7
+
+    def _allocate_scratch(self):
+        length = self.position_history.capacity
+        self._relative_times = np.empty(length, dtype=np.float64)
+        self._position_diffs = np.empty(length, dtype=np.float64)
+        self._time_diffs = np.empty(length, dtype=np.float64)
+        self._velocities = np.empty(length, dtype=np.float64)
+        self._abs_velocities = np.empty(length, dtype=np.float64)
+        self._valid_mask = np.empty(length, dtype=bool)
+        self._velocity_sample = np.empty(len(self._smoothing_weights), dtype=np.float32)
 
     def update_fps(self, fps):
-        self._fps = max(fps, 1.0)
+        fps = max(fps, 1.0)
+        fps_changed = fps != self._fps
+        self._fps = fps
         self._time_interval = 1.0 / self._fps
         new_history_length = max(int(12 * (self._fps / 60.0)), 6)
         if new_history_length != self._adaptive_history_length:
             self._adaptive_history_length = new_history_length
-            new_position_history = collections.deque(maxlen=new_history_length)
-            new_position_history.extend(
-                list(self.position_history)[-new_history_length:]
-            )
-            self.position_history = new_position_history
-            new_velocity_length = max(int(6 * (self._fps / 60.0)), 4)
-            new_velocity_history = collections.deque(maxlen=new_velocity_length)
-            new_velocity_history.extend(
-                list(self.velocity_history)[-new_velocity_length:]
-            )
-            self.velocity_history = new_velocity_history
+            self.position_history.resize(new_history_length)
+            self.velocity_history.resize(max(int(6 * (self._fps / 60.0)), 4))
+            self._allocate_scratch()
+        if fps_changed:
+            self._update_estimates()
 
     def add_position(self, position, timestamp):
         if position == -1:
             return 0
         self.position_history.append((position, timestamp))
-        return self.calculate_velocity()
+        self.current_velocity = self.calculate_velocity()
+        return self.current_velocity
 
     def calculate_velocity(self):
-        hist_len = len(self.position_history)
+        history = self.position_history.values()
+        hist_len = len(history)
         if hist_len < 2:
             return 0
-        valid_points = [(pos, t) for pos, t in self.position_history if pos != -1]
-        valid_len = len(valid_points)
-        if valid_len < 2:
-            return 0
         fps_scale = self._fps / 120.0
         min_samples_needed = max(int(2 * fps_scale), 2)
-        if valid_len >= min_samples_needed and valid_len >= 3:
-            velocity = self._fps_aware_velocity_calculation(valid_points)
+        if hist_len >= min_samples_needed and hist_len >= 3:
+            velocity = self._fps_aware_velocity_calculation(history)
         else:
-            pos1, t1 = valid_points[-2]
-            pos2, t2 = valid_points[-1]
+            pos1, t1 = history[-2]
+            pos2, t2 = history[-1]
             dt = t2 - t1
-            velocity = (pos2 - pos1) / dt if dt > 0 else 0
+            velocity = float((pos2 - pos1) / dt) if dt > 0 else 0
         velocity = self._apply_fps_smoothing(velocity)
         self.velocity_history.append(velocity)
+        self._update_estimates()
         return self._smooth_velocity_optimized()
 
-    def _fps_aware_velocity_calculation(self, points):
-        points_len = len(points)
+    def _fps_aware_velocity_calculation(self, history):
+        points_len = len(history)
         if points_len < 3:
             return 0
-        positions = np.array([pos for pos, _ in points], dtype=np.float64)
-        timestamps = np.array([t for _, t in points], dtype=np.float64)
-
-        timestamps = timestamps - timestamps[0]
+        diff_len = points_len - 1
+        positions = history[:, 0]
+        timestamps = np.subtract(
+            history[:, 1], history[0, 1], out=self._relative_times[:points_len]
+        )
 
-        pos_diffs = np.diff(positions)
-        time_diffs = np.diff(timestamps)
-        valid_times = time_diffs > 1e-6
-        if not np.any(valid_times):
-            return 0
-        velocities = np.divide(
-            pos_diffs, time_diffs, out=np.zeros_like(pos_diffs), where=valid_times
+        pos_diffs = np.subtract(
+            positions[1:], positions[:-1], out=self._position_diffs[:diff_len]
         )
-        velocities = velocities[valid_times]
-        if len(velocities) == 0:
-            return 0
-        if len(velocities) == 1:
-            return velocities[0]
+        time_diffs = np.subtract(
+            timestamps[1:], timestamps[:-1], out=self._time_diffs[:diff_len]
+        )
+        valid_times = np.greater(time_diffs, 1e-6, out=self._valid_mask[:diff_len])
+        if valid_times.all():
+            velocities = np.divide(
+                pos_diffs, time_diffs, out=self._velocities[:diff_len]
+            )
+        else:
+            if not np.any(valid_times):
+                return 0
+            velocities = pos_diffs[valid_times] / time_diffs[valid_times]
+        vel_len = len(velocities)
+        if vel_len == 1:
+            return float(velocities[0])
         fps_factor = min(self._fps / 60.0, 2.0)
-        noise_filter_threshold = 10.0 / fps_factor
-        filtered_velocities = velocities[np.abs(velocities) < 20000]
-        if len(filtered_velocities) == 0:
-            filtered_velocities = velocities
-        vel_len = len(filtered_velocities)
+        in_range = np.less(
+            np.abs(velocities, out=self._abs_velocities[:vel_len]),
+            20000,
+            out=self._valid_mask[:vel_len],
+        )
+        if not in_range.all() and np.any(in_range):
+            velocities = velocities[in_range]
+        return float(np.dot(velocities, self._exp_weights(len(velocities), fps_factor)))
+
+    def _exp_weights(self, count, fps_factor):
         time_weight_factor = min(fps_factor, 1.5)
-        exp_weights = np.exp(np.linspace(-1 * time_weight_factor, 0, vel_len))
-        exp_weights /= np.sum(exp_weights)
-        return float(np.dot(filtered_velocities, exp_weights))
+        key = (count, time_weight_factor)
+        weights = self._exp_weight_cache.get(key)
+        if weights is None:
+            weights = np.exp(np.linspace(-1 * time_weight_factor, 0, count))
+            weights /= np.sum(weights)
+            self._exp_weight_cache[key] = weights
+        return weights
 
     def _apply_fps_smoothing(self, velocity):
         if self._fps < 60:
@@ -238,50 +419,92 @@ class VelocityCalculator:
         else:
             smoothing_factor = 0.4
         if len(self.velocity_history) > 0:
-            last_velocity = self.velocity_history[-1]
+            last_velocity = float(self.velocity_history.values()[-1])
             return smoothing_factor * velocity + (1 - smoothing_factor) * last_velocity
         return velocity
 
+    def _smoothing_weights_for(self, count):
+        fps_factor = self._fps / 120.0
+        if fps_factor < 0.5:
+            exponent = 0.8
+        elif fps_factor > 1.5:
+            exponent = 1.2
+        else:
+            exponent = None
+        key = (count, exponent)
+        weights = self._smoothing_weight_cache.get(key)
+        if weights is None:
+            weights = self._smoothing_weights[-count:]
+            if exponent is not None:
+                weights = weights**exponent
+            weights = weights / np.sum(weights)
+            self._smoothing_weight_cache[key] = weights
+        return weights
+
     def _smooth_velocity_optimized(self):
-        hist_len = len(self.velocity_history)
+        history = self.velocity_history.values()
+        hist_len = len(history)
         if hist_len == 0:
             return 0
         if hist_len == 1:
-            return self.velocity_history[-1]
-        fps_factor = self._fps / 120.0
+            return float(history[-1])
         weights_count = min(hist_len, len(self._smoothing_weights))
-        weights = self._smoothing_weights[-weights_count:]
-        if fps_factor < 0.5:
-            weights = weights**0.8
-        elif fps_factor > 1.5:
-            weights = weights**1.2
-        weights = weights / np.sum(weights)
-        velocities = np.array(
-            list(self.velocity_history)[-weights_count:], dtype=np.float32
-        )
-        return np.dot(velocities, weights)
+        velocities = self._velocity_sample[:weights_count]
+        velocities[:] = history[-weights_count:]
+        return np.dot(velocities, self._smoothing_weights_for(weights_count))
+
+    # Acceleration and consistency only change when a velocity sample lands or
+    # the frame rate changes, so both are derived once here rather than on
+    # every call from the prediction and decision stages
+    def _update_estimates(self):
+        history = self.velocity_history.values()
+        hist_len = len(history)
+        if hist_len < 2:
+            self._acceleration = 0
+        else:
+            fps_factor = self._fps / 120.0
+            sample_count = max(int(3 * fps_factor), 2)
+            sample_count = min(sample_count, hist_len)
+            time_span = self._time_interval * (sample_count - 1)
+            acceleration = (
+                np.float32(history[-1]) - np.float32(history[-sample_count])
+            ) / time_span
+            acceleration_limit = 50000 * fps_factor
+            self._acceleration = np.clip(
+                acceleration, -acceleration_limit, acceleration_limit
+            )
+
+        if hist_len < 3:
+            self._consistency = 0.7
+        else:
+            recent_velocities = history[-3:]
+            velocity_std = np.std(recent_velocities)
+            velocity_mean = np.abs(np.mean(recent_velocities))
+            if velocity_mean == 0:
+                self._consistency = 0.0
+            else:
+                normalized_std = velocity_std / velocity_mean
+                consistency = 1.0 / (1.0 + normalized_std * 0.5)
+                self._consistency = min(max(consistency, 0.4), 1.0)
 
     def get_acceleration(self):
-        hist_len = len(self.velocity_history)
-        if hist_len < 2:
-            return 0
-        fps_factor = self._fps / 120.0
-        sample_count = max(int(3 * fps_factor), 2)
-        sample_count = min(sample_count, hist_len)
-        recent_velocities = np.array(
-            list(self.velocity_history)[-sample_count:], dtype=np.float32
-        )
-        if len(recent_velocities) < 2:
-            return 0
-        time_span = self._time_interval * (len(recent_velocities) - 1)
-        acceleration = (recent_velocities[-1] - recent_velocities[0]) / time_span
-        acceleration_limit = 50000 * fps_factor
-        return np.clip(acceleration, -acceleration_limit, acceleration_limit)
+        return self._acceleration
+
+    def get_display_velocity(self):
+        history = self.position_history.values()
+        if len(history) < 2:
+            return 0.0
+        pos1, t1 = history[-2]
+        pos2, t2 = history[-1]
+        if t2 > t1:
+            return float((pos2 - pos1) / (t2 - t1))
+        return 0.0
 
     def predict_position(self, current_pos, target_pos, current_time):
-        if len(self.velocity_history) == 0:
+        velocities = self.velocity_history.values()
+        if len(velocities) == 0:
             return current_pos, 0.0
-        velocity = self.velocity_history[-1]
+        velocity = float(velocities[-1])
         acceleration = self.get_acceleration()
         fps_factor = self._fps / 120.0
         if fps_factor < 0.5:
@@ -293,10 +516,9 @@ class VelocityCalculator:
         else:
             acceleration_weight = 0.5
             velocity_smoothing = 0.9
-        if len(self.velocity_history) >= 2:
-            velocity = (
-                velocity_smoothing * velocity
-                + (1 - velocity_smoothing) * self.velocity_history[-2]
+        if len(velocities) >= 2:
+            velocity = velocity_smoothing * velocity + (1 - velocity_smoothing) * float(
+                velocities[-2]
             )
         if abs(velocity) < 1.0:
             return current_pos, 0.0
@@ -380,16 +602,7 @@ class VelocityCalculator:
             return max(0.1, 0.5 - (prediction_time - 0.2) * 2.0)
 
     def _calculate_velocity_consistency(self):
-        if len(self.velocity_history) < 3:
-            return 0.7
-        recent_velocities = np.array(list(self.velocity_history)[-3:])
-        velocity_std = np.std(recent_velocities)
-        velocity_mean = np.abs(np.mean(recent_velocities))
-        if velocity_mean == 0:
-            return 0.0
-        normalized_std = velocity_std / velocity_mean
-        consistency = 1.0 / (1.0 + normalized_std * 0.5)
-        return min(max(consistency, 0.4), 1.0)
+        return self._consistency
 
     def _calculate_distance_factor(self, current_pos, target_pos, predicted_pos):
         current_distance = abs(current_pos - target_pos)
@@ -413,6 +626,216 @@ class VelocityCalculator:
     def reset(self):
         self.position_history.clear()
         self.velocity_history.clear()
+        self.current_velocity = 0.0
+        self._acceleration = 0
+        self._consistency = 0.7
+
+
+# Constant-acceleration Kalman filter over the line position. Each frame is a
+# handful of scalar updates on a 3-element state and the 6 distinct entries of
+# its symmetric covariance, so the cost does not depend on any history length.
+class KalmanLineTracker:
+    def __init__(
+        self,
+        measurement_noise=4.0,
+        process_noise=1e6,
+        innovation_gate=25.0,
+        max_gap=0.25,
+        position_tolerance=8.0,
+    ):
+        self.measurement_noise = measurement_noise
+        self.process_noise = process_noise
+        self.innovation_gate = innovation_gate
+        self.max_gap = max_gap
+        self.position_tolerance = position_tolerance
+        self._fps = 120.0
+        self.reset()
+
+    def reset(self):
+        self.position = 0.0
+        self.velocity = 0.0
+        self.acceleration = 0.0
+        self._p00 = self._p01 = self._p02 = 0.0
+        self._p11 = self._p12 = self._p22 = 0.0
+        self.state_timestamp = None
+        self.last_timestamp = None
+        self.last_measurement = None
+        self.previous_measurement = None
+        self.rejected_measurement = None
+        self.update_count = 0
+        self.current_velocity = 0.0
+
+    def update_fps(self, fps):
+        self._fps = max(fps, 1.0)
+
+    def _initialize(self, position, velocity=None, dt=0.0):
+        self.position = float(position)
+        self.acceleration = 0.0
+        self._p00 = self.measurement_noise
+        self._p02 = self._p12 = 0.0
+        self._p22 = 1000.0**2
+        if velocity is None or dt <= 0:
+            self.velocity = 0.0
+            self._p01 = 0.0
+            self._p11 = 4000.0**2
+        else:
+            # Two-point difference: its variance and correlation with the
+            # newest position follow from the measurement noise
+            self.velocity = float(velocity)
+            self._p01 = self.measurement_noise / dt
+            self._p11 = 2.0 * self.measurement_noise / (dt * dt)
+
+    def _predict(self, dt):
+        half_dt2 = 0.5 * dt * dt
+        self.position += self.velocity * dt + self.acceleration * half_dt2
+        self.velocity += self.acceleration * dt
+
+        p00, p01, p02 = self._p00, self._p01, self._p02
+        p11, p12, p22 = self._p11, self._p12, self._p22
+        # F P F^T for F = [[1, dt, dt^2/2], [0, 1, dt], [0, 0, 1]]
+        r00 = p00 + dt * p01 + half_dt2 * p02
+        r01 = p01 + dt * p11 + half_dt2 * p12
+        r02 = p02 + dt * p12 + half_dt2 * p22
+        r11 = p11 + dt * p12
+        r12 = p12 + dt * p22
+        # Plus continuous white-jerk process noise
+        q = self.process_noise
+        dt2 = dt * dt
+        dt3 = dt2 * dt
+        self._p00 = r00 + dt * r01 + half_dt2 * r02 + q * dt3 * dt2 / 20.0
+        self._p01 = r01 + dt * r02 + q * dt2 * dt2 / 8.0
+        self._p02 = r02 + q * dt3 / 6.0
+        self._p11 = r11 + dt * r12 + q * dt3 / 3.0
+        self._p12 = r12 + q * dt2 / 2.0
+        self._p22 = p22 + q * dt
+
+    def add_position(self, position, timestamp):
+        if position == -1:
+            return 0
+        if self.update_count == 0 or timestamp - self.state_timestamp > self.max_gap:
+            self._initialize(position)
+            self.update_count = 1
+        else:
+            dt = max(timestamp - self.state_timestamp, 0.0)
+            self._predict(dt)
+            self.state_timestamp = timestamp
+            innovation = position - self.position
+            innovation_variance = self._p00 + self.measurement_noise
+            if innovation * innovation > self.innovation_gate * innovation_variance:
+                if self.rejected_measurement is None:
+                    # A single stray detection is dropped; the state keeps
+                    # coasting on the prediction
+                    self.rejected_measurement = (float(position), timestamp)
+                    return self.velocity
+                # Two in a row means the line really changed course (it
+                # bounced off the end of the bar), so restart from the pair
+                # instead of letting the filter slowly unwind the old direction
+                rejected_position, rejected_time = self.rejected_measurement
+                pair_dt = timestamp - rejected_time
+                velocity = None
+                if pair_dt > 0:
+                    velocity = (position - rejected_position) / pair_dt
+                self._initialize(position, velocity, pair_dt)
+            else:
+                k0 = self._p00 / innovation_variance
+                k1 = self._p01 / innovation_variance
+                k2 = self._p02 / innovation_variance
+                self.position += k0 * innovation
+                self.velocity += k1 * innovation
+                self.acceleration += k2 * innovation
+                p00, p01, p02 = self._p00, self._p01, self._p02
+                self._p00 = p00 - k0 * p00
+                self._p01 = p01 - k0 * p01
+                self._p02 = p02 - k0 * p02
+                self._p11 -= k1 * p01
+                self._p12 -= k1 * p02
+                self._p22 -= k2 * p02
+            self.update_count += 1
+        self.rejected_measurement = None
+
+        self.previous_measurement = (self.last_measurement, self.last_timestamp)
+        self.last_measurement = float(position)
+        self.last_timestamp = timestamp
+        self.state_timestamp = timestamp
+        self.current_velocity = self.velocity
+        return self.velocity
+
+    def get_acceleration(self):
+        return self.acceleration
+
+    def get_display_velocity(self):
+        previous_position, previous_time = self.previous_measurement or (None, None)
+        if previous_position is None or self.last_timestamp <= previous_time:
+            return 0.0
+        return (self.last_measurement - previous_position) / (
+            self.last_timestamp - previous_time
+        )
+
+    def _predicted_variance(self, t):
+        # g^T P g for g = [1, t, t^2/2]
+        half_t2 = 0.5 * t * t
+        return (
+            self._p00
+            + 2.0 * t * self._p01
+            + 2.0 * half_t2 * self._p02
+            + t * t * self._p11
+            + 2.0 * t * half_t2 * self._p12
+            + half_t2 * half_t2 * self._p22
+        )
+
+    def predict_position(self, current_pos, target_pos, current_time):
+        if self.update_count < 3:
+            return current_pos, 0.0
+        elapsed = max(current_time - self.state_timestamp, 0.0)
+        position = (
+            self.position
+            + self.velocity * elapsed
+            + 0.5 * self.acceleration * elapsed * elapsed
+        )
+        velocity = self.velocity + self.acceleration * elapsed
+        acceleration = self.acceleration
+        if abs(velocity) < 10:
+            return current_pos, 0.0
+        distance_to_target = target_pos - position
+        if (distance_to_target > 0 and velocity <= 0) or (
+            distance_to_target < 0 and velocity >= 0
+        ):
+            return current_pos, 0.0
+
+        # First root of a/2 t^2 + v t - d = 0, in the form that stays stable
+        # as the acceleration goes to zero
+        discriminant = velocity * velocity + 2.0 * acceleration * distance_to_target
+        if discriminant < 0:
+            return current_pos, 0.0
+        prediction_time = (2.0 * distance_to_target) / (
+            velocity + math.copysign(math.sqrt(discriminant), velocity)
+        )
+        max_time = 0.5 * self._fps / 120.0
+        if prediction_time <= 0.005 or prediction_time > max_time:
+            return current_pos, 0.0
+        predicted_pos = (
+            position
+            + velocity * prediction_time
+            + 0.5 * acceleration * prediction_time * prediction_time
+        )
+        return predicted_pos, prediction_time
+
+    def get_prediction_confidence(
+        self, current_pos, target_pos, predicted_pos, prediction_time, fps
+    ):
+        if self.update_count < 3 or prediction_time <= 0:
+            return 0.0
+        variance = max(self._predicted_variance(prediction_time), 0.0)
+        return math.exp(-0.5 * variance / (self.position_tolerance**2))
+
+
+PREDICTION_METHODS = ("velocity", "kalman")
+
+
+def create_line_predictor(method="velocity"):
+    if method == "kalman":
+        return KalmanLineTracker()
+    return VelocityCalculator()
 
 
 def calculate_velocity_based_sweet_spot_width(
@@ -453,7 +876,7 @@ def detect_by_color_picker(hsv, target_color_hsv, color_tolerance=30, enable_det
         color_tolerance = max(1, min(90, int(color_tolerance)))
         
         if enable_detailed_logging:
-            logger.debug(f"Color picker detection: Target HSV={target_color_hsv}, Tolerance={color_tolerance}")
+            logger.debug("Color picker detection: Target HSV=%s, Tolerance=%s", target_color_hsv, color_tolerance)
         
         target_value = target_color_hsv[2]
         target_saturation = target_color_hsv[1]
@@ -489,7 +912,7 @@ def detect_by_color_picker(hsv, target_color_hsv, color_tolerance=30, enable_det
         )
 
         if enable_detailed_logging:
-            logger.debug(f"HSV bounds: Lower={lower_bound}, Upper={upper_bound}")
+            logger.debug("HSV bounds: Lower=%s, Upper=%s", lower_bound, upper_bound)
 
         if target_color_hsv[0] - h_tolerance < 0:
             mask1 = cv2.inRange(
@@ -546,7 +969,7 @@ def detect_by_color_picker(hsv, target_color_hsv, color_tolerance=30, enable_det
         detection_percent = (detected_pixels / total_pixels) * 100
         
         if enable_detailed_logging:
-            logger.debug(f"Detection result: {detected_pixels}/{total_pixels} pixels ({detection_percent:.1f}%)")
+            logger.debug("Detection result: %s/%s pixels (%.1f%%)", detected_pixels, total_pixels, detection_percent)
         
         return mask
         
@@ -1,4 +1,3 @@
-import requests
 import time
 import io
 import json
@@ -6,12 +5,78 @@ import threading
 from utils.debug_logger import logger
 from utils.config_management import get_param
 from utils.thread_utils import run_in_background
-from utils.screen_capture import ScreenCapture
+from utils.discord_screenshots import (
+    DEFAULT_MAX_DIMENSION,
+    DEFAULT_SCREENSHOT_PRESET,
+    DiscordScreenshotSource,
+)
+from utils.discord_delivery import (
+    PRIORITY_LIVE_STATS,
+    PRIORITY_NOTIFICATION,
+    SUCCESS_STATUS_CODES,
+    DiscordDeliveryWorker,
+)
+
+
+# Folds live-stats edit requests into at most one pending edit. The pending
+# edit reads the counters when it runs, so it always carries the latest state,
+# and it is held back until live_stats_min_interval has passed since the last
+# edit, so a burst of digs becomes a single PATCH.
+class StatsEditCoalescer:
+    def __init__(self, notifier):
+        self.notifier = notifier
+        self._lock = threading.Lock()
+        self._queued = False
+        self.requested = 0
+        self.coalesced = 0
+
+    def request(self, dig_tool_instance):
+        min_interval = max(float(get_param(dig_tool_instance, "live_stats_min_interval") or 0), 0.0)
+        with self._lock:
+            self.requested += 1
+            if self._queued:
+                self.coalesced += 1
+                return False
+            self._queued = True
+        delay = self.notifier.last_stats_edit_time + min_interval - time.monotonic()
+        self.notifier.delivery.submit(
+            self._flush, dig_tool_instance, priority=PRIORITY_LIVE_STATS, delay=delay, name="stats edit"
+        )
+        return True
+
+    def _flush(self, dig_tool_instance):
+        # The delayed job only paces edits; OCR and rendering run on their own
+        # thread, and just the PATCH goes back through the worker
+        run_in_background(self._read_and_edit, dig_tool_instance)
+
+    def _read_and_edit(self, dig_tool_instance):
+        with self._lock:
+            self._queued = False
+        money_value = None
+        enable_money_detection = get_param(dig_tool_instance, "enable_money_detection")
+        if enable_money_detection and hasattr(dig_tool_instance, 'money_ocr') and dig_tool_instance.money_ocr:
+            try:
+                money_value = dig_tool_instance.money_ocr.read_money_value()
+            except Exception as e:
+                logger.debug(f"Money OCR failed: {e}")
+        
+        item_counts = None
+        if hasattr(dig_tool_instance, 'item_counts_since_startup'):
+            item_counts = dig_tool_instance.item_counts_since_startup.copy()
+        
+        return self.notifier.update_stats_message(
+            digs=dig_tool_instance.dig_count,
+            clicks=getattr(dig_tool_instance, 'click_count', 0),
+            money_value=money_value,
+            item_counts=item_counts,
+            dig_tool_instance=dig_tool_instance
+        )
 
 
 class DiscordNotifier:
-    def __init__(self, webhook_url=None):
+    def __init__(self, webhook_url=None, dig_tool_instance=None):
         self.webhook_url = webhook_url
+        self.dig_tool = dig_tool_instance
         self.stats_message_id = None
         self.screenshot_message_id = None
         self.guild_id = None
@@ -19,21 +84,39 @@ class DiscordNotifier:
         self.last_screenshot_time = 0
         self.live_stats_thread = None
         self.live_stats_running = False
-        self.screen_capture = ScreenCapture()
+        self.screenshots = DiscordScreenshotSource(dig_tool_instance)
         self.previous_stats = {
             'digs': 0,
             'clicks': 0,
             'money_value': None,
             'item_counts': {}
         }
+        self.delivery = DiscordDeliveryWorker()
         self._update_lock = threading.Lock()
         self._pending_update = False
+        self.stats_coalescer = StatsEditCoalescer(self)
+        self.last_stats_edit_time = 0.0
+        self.stats_edits_sent = 0
+        self.stats_edits_skipped = 0
+        self._last_stats_embed = None
         self._screenshot_lock = threading.Lock()
         self._pending_screenshot = False
 
     def set_webhook_url(self, webhook_url):
         self.webhook_url = webhook_url
 
+    def close(self, timeout=2.0):
+        self.stop_live_stats_thread()
+        self.delivery.stop(timeout)
+        self.screenshots.close()
+
+    def _is_success(self, response):
+        return response is not None and response.status_code in SUCCESS_STATUS_CODES
+
+    def _message_edit_url(self, message_id):
+        webhook_url = str(self.webhook_url).split('?', 1)[0].rstrip('/')
+        return f"{webhook_url}/messages/{message_id}"
+
     def set_server_id(self, server_id):
         self.guild_id = server_id
         if not server_id:
@@ -49,54 +132,55 @@ class DiscordNotifier:
             return None
         return f"https://discord.com/channels/{self.guild_id}/{self.channel_id}/{self.stats_message_id}" if self.guild_id and self.channel_id and self.stats_message_id else None
 
-    def _capture_screenshot(self, screenshot_area=None):
+    def _screenshot_settings(self):
+        if self.dig_tool is None:
+            return DEFAULT_MAX_DIMENSION, DEFAULT_SCREENSHOT_PRESET
+        return (
+            get_param(self.dig_tool, "discord_screenshot_max_dimension"),
+            get_param(self.dig_tool, "discord_screenshot_preset"),
+        )
+
+    def _read_screenshot(self, screenshot_area=None):
+        # Encoded bytes rather than a buffer, so a retried upload sends the whole image again
         try:
+            bbox = None
             if screenshot_area:
                 x, y, width, height = screenshot_area
                 bbox = (x, y, x + width, y + height)
-                return self.screen_capture.capture_for_discord(bbox)
-            else:
-                return self.screen_capture.capture_for_discord()
+            max_dimension, preset = self._screenshot_settings()
+            return self.screenshots.capture(bbox, max_dimension, preset)
         except Exception as e:
             logger.error(f"Error capturing screenshot: {e}")
             return None
 
-    def _send_webhook_request(self, payload, include_screenshot=False, screenshot_area=None):
+    def _send_webhook_request(self, payload, include_screenshot=False, screenshot_area=None, priority=PRIORITY_NOTIFICATION):
         if not self.webhook_url:
             logger.warning("Discord webhook URL not set!")
             return False
 
-        buffer = self._capture_screenshot(screenshot_area) if include_screenshot else None
-        if include_screenshot and not buffer:
-            include_screenshot = False
+        image = self._read_screenshot(screenshot_area) if include_screenshot else None
 
         try:
-            if include_screenshot and buffer:
+            if image:
                 files = {
                     "payload_json": (None, json.dumps(payload), "application/json"),
-                    "file": ("screenshot.webp", buffer, "image/webp")
+                    "file": ("screenshot.webp", image, "image/webp")
                 }
-                response = requests.post(str(self.webhook_url), files=files, timeout=10)
+                response = self.delivery.request("POST", str(self.webhook_url), priority=priority, files=files)
             else:
-                response = requests.post(str(self.webhook_url), json=payload, headers={'Content-Type': 'application/json'}, timeout=10)
+                response = self.delivery.request("POST", str(self.webhook_url), priority=priority, json=payload)
 
-            if response.status_code in [200, 204]:
+            if self._is_success(response):
                 logger.info("Discord webhook sent successfully")
                 return response
             else:
-                logger.error(f"Discord webhook failed: {response.status_code}")
+                logger.error(f"Discord webhook failed: {response.status_code if response is not None else 'no response'}")
                 return False
         except Exception as e:
             logger.error(f"Error sending Discord webhook: {e}")
             return False
-        finally:
-            if buffer:
-                try:
-                    buffer.close()
-                except:
-                    pass
 
-    def send_notification(self, message, user_id=None, color=0x00ff00, include_screenshot=False, screenshot_area=None):
+    def send_notification(self, message, user_id=None, color=0x00ff00, include_screenshot=False, screenshot_area=None, priority=PRIORITY_NOTIFICATION):
         payload = {
             "content": f"<@{user_id}>" if user_id else "",
             "embeds": [{
@@ -107,7 +191,7 @@ class DiscordNotifier:
                 "image": {"url": "attachment://screenshot.webp"} if include_screenshot else None
             }]
         }
-        return bool(self._send_webhook_request(payload, include_screenshot, screenshot_area))
+        return bool(self._send_webhook_request(payload, include_screenshot, screenshot_area, priority))
 
     def send_initial_stats_message(self):
         payload = {
@@ -126,12 +210,15 @@ class DiscordNotifier:
         }
 
         try:
-            response = requests.post(f"{str(self.webhook_url)}?wait=true", json=payload, headers={'Content-Type': 'application/json'}, timeout=10)
-            if response.status_code in [200, 204]:
+            response = self.delivery.request("POST", f"{str(self.webhook_url)}?wait=true", json=payload)
+            if self._is_success(response):
                 if response.text and response.text.strip():
                     try:
                         response_data = response.json()
                         self.stats_message_id = response_data.get('id')
+                        # The new message shows zeroed stats and no edits yet
+                        self.previous_stats = self._stats_state(0, 0, None, None)
+                        self._last_stats_embed = None
                         self._extract_channel_id_from_response(response_data)
                         logger.info(f"Initial stats message sent, ID: {self.stats_message_id}")
                         
@@ -149,7 +236,10 @@ class DiscordNotifier:
                     logger.info("Initial stats message sent successfully (no message ID)")
                 return True
             else:
-                logger.error(f"Failed to send initial stats message: {response.status_code} - {response.text}")
+                if response is not None:
+                    logger.error(f"Failed to send initial stats message: {response.status_code} - {response.text}")
+                else:
+                    logger.error("Failed to send initial stats message: no response")
                 return False
         except Exception as e:
             logger.error(f"Error sending initial stats message: {e}")
@@ -167,11 +257,18 @@ class DiscordNotifier:
             with self._update_lock:
                 self._pending_update = False
 
-    def _update_stats_message_internal(self, digs, clicks=0, money_value=None, item_counts=None, dig_tool_instance=None):
-        if not self.webhook_url or not self.stats_message_id:
-            logger.error(f"Cannot update stats: webhook_url={bool(self.webhook_url)}, message_id={bool(self.stats_message_id)}")
-            return False
+    def queue_stats_update(self, dig_tool_instance):
+        return self.stats_coalescer.request(dig_tool_instance)
 
+    def _stats_state(self, digs, clicks, money_value, item_counts):
+        return {
+            'digs': digs,
+            'clicks': clicks,
+            'money_value': money_value,
+            'item_counts': item_counts.copy() if item_counts else {}
+        }
+
+    def _build_stats_embed(self, digs, clicks=0, money_value=None, item_counts=None):
         dig_increase = digs - self.previous_stats['digs']
         click_increase = clicks - self.previous_stats['clicks']
         
@@ -179,7 +276,6 @@ class DiscordNotifier:
             "title": "📊 Dig Tool Status",
             "color": 0x5865F2,
             "fields": [],
-            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
             "footer": {"text": "Live Stats"}
         }
 
@@ -209,28 +305,44 @@ class DiscordNotifier:
             embed["fields"].append({"name": "📦 Items Found", "value": items_text, "inline": False})
         else:
             embed["fields"].append({"name": "📦 Items Found", "value": "No items found yet", "inline": False})
+        return embed
 
+    def _update_stats_message_internal(self, digs, clicks=0, money_value=None, item_counts=None, dig_tool_instance=None):
+        if not self.webhook_url or not self.stats_message_id:
+            logger.error(f"Cannot update stats: webhook_url={bool(self.webhook_url)}, message_id={bool(self.stats_message_id)}")
+            return False
+
+        state = self._stats_state(digs, clicks, money_value, item_counts)
+        if state == self.previous_stats:
+            self.stats_edits_skipped += 1
+            logger.debug("Stats unchanged since the last edit, skipping")
+            return True
+
+        embed = self._build_stats_embed(digs, clicks, money_value, item_counts)
+        # Compared without the timestamp, which changes on every render
+        rendered = json.dumps(embed, sort_keys=True).encode("utf-8")
+        if rendered == self._last_stats_embed:
+            self.stats_edits_skipped += 1
+            self.previous_stats = state
+            logger.debug("Stats embed identical to the posted one, skipping")
+            return True
+
+        embed["timestamp"] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
         payload = {"embeds": [embed], "attachments": []}
 
         try:
-            webhook_parts = str(self.webhook_url).split('/')
-            webhook_id = webhook_parts[-2]
-            webhook_token = webhook_parts[-1]
-            
-            edit_url = f"https://discord.com/api/webhooks/{webhook_id}/{webhook_token}/messages/{self.stats_message_id}"
-            response = requests.patch(edit_url, json=payload, headers={'Content-Type': 'application/json'}, timeout=10)
+            edit_url = self._message_edit_url(self.stats_message_id)
+            self.last_stats_edit_time = time.monotonic()
+            response = self.delivery.request("PATCH", edit_url, priority=PRIORITY_LIVE_STATS, json=payload)
 
-            if response.status_code in [200, 204]:
+            if self._is_success(response):
                 logger.info("Stats message updated successfully")
-                self.previous_stats = {
-                    'digs': digs,
-                    'clicks': clicks,
-                    'money_value': money_value,
-                    'item_counts': item_counts.copy() if item_counts else {}
-                }
+                self.stats_edits_sent += 1
+                self.previous_stats = state
+                self._last_stats_embed = rendered
                 return True
             else:
-                logger.error(f"Failed to update stats message: {response.status_code}")
+                logger.error(f"Failed to update stats message: {response.status_code if response is not None else 'no response'}")
                 return False
                 
         except Exception as e:
@@ -249,8 +361,8 @@ class DiscordNotifier:
         }
 
         try:
-            response = requests.post(f"{str(self.webhook_url)}?wait=true", json=payload, headers={'Content-Type': 'application/json'}, timeout=10)
-            if response.status_code in [200, 204]:
+            response = self.delivery.request("POST", f"{str(self.webhook_url)}?wait=true", json=payload)
+            if self._is_success(response):
                 if response.text and response.text.strip():
                     try:
                         response_data = response.json()
@@ -263,7 +375,10 @@ class DiscordNotifier:
                     logger.info("Initial screenshot message sent successfully (no message ID)")
                 return True
             else:
-                logger.error(f"Failed to send initial screenshot message: {response.status_code} - {response.text}")
+                if response is not None:
+                    logger.error(f"Failed to send initial screenshot message: {response.status_code} - {response.text}")
+                else:
+                    logger.error("Failed to send initial screenshot message: no response")
                 return False
         except Exception as e:
             logger.error(f"Error sending initial screenshot message: {e}")
@@ -298,37 +413,27 @@ class DiscordNotifier:
         payload = {"embeds": [embed]}
 
         try:
-            webhook_parts = str(self.webhook_url).split('/')
-            webhook_id = webhook_parts[-2]
-            webhook_token = webhook_parts[-1]
+            edit_url = self._message_edit_url(self.screenshot_message_id)
             
-            edit_url = f"https://discord.com/api/webhooks/{webhook_id}/{webhook_token}/messages/{self.screenshot_message_id}"
-            
-            buffer = self._capture_screenshot()
-            if buffer:
-                try:
-                    payload["attachments"] = []
-                    files = {
-                        "payload_json": (None, json.dumps(payload), "application/json"),
-                        "file": ("screenshot.webp", buffer, "image/webp")
-                    }
-                    response = requests.patch(edit_url, files=files, timeout=10)
-                finally:
-                    try:
-                        buffer.close()
-                    except:
-                        pass
+            image = self._read_screenshot()
+            if image:
+                payload["attachments"] = []
+                files = {
+                    "payload_json": (None, json.dumps(payload), "application/json"),
+                    "file": ("screenshot.webp", image, "image/webp")
+                }
+                response = self.delivery.request("PATCH", edit_url, priority=PRIORITY_LIVE_STATS, files=files)
             else:
                 embed.pop("image", None)
                 embed["description"] = "Failed to capture screenshot"
                 payload = {"embeds": [embed], "attachments": []}
-                response = requests.patch(edit_url, json=payload, headers={'Content-Type': 'application/json'}, timeout=10)
+                response = self.delivery.request("PATCH", edit_url, priority=PRIORITY_LIVE_STATS, json=payload)
 
-            if response.status_code in [200, 204]:
+            if self._is_success(response):
                 logger.info("Screenshot message updated successfully")
                 return True
             else:
-                logger.error(f"Failed to update screenshot message: {response.status_code}")
+                logger.error(f"Failed to update screenshot message: {response.status_code if response is not None else 'no response'}")
                 return False
                 
         except Exception as e:
@@ -514,7 +619,7 @@ def test_discord_ping(dig_tool_instance):
                 dig_tool_instance.update_status(f"Discord ping test error: {e}")
                 logger.error(f"Discord ping test error: {e}")
         
-        run_in_background(test_and_report)
+        dig_tool_instance.discord_notifier.delivery.submit(test_and_report)
     except Exception as e:
         dig_tool_instance.update_status(f"Discord ping test error: {e}")
 
@@ -571,35 +676,10 @@ def check_milestone_notifications(dig_tool_instance):
                               dig_tool_instance.discord_notifier.stats_message_id)
 
         if should_update_stats:
-            with dig_tool_instance.discord_notifier._update_lock:
-                if dig_tool_instance.discord_notifier._pending_update:
-                    return
-                    
-            money_value = None
-            enable_money_detection = get_param(dig_tool_instance, "enable_money_detection")
-            if enable_money_detection and hasattr(dig_tool_instance, 'money_ocr') and dig_tool_instance.money_ocr:
-                try:
-                    money_value = dig_tool_instance.money_ocr.read_money_value()
-                except Exception as e:
-                    logger.debug(f"Money OCR failed: {e}")
-            
-            item_counts = None
-            if hasattr(dig_tool_instance, 'item_counts_since_startup'):
-                item_counts = dig_tool_instance.item_counts_since_startup.copy()
-            
             live_stats_per_dig_enabled = get_param(dig_tool_instance, "live_stats_per_dig_enabled")
             
             if live_stats_per_dig_enabled or should_send_milestone:
-                try:
-                    dig_tool_instance.discord_notifier.update_stats_message(
-                        digs=current_digs,
-                        clicks=getattr(dig_tool_instance, 'click_count', 0),
-                        money_value=money_value,
-                        item_counts=item_counts,
-                        dig_tool_instance=dig_tool_instance
-                    )
-                except Exception as e:
-                    logger.error(f"Error updating Discord stats: {e}")
+                dig_tool_instance.discord_notifier.queue_stats_update(dig_tool_instance)
 
     except Exception as e:
         logger.error(f"Error in check_milestone_notifications: {e}")
@@ -613,7 +693,7 @@ def _send_milestone_with_money(dig_tool_instance, skip_ocr=False):
     if server_id:
         dig_tool_instance.discord_notifier.set_server_id(server_id)
     
-    def send_milestone():
+    def read_and_send_milestone():
         try:
             current_digs = dig_tool_instance.dig_count
             money_value = None
@@ -622,22 +702,31 @@ def _send_milestone_with_money(dig_tool_instance, skip_ocr=False):
                     money_value = dig_tool_instance.money_ocr.read_money_value()
                 except Exception as e:
                     logger.error(f"Error reading money value: {e}")
-            
-            success = dig_tool_instance.discord_notifier.send_milestone_notification(
-                digs=current_digs,
-                clicks=getattr(dig_tool_instance, 'click_count', 0),
-                user_id=get_param(dig_tool_instance, "user_id") or None,
-                include_screenshot=get_param(dig_tool_instance, "include_screenshot_in_discord"),
-                money_value=money_value,
-                item_counts=dig_tool_instance.item_counts_since_startup.copy(),
-                dig_tool_instance=dig_tool_instance
-            )
-            if not success:
-                logger.error(f"Failed to send milestone notification for {current_digs} digs")
+            item_counts = dig_tool_instance.item_counts_since_startup.copy()
         except Exception as e:
             logger.error(f"Error in milestone notification thread: {e}")
+            return
+
+        # Only the webhook request waits its turn on the delivery worker
+        def send_milestone():
+            try:
+                success = dig_tool_instance.discord_notifier.send_milestone_notification(
+                    digs=current_digs,
+                    clicks=getattr(dig_tool_instance, 'click_count', 0),
+                    user_id=get_param(dig_tool_instance, "user_id") or None,
+                    include_screenshot=get_param(dig_tool_instance, "include_screenshot_in_discord"),
+                    money_value=money_value,
+                    item_counts=item_counts,
+                    dig_tool_instance=dig_tool_instance
+                )
+                if not success:
+                    logger.error(f"Failed to send milestone notification for {current_digs} digs")
+            except Exception as e:
+                logger.error(f"Error in milestone notification thread: {e}")
+
+        dig_tool_instance.discord_notifier.delivery.submit(send_milestone)
     
-    run_in_background(send_milestone)
+    run_in_background(read_and_send_milestone)
 
 
 def send_startup_notification(dig_tool_instance):
@@ -664,7 +753,7 @@ def send_startup_notification(dig_tool_instance):
                 except Exception as e:
                     logger.error(f"Error in startup notification thread: {e}")
             
-            run_in_background(send_startup)
+            dig_tool_instance.discord_notifier.delivery.submit(send_startup)
     except Exception as e:
         logger.error(f"Error in send_startup_notification: {e}")
 
@@ -740,12 +829,20 @@ def _check_item_text(dig_tool_instance):
                         item_area = dig_tool_instance.item_ocr.item_area if hasattr(dig_tool_instance.item_ocr, 'item_area') else None
                         user_id = get_param(dig_tool_instance, "user_id")
                         include_screenshot = get_param(dig_tool_instance, "include_screenshot_in_discord")
-                        success = dig_tool_instance.discord_notifier.send_item_notification(
-                            rarity, user_id or None, include_screenshot, item_area)
-                        if success:
-                            dig_tool_instance.update_status(f"Notified: {item_text}")
-                        else:
-                            logger.error(f"Failed to send item notification for {rarity} item")
+
+                        # Only the webhook request waits its turn on the delivery worker
+                        def send_item():
+                            try:
+                                success = dig_tool_instance.discord_notifier.send_item_notification(
+                                    rarity, user_id or None, include_screenshot, item_area)
+                                if success:
+                                    dig_tool_instance.update_status(f"Notified: {item_text}")
+                                else:
+                                    logger.error(f"Failed to send item notification for {rarity} item")
+                            except Exception as e:
+                                logger.error(f"Error in item notification thread: {e}")
+
+                        dig_tool_instance.discord_notifier.delivery.submit(send_item)
                 
         except Exception as e:
             logger.error(f"Error in item check thread: {e}")
@@ -776,6 +873,6 @@ def send_shutdown_notification(dig_tool_instance):
                 except Exception as e:
                     logger.error(f"Error in shutdown notification thread: {e}")
             
-            run_in_background(send_shutdown)
+            dig_tool_instance.discord_notifier.delivery.submit(send_shutdown)
     except Exception as e:
         logger.error(f"Error in send_shutdown_notification: {e}")
@@ -0,0 +1,1386 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from core.detection import (
+    LineGradientBuffers,
+    ZoneProjectionBuffers,
+    calculate_velocity_based_sweet_spot_width,
+    check_target_engagement,
+    detect_by_color_picker,
+    detect_by_otsu_adaptive_area,
+    detect_by_otsu_with_area_filter,
+    find_line_position,
+    find_zone_span,
+    get_hsv_bounds,
+    rgb_to_hsv_single,
+)
+from utils.auto_walk import AutoWalkMachine, WalkEvent
+from utils.debug_logger import logger
+from utils.screen_capture import gray_conversion_code, to_bgr
+
+
+# Scheduler key of the pending delayed dig click, so a newer prediction can
+# move it instead of queueing a second click
+DIG_CLICK_KEY = "dig_click"
+
+PIPELINE_STAGES = (
+    "capture",
+    "line_detect",
+    "zone_detect",
+    "predict",
+    "decide",
+    "act",
+    "publish",
+)
+
+
+class FrameContext:
+    def __init__(self):
+        self.params = None
+        self.reset(0.0, 0.0, None)
+
+    def reset(self, frame_start_time, current_time_ms, params):
+        self.frame_start_time = frame_start_time
+        self.current_time_ms = current_time_ms
+        self.params = params
+        self.game_fps = max(params.target_fps, 1) if params is not None else 120
+
+        self.screenshot = None
+        self.capture_time = 0.0
+        self.capture_timestamp = frame_start_time
+        self.frame_id = 0
+        self.frame_slot = None
+        self.height = 0
+        self.width = 0
+        self.height_80 = None
+        self.zone_y2 = None
+
+        self.line_pos = -1
+        self.velocity_line_pos = -1
+
+        self.final_mask = None
+        self.zone_detection_area = None
+        self.detection_info = None
+        self.raw_zone_x = None
+        self.raw_zone_w = None
+
+        self.velocity = 0
+        self.acceleration = 0
+        self.display_velocity = 0.0
+        self.sweet_spot_center = None
+        self.sweet_spot_start = None
+        self.sweet_spot_end = None
+
+        self.should_click = False
+        self.click_delay = 0
+        self.prediction_used = False
+        self.confidence = 0.0
+        self.click_sent = False
+        self.click_rescheduled = False
+
+
+class PipelineStage:
+    name = "stage"
+
+    def __init__(self, dig_tool_instance):
+        self.dig_tool = dig_tool_instance
+
+    def process(self, frame):
+        return True
+
+    def shutdown(self):
+        pass
+
+
+class CaptureStage(PipelineStage):
+    name = "capture"
+
+    frame_wait_timeout = 0.1
+
+    def __init__(self, dig_tool_instance):
+        super().__init__(dig_tool_instance)
+        self.held_slot = None
+        self.last_frame_id = 0
+
+    def process(self, frame):
+        capture_thread = getattr(self.dig_tool, "capture_thread", None)
+        if capture_thread is not None and capture_thread.is_alive():
+            return self._take_from_ring(frame, capture_thread.ring)
+        self._release_held_slot()
+        return self._capture_direct(frame)
+
+    def _release_held_slot(self):
+        if self.held_slot is not None:
+            self.held_slot.release()
+            self.held_slot = None
+
+    def _take_from_ring(self, frame, ring):
+        wait_start = time.perf_counter()
+        slot = ring.take_latest(self.last_frame_id, timeout=self.frame_wait_timeout)
+        frame.capture_time = time.perf_counter() - wait_start
+
+        if slot is None:
+            return False
+
+        # Frames published since the last take are stale and simply skipped
+        self._release_held_slot()
+        self.held_slot = slot
+        self.last_frame_id = slot.frame_id
+
+        screenshot = slot.buffer
+        frame.screenshot = screenshot
+        frame.capture_timestamp = slot.timestamp
+        frame.frame_id = slot.frame_id
+        frame.frame_slot = slot
+        frame.height, frame.width = screenshot.shape[:2]
+        return True
+
+    def _capture_direct(self, frame):
+        dig_tool = self.dig_tool
+        capture_start = time.perf_counter()
+        screenshot = dig_tool.cam.capture(
+            bbox=dig_tool.game_area, region_key=dig_tool.region_key, bgra=True
+        )
+        capture_end = time.perf_counter()
+        frame.capture_time = capture_end - capture_start
+
+        if screenshot is None:
+            return False
+
+        self.last_frame_id += 1
+        frame.screenshot = screenshot
+        frame.capture_timestamp = (capture_start + capture_end) * 0.5
+        frame.frame_id = self.last_frame_id
+        frame.height, frame.width = screenshot.shape[:2]
+        return True
+
+
+class LineDetectionStage(PipelineStage):
+    name = "line_detect"
+
+    # Tracking window: half-width in pixels plus the distance the line could
+    # have travelled since the last hit
+    track_margin = 24
+    track_velocity_margin = 0.5
+    max_track_age = 0.25
+    full_scan_interval = 60
+
+    def __init__(self, dig_tool_instance):
+        super().__init__(dig_tool_instance)
+        self.gray = None
+        self.line_buffers = LineGradientBuffers()
+        self.track_position = None
+        self.track_timestamp = 0.0
+        self.frames_since_full_scan = 0
+        self.tracked_frames = 0
+        self.full_scans = 0
+
+    def _get_search_range(self, frame):
+        if (
+            self.track_position is None
+            or self.frames_since_full_scan >= self.full_scan_interval
+        ):
+            return None
+        age = frame.capture_timestamp - self.track_timestamp
+        if age < 0 or age > self.max_track_age:
+            return None
+
+        velocity = self.dig_tool.velocity_calculator.current_velocity
+        predicted = self.track_position + velocity * age
+        half_width = self.track_margin + abs(velocity) * age * self.track_velocity_margin
+        if half_width * 4 >= frame.width:
+            return None
+
+        start = max(int(predicted - half_width), 1)
+        end = min(int(predicted + half_width) + 1, frame.width - 1)
+        if end - start < 3:
+            return None
+        return start, end
+
+    def _find_line(self, frame, line_sensitivity, line_min_height, line_offset):
+        search_range = None
+        if frame.params.line_tracking_enabled:
+            search_range = self._get_search_range(frame)
+
+        if search_range is not None:
+            line_pos = find_line_position(
+                self.gray,
+                line_sensitivity,
+                line_min_height,
+                line_offset,
+                search_range=search_range,
+                buffers=self.line_buffers,
+            )
+            if line_pos != -1:
+                self.tracked_frames += 1
+                self.frames_since_full_scan += 1
+                return line_pos
+
+        line_pos = find_line_position(
+            self.gray,
+            line_sensitivity,
+            line_min_height,
+            line_offset,
+            buffers=self.line_buffers,
+        )
+        self.full_scans += 1
+        self.frames_since_full_scan = 0
+        return line_pos
+
+    def process(self, frame):
+        dig_tool = self.dig_tool
+        params = frame.params
+        height, width = frame.height, frame.width
+
+        if self.gray is None or self.gray.shape != (height, width):
+            self.gray = np.empty((height, width), dtype=np.uint8)
+            self.track_position = None
+
+        cv2.cvtColor(
+            frame.screenshot, gray_conversion_code(frame.screenshot), dst=self.gray
+        )
+        line_sensitivity = params.line_sensitivity
+        line_min_height = 1.0
+        line_offset = params.line_detection_offset
+        if isinstance(line_offset, str):
+            line_offset = float(line_offset)
+        line_offset = int(line_offset)
+
+        line_pos = self._find_line(
+            frame, line_sensitivity, line_min_height, line_offset
+        )
+        if line_pos != -1:
+            self.track_position = line_pos - line_offset
+            self.track_timestamp = frame.capture_timestamp
+        else:
+            self.track_position = None
+
+        velocity_line_pos = line_pos
+        if line_pos == -1:
+            bottom_height = int(height * 0.3)
+            bottom_start = height - bottom_height
+            bottom_area = self.gray[bottom_start:, :]
+            velocity_line_pos = find_line_position(
+                bottom_area,
+                line_sensitivity,
+                line_min_height,
+                line_offset,
+                buffers=self.line_buffers,
+            )
+
+        if not hasattr(dig_tool, "_line_detection_stats"):
+            dig_tool._line_detection_stats = {
+                "detected": 0,
+                "failed": 0,
+                "last_positions": [],
+            }
+
+        if line_pos == -1:
+            dig_tool._line_detection_stats["failed"] += 1
+        else:
+            dig_tool._line_detection_stats["detected"] += 1
+            dig_tool._line_detection_stats["last_positions"].append(line_pos)
+            if len(dig_tool._line_detection_stats["last_positions"]) > 10:
+                dig_tool._line_detection_stats["last_positions"].pop(0)
+
+        frame.line_pos = line_pos
+        frame.velocity_line_pos = velocity_line_pos
+        return True
+
+
+class ZoneDetectionStage(PipelineStage):
+    name = "zone_detect"
+
+    # Runs of occupied mask columns closer than this are one zone; it matches
+    # the reach of the 15-wide closing kernel applied twice
+    zone_gap_tolerance = 28
+    # Tracking window: columns searched on either side of the last zone
+    track_margin = 32
+    full_scan_interval = 60
+
+    def __init__(self, dig_tool_instance):
+        super().__init__(dig_tool_instance)
+        self.final_mask = None
+        self.hsv = None
+        self.projection_buffers = ZoneProjectionBuffers()
+        self._cached_kernel = None
+        self._cached_kernel_size = 0
+        self.track_span = None
+        self.frames_since_full_scan = 0
+        self.tracked_frames = 0
+        self.full_scans = 0
+
+    def process(self, frame):
+        height, width = frame.height, frame.width
+        height_80 = int(height * 0.80)
+        frame.height_80 = height_80
+        frame.zone_y2 = height_80
+
+        self._detect_zone(frame)
+        self._smooth_zone(frame)
+        return True
+
+    def _threshold_saturation(self, hsv, saturation_threshold):
+        saturation = hsv[:, :, 1]
+        cv2.threshold(
+            saturation,
+            saturation_threshold,
+            255,
+            cv2.THRESH_BINARY,
+            dst=self.final_mask,
+        )
+
+    def _exclude_line(self, frame, line_exclusion_radius):
+        if line_exclusion_radius > 0 and frame.line_pos != -1:
+            cv2.rectangle(
+                self.final_mask,
+                (max(0, frame.line_pos - line_exclusion_radius), 0),
+                (min(frame.width, frame.line_pos + line_exclusion_radius), frame.height_80),
+                0,
+                -1,
+            )
+
+    def _build_unlocked_mask(self, frame, hsv, use_otsu):
+        params = frame.params
+        height, width = frame.height, frame.width
+        saturation_threshold = params.saturation_threshold
+        use_color_picker = params.use_color_picker_detection
+        detection_info = {}
+
+        if use_color_picker:
+            picked_color = params.picked_color_rgb
+            if picked_color and picked_color.strip() and picked_color != "":
+                try:
+                    picked_color = picked_color.strip()
+
+                    if picked_color.startswith("#"):
+                        picked_color = picked_color[1:]
+
+                    if len(picked_color) != 6:
+                        raise ValueError(
+                            f"Invalid hex color length: {len(picked_color)}"
+                        )
+
+                    rgb_color = int(picked_color, 16)
+                    target_hsv = rgb_to_hsv_single(rgb_color)
+
+                    color_tolerance_param = params.color_tolerance
+                    color_tolerance = (
+                        color_tolerance_param
+                        if isinstance(color_tolerance_param, int)
+                        else 30
+                    )
+
+                    self.final_mask = detect_by_color_picker(
+                        hsv, target_hsv, color_tolerance, False
+                    )
+
+                    detected_pixels = (
+                        np.sum(self.final_mask > 0)
+                        if self.final_mask is not None
+                        else 0
+                    )
+
+                    detection_info = {
+                        "method": "Color Picker",
+                        "target_color": f"#{picked_color}",
+                        "tolerance": color_tolerance,
+                        "target_hsv": f"H:{target_hsv[0]} S:{target_hsv[1]} V:{target_hsv[2]}",
+                        "detected_pixels": detected_pixels,
+                    }
+                except (ValueError, TypeError) as e:
+                    logger.warning("Color picker detection failed: %s", e)
+                    self._threshold_saturation(hsv, saturation_threshold)
+                    detection_info = {
+                        "method": "Saturation (Fallback)",
+                        "threshold": saturation_threshold,
+                        "error": f"Color picker failed: {e}",
+                    }
+            else:
+                self._threshold_saturation(hsv, saturation_threshold)
+                detection_info = {
+                    "method": "Saturation (No Color Picked)",
+                    "threshold": saturation_threshold,
+                }
+        elif use_otsu:
+            if params.otsu_adaptive_area:
+                area_percentile = params.otsu_area_percentile
+                morph_kernel = params.otsu_morph_kernel_size
+                self.final_mask, threshold_value = detect_by_otsu_adaptive_area(
+                    hsv,
+                    area_percentile=area_percentile,
+                    morph_kernel_size=morph_kernel,
+                )
+                detection_info = {
+                    "method": "Otsu (Adaptive)",
+                    "threshold": threshold_value,
+                    "area_percentile": area_percentile,
+                    "morph_kernel": morph_kernel,
+                }
+            else:
+                min_area = params.otsu_min_area
+                max_area_param = params.otsu_max_area
+                if (
+                    max_area_param == ""
+                    or max_area_param == "None"
+                    or max_area_param == 0
+                    or max_area_param is None
+                ):
+                    max_area = None
+                else:
+                    try:
+                        max_area = int(max_area_param)
+                    except (ValueError, TypeError):
+                        max_area = None
+                morph_kernel = params.otsu_morph_kernel_size
+                self.final_mask, threshold_value = detect_by_otsu_with_area_filter(
+                    hsv,
+                    min_area=min_area,
+                    max_area=max_area,
+                    morph_kernel_size=morph_kernel,
+                )
+                detection_info = {
+                    "method": "Otsu (Fixed Area)",
+                    "threshold": threshold_value,
+                    "min_area": min_area,
+                    "max_area": (max_area if max_area is not None else "Unlimited"),
+                    "morph_kernel": morph_kernel,
+                }
+        else:
+            self._threshold_saturation(hsv, saturation_threshold)
+            detection_info = {
+                "method": "Saturation Threshold",
+                "threshold": saturation_threshold,
+            }
+
+        line_exclusion_radius = params.line_exclusion_radius
+        self._exclude_line(frame, line_exclusion_radius)
+
+        if not use_otsu and line_exclusion_radius > 0:
+            kernel_size = max(3, int(min(width, height) * 0.008))
+            if self._cached_kernel is None or self._cached_kernel_size != kernel_size:
+                self._cached_kernel = cv2.getStructuringElement(
+                    cv2.MORPH_ELLIPSE, (kernel_size, kernel_size)
+                )
+                self._cached_kernel_size = kernel_size
+            cv2.morphologyEx(
+                self.final_mask,
+                cv2.MORPH_CLOSE,
+                self._cached_kernel,
+                dst=self.final_mask,
+                iterations=2,
+            )
+            cv2.morphologyEx(
+                self.final_mask,
+                cv2.MORPH_OPEN,
+                self._cached_kernel,
+                dst=self.final_mask,
+                iterations=1,
+            )
+
+        return detection_info, use_color_picker
+
+    def _build_locked_mask(self, frame, hsv, window=None):
+        dig_tool = self.dig_tool
+        params = frame.params
+        if (
+            dig_tool._last_hsv_color is None
+            or (
+                dig_tool.locked_color_hsv is not None
+                and not np.array_equal(dig_tool.locked_color_hsv, dig_tool._last_hsv_color)
+            )
+            or dig_tool._last_is_low_sat != dig_tool.is_low_sat_lock
+        ):
+            dig_tool._hsv_lower_bound_cache, dig_tool._hsv_upper_bound_cache = (
+                get_hsv_bounds(dig_tool.locked_color_hsv, dig_tool.is_low_sat_lock)
+            )
+            if dig_tool.locked_color_hsv is not None:
+                dig_tool._last_hsv_color = dig_tool.locked_color_hsv.copy()
+            dig_tool._last_is_low_sat = dig_tool.is_low_sat_lock
+        lower_bound, upper_bound = (
+            dig_tool._hsv_lower_bound_cache,
+            dig_tool._hsv_upper_bound_cache,
+        )
+
+        if lower_bound is not None and upper_bound is not None:
+            if window is None:
+                cv2.inRange(hsv, lower_bound, upper_bound, dst=self.final_mask)
+            else:
+                start, end = window
+                self.final_mask.fill(0)
+                cv2.inRange(
+                    hsv[:, start:end],
+                    lower_bound,
+                    upper_bound,
+                    dst=self.final_mask[:, start:end],
+                )
+            detection_info = {
+                "method": "Color Lock (HSV Range)",
+                "threshold": f"HSV: {lower_bound} - {upper_bound}",
+                "locked_color": (
+                    dig_tool.locked_color_hex
+                    if hasattr(dig_tool, "locked_color_hex")
+                    else "Unknown"
+                ),
+            }
+        else:
+            self.final_mask.fill(0)
+            detection_info = {
+                "method": "Color Lock (No Color)",
+                "threshold": "N/A",
+            }
+
+        self._exclude_line(frame, params.line_exclusion_radius)
+        return detection_info
+
+    def _lock_color(self, hsv, zone_x, zone_w):
+        dig_tool = self.dig_tool
+        zone_columns = slice(zone_x, zone_x + zone_w)
+        mean_hsv = cv2.mean(
+            hsv[:, zone_columns], mask=self.final_mask[:, zone_columns]
+        )
+        dig_tool.locked_color_hsv = np.array(mean_hsv[:3], dtype=np.float32)
+        dig_tool.is_color_locked = True
+        if dig_tool.locked_color_hsv is not None:
+            hsv_array = np.array(
+                [
+                    [
+                        [
+                            int(dig_tool.locked_color_hsv[0]),
+                            int(dig_tool.locked_color_hsv[1]),
+                            int(dig_tool.locked_color_hsv[2]),
+                        ]
+                    ]
+                ],
+                dtype=np.uint8,
+            )
+            bgr_color = cv2.cvtColor(hsv_array, cv2.COLOR_HSV2BGR)[0][0]
+            dig_tool.locked_color_hex = (
+                f"#{bgr_color[2]:02x}{bgr_color[1]:02x}{bgr_color[0]:02x}"
+            )
+        dig_tool.is_low_sat_lock = dig_tool.locked_color_hsv[1] < 25
+
+    def _get_zone_window(self, frame):
+        if (
+            self.track_span is None
+            or self.frames_since_full_scan >= self.full_scan_interval
+        ):
+            return None
+        zone_x, zone_w = self.track_span
+        start = max(zone_x - self.track_margin, 0)
+        end = min(zone_x + zone_w + self.track_margin, frame.width)
+        if (end - start) * 2 >= frame.width:
+            return None
+        return start, end
+
+    def _measure_zone(self, frame, window=None):
+        width = frame.width
+        column_offset = 0
+        mask = self.final_mask
+        if window is not None:
+            column_offset, end = window
+            mask = mask[:, column_offset:end]
+        span = find_zone_span(
+            mask,
+            gap_tolerance=self.zone_gap_tolerance,
+            column_offset=column_offset,
+            buffers=self.projection_buffers,
+        )
+        if span is None:
+            return None
+        x_temp, w_temp, h_temp = span
+        if window is not None and (
+            (x_temp == window[0] and window[0] > 0)
+            or (x_temp + w_temp == window[1] and window[1] < width)
+        ):
+            # The zone runs into the window edge, so it may extend past it
+            return None
+
+        params = frame.params
+        zone_min_width = params.zone_min_width
+        max_zone_width = width * (params.max_zone_width_percent / 100.0)
+        min_zone_height = frame.height_80 * (params.min_zone_height_percent / 100.0)
+        if (
+            w_temp > zone_min_width
+            and w_temp < max_zone_width
+            and h_temp >= min_zone_height
+        ):
+            return x_temp, w_temp
+        return None
+
+    def _detect_zone(self, frame):
+        dig_tool = self.dig_tool
+        params = frame.params
+        width, height_80 = frame.width, frame.height_80
+
+        if self.hsv is None or self.hsv.shape != (height_80, width, 3):
+            self.hsv = np.empty((height_80, width, 3), dtype=np.uint8)
+            self.track_span = None
+
+        zone_detection_area = frame.screenshot[:height_80, :]
+        hsv = self.hsv
+        frame.zone_detection_area = zone_detection_area
+
+        use_otsu = params.use_otsu_detection
+        otsu_disable_color_lock = params.otsu_disable_color_lock
+
+        if self.final_mask is None or self.final_mask.shape != (height_80, width):
+            self.final_mask = np.empty((height_80, width), dtype=np.uint8)
+
+        unlocked = not dig_tool.is_color_locked or (
+            use_otsu and otsu_disable_color_lock
+        )
+        zone = None
+        if not unlocked and params.zone_tracking_enabled:
+            # A locked colour only needs the columns around the last zone:
+            # convert and threshold just that slice, and fall back to the full
+            # frame when the zone is not cleanly inside it
+            window = self._get_zone_window(frame)
+            if window is not None:
+                start, end = window
+                # BGR2HSV also accepts BGRA input and ignores the alpha channel
+                cv2.cvtColor(
+                    zone_detection_area[:, start:end],
+                    cv2.COLOR_BGR2HSV,
+                    dst=hsv[:, start:end],
+                )
+                detection_info = self._build_locked_mask(frame, hsv, window)
+                zone = self._measure_zone(frame, window)
+                if zone is not None:
+                    self.tracked_frames += 1
+                    self.frames_since_full_scan += 1
+
+        use_color_picker = False
+        if zone is None:
+            cv2.cvtColor(zone_detection_area, cv2.COLOR_BGR2HSV, dst=hsv)
+            if unlocked:
+                detection_info, use_color_picker = self._build_unlocked_mask(
+                    frame, hsv, use_otsu
+                )
+            else:
+                detection_info = self._build_locked_mask(frame, hsv)
+            zone = self._measure_zone(frame)
+            self.full_scans += 1
+            self.frames_since_full_scan = 0
+
+        frame.final_mask = self.final_mask
+        frame.detection_info = detection_info
+        self.track_span = zone
+
+        if zone is not None:
+            frame.raw_zone_x, frame.raw_zone_w = zone
+            if (
+                not dig_tool.is_color_locked
+                and not (use_otsu and otsu_disable_color_lock)
+                and not use_color_picker
+            ):
+                self._lock_color(hsv, *zone)
+
+    def _smooth_zone(self, frame):
+        dig_tool = self.dig_tool
+        params = frame.params
+        raw_zone_x, raw_zone_w = frame.raw_zone_x, frame.raw_zone_w
+
+        if raw_zone_x is not None and raw_zone_w is not None:
+            dig_tool.automation_manager.update_target_lock_activity()
+            dig_tool.frames_since_last_zone_detection = 0
+
+            zone_smoothing_factor = params.zone_smoothing_factor
+
+            if dig_tool.smoothed_zone_x is None:
+                dig_tool.smoothed_zone_x, dig_tool.smoothed_zone_w = raw_zone_x, raw_zone_w
+            else:
+                position_change = abs(raw_zone_x - dig_tool.smoothed_zone_x)
+                width_change = abs(raw_zone_w - (dig_tool.smoothed_zone_w or 0))
+
+                if zone_smoothing_factor >= 1.0:
+                    adaptive_smoothing = 1.0
+                elif zone_smoothing_factor <= 0.01:
+                    adaptive_smoothing = zone_smoothing_factor
+                else:
+                    max_change_threshold = frame.width * 0.1
+                    if (
+                        position_change > max_change_threshold
+                        or width_change > max_change_threshold
+                    ):
+                        adaptive_smoothing = min(zone_smoothing_factor + 0.1, 1.0)
+                    else:
+                        adaptive_smoothing = zone_smoothing_factor
+
+                dig_tool.smoothed_zone_x = adaptive_smoothing * raw_zone_x + (
+                    1 - adaptive_smoothing
+                ) * (dig_tool.smoothed_zone_x or 0)
+                dig_tool.smoothed_zone_w = adaptive_smoothing * raw_zone_w + (
+                    1 - adaptive_smoothing
+                ) * (dig_tool.smoothed_zone_w or 0)
+        else:
+            dig_tool.frames_since_last_zone_detection += 1
+
+        zone_timeout_frames = max(int(frame.game_fps * 0.167), 5)
+        if dig_tool.frames_since_last_zone_detection > zone_timeout_frames:
+            dig_tool.is_color_locked = False
+            dig_tool.locked_color_hsv = None
+            dig_tool.locked_color_hex = None
+            dig_tool.smoothed_zone_x = None
+
+
+class PredictionStage(PipelineStage):
+    name = "predict"
+
+    def process(self, frame):
+        dig_tool = self.dig_tool
+        params = frame.params
+        velocity_calculator = dig_tool.velocity_calculator
+
+        frame.velocity = velocity_calculator.add_position(
+            frame.velocity_line_pos, frame.capture_timestamp
+        )
+        frame.acceleration = velocity_calculator.get_acceleration()
+
+        frame.display_velocity = velocity_calculator.get_display_velocity()
+
+        dig_tool.target_engaged = check_target_engagement(
+            dig_tool, frame.line_pos, frame.game_fps
+        )
+        dig_tool.automation_manager.engagement_signal.update(dig_tool.target_engaged)
+
+        if dig_tool.smoothed_zone_x is not None:
+            sweet_spot_center = (dig_tool.smoothed_zone_x or 0) + (
+                dig_tool.smoothed_zone_w or 0
+            ) / 2
+
+            base_sweet_spot_width_percent = (
+                params.sweet_spot_width_percent / 100.0
+            )
+            enabled = params.velocity_based_width_enabled
+            velocity_multiplier = params.velocity_width_multiplier
+            max_velocity_factor = params.velocity_max_factor
+
+            dynamic_sweet_spot_width_percent = (
+                calculate_velocity_based_sweet_spot_width(
+                    base_sweet_spot_width_percent * 100.0,
+                    frame.velocity,
+                    enabled=enabled,
+                    velocity_multiplier=velocity_multiplier,
+                    max_velocity_factor=max_velocity_factor,
+                )
+                / 100.0
+            )
+            sweet_spot_width = (
+                dig_tool.smoothed_zone_w or 0
+            ) * dynamic_sweet_spot_width_percent
+            frame.sweet_spot_center = sweet_spot_center
+            frame.sweet_spot_start = sweet_spot_center - sweet_spot_width / 2
+            frame.sweet_spot_end = sweet_spot_center + sweet_spot_width / 2
+        return True
+
+
+class DecisionStage(PipelineStage):
+    name = "decide"
+
+    startup_grace_period = 100
+
+    def __init__(self, dig_tool_instance):
+        super().__init__(dig_tool_instance)
+        # The auto-walk start click reuses the most recent prediction delay
+        self.click_delay = 0
+
+    def is_past_startup_grace(self, current_time_ms):
+        return (
+            not hasattr(self.dig_tool, "startup_time")
+            or (current_time_ms - self.dig_tool.startup_time) > self.startup_grace_period
+        )
+
+    def get_system_latency(self):
+        from utils.system_utils import get_cached_system_latency
+
+        return get_cached_system_latency(self.dig_tool) / 1000.0
+
+    def has_pending_click(self):
+        return self.dig_tool.click_scheduler.is_pending(DIG_CLICK_KEY)
+
+    def process(self, frame):
+        dig_tool = self.dig_tool
+        params = frame.params
+        frame.click_delay = self.click_delay
+
+        if not (
+            dig_tool.running
+            and frame.current_time_ms >= dig_tool.blind_until
+            and frame.sweet_spot_center is not None
+            and (
+                not dig_tool.click_lock.locked()
+                or (frame.params.reschedule_pending_clicks and self.has_pending_click())
+            )
+            and self.is_past_startup_grace(frame.current_time_ms)
+        ):
+            return True
+
+        should_click, click_delay, prediction_used, confidence = False, 0, False, 0.0
+
+        line_pos = frame.line_pos
+        velocity = frame.velocity
+        game_fps = frame.game_fps
+        sweet_spot_center = frame.sweet_spot_center
+        sweet_spot_start = frame.sweet_spot_start
+        sweet_spot_end = frame.sweet_spot_end
+
+        line_in_sweet_spot = (
+            sweet_spot_start is not None
+            and sweet_spot_end is not None
+            and sweet_spot_start <= line_pos <= sweet_spot_end
+        )
+
+        if params.prediction_enabled and line_pos != -1:
+            prediction_confidence_threshold = params.prediction_confidence_threshold
+            system_latency = self.get_system_latency()
+
+            is_moving_towards = (line_pos < sweet_spot_center and velocity > 0) or (
+                line_pos > sweet_spot_center and velocity < 0
+            )
+
+            if is_moving_towards:
+                predicted_pos, prediction_time = (
+                    dig_tool.velocity_calculator.predict_position(
+                        line_pos, sweet_spot_center, frame.capture_timestamp
+                    )
+                )
+
+                if prediction_time > 0:
+                    distance_to_center = abs(predicted_pos - sweet_spot_center)
+                    sweet_spot_radius = (
+                        (sweet_spot_end or 0) - (sweet_spot_start or 0)
+                    ) / 2
+
+                    if distance_to_center <= sweet_spot_radius:
+                        base_confidence = max(
+                            0.0, 1.0 - (distance_to_center / sweet_spot_radius)
+                        )
+                        velocity_confidence = (
+                            dig_tool.velocity_calculator.get_prediction_confidence(
+                                line_pos,
+                                sweet_spot_center,
+                                predicted_pos,
+                                prediction_time,
+                                game_fps,
+                            )
+                        )
+
+                        confidence = base_confidence * velocity_confidence
+
+                        fps_adjusted_threshold = (
+                            prediction_confidence_threshold * (game_fps / 120.0) ** 0.15
+                        )
+
+                        if confidence >= fps_adjusted_threshold:
+                            fps_latency_adjustment = (
+                                system_latency * (120.0 / game_fps) * 0.8
+                            )
+                            sleep_duration = prediction_time - fps_latency_adjustment
+
+                            if sleep_duration > 0:
+                                should_click, click_delay, prediction_used = (
+                                    True,
+                                    sleep_duration,
+                                    True,
+                                )
+
+        if not should_click and line_in_sweet_spot:
+            should_click = True
+            confidence = 1.0
+
+        self.click_delay = click_delay
+        frame.should_click = should_click
+        frame.click_delay = click_delay
+        frame.prediction_used = prediction_used
+        frame.confidence = confidence
+        return True
+
+
+# What the auto-walk state machine drives: walk steps on one worker thread,
+# start clicks through the click scheduler, dig bookkeeping and auto-sell.
+# Runs on the machine's thread; params are the ones of the latest frame.
+class AutoWalkActions:
+    def __init__(self, action_stage):
+        self.stage = action_stage
+        self.dig_tool = action_stage.dig_tool
+        self._walk_executor = None
+
+    def is_selling(self):
+        return self.dig_tool.automation_manager.is_selling
+
+    def state_changed(self, state):
+        self.dig_tool.auto_walk_state = state
+
+    def next_walk_step(self):
+        direction = self.dig_tool.automation_manager.get_next_walk_direction()
+        click_enabled = direction.get("click", True) if isinstance(direction, dict) else True
+        return direction, self._get_walk_duration(direction) / 1000.0, click_enabled
+
+    def _get_walk_duration(self, direction):
+        if isinstance(direction, dict) and direction.get("duration") is not None:
+            duration_value = direction.get("duration")
+            try:
+                return int(duration_value) if duration_value is not None else 1000
+            except (ValueError, TypeError):
+                return 1000
+        return self.stage.params.walk_duration
+
+    def start_walk(self, direction):
+        if self._walk_executor is None:
+            self._walk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AutoWalkStep")
+        walk_job = self._walk_executor.submit(self._perform_walk_step, direction)
+        walk_job.add_done_callback(lambda _: self.stage.auto_walk.post(WalkEvent.WALK_DONE))
+        return walk_job
+
+    def _perform_walk_step(self, direction):
+        dig_tool = self.dig_tool
+        automation_manager = dig_tool.automation_manager
+        if automation_manager.is_selling or not dig_tool.running:
+            logger.debug("Walk step aborted - selling in progress or tool stopped")
+            return
+
+        if isinstance(direction, dict):
+            key = direction.get("key", "")
+            custom_duration = direction.get("duration", None)
+            if custom_duration is not None:
+                automation_manager.movement_manager.execute_movement_with_duration(
+                    key, custom_duration / 1000.0
+                )
+            else:
+                automation_manager.perform_walk_step(key)
+        else:
+            automation_manager.perform_walk_step(direction)
+
+    def start_click(self, delay):
+        from utils.input_management import schedule_click
+
+        dig_tool = self.dig_tool
+        if not dig_tool.running or not dig_tool.click_lock.acquire(blocking=False):
+            return False
+        schedule_click(dig_tool, self.stage.start_click_delay if delay is None else delay)
+        return True
+
+    def max_wait_time(self):
+        return self.stage.params.max_wait_time / 1000.0
+
+    def advance_pattern(self):
+        automation_manager = self.dig_tool.automation_manager
+        automation_manager.advance_walk_pattern()
+        logger.debug("Advanced to pattern index: %s", automation_manager.walk_pattern_index)
+
+    def dig_completed(self):
+        dig_tool = self.dig_tool
+        params = self.stage.params
+        automation_manager = dig_tool.automation_manager
+        dig_tool.dig_count += 1
+        automation_manager.update_dig_activity()
+
+        logger.info(
+            "Dig completed #%s: auto_sell_enabled=%s, sell_button_set=%s, sell_every_x_digs=%s",
+            dig_tool.dig_count,
+            params.auto_sell_enabled,
+            automation_manager.sell_button_position is not None,
+            params.sell_every_x_digs,
+        )
+        self.stage._notify_dig_completed(params)
+        return self.stage._should_trigger_auto_sell(params)
+
+    def start_sell(self):
+        dig_tool = self.dig_tool
+        automation_manager = dig_tool.automation_manager
+        if not dig_tool.running or not automation_manager.is_auto_sell_ready():
+            return None
+        logger.debug(
+            "Initiating auto-sell: dig_count=%s, sell_every_x_digs=%s",
+            dig_tool.dig_count,
+            self.stage.params.sell_every_x_digs,
+        )
+        # The sell runs on its own thread; frames keep flowing in the
+        # "selling" state until its future completes
+        return automation_manager.start_auto_sell()
+
+    def shutdown(self):
+        if self._walk_executor is not None:
+            self._walk_executor.shutdown(wait=False)
+            self._walk_executor = None
+
+
+class ActionStage(PipelineStage):
+    name = "act"
+
+    dig_disengage_delay = 1500
+
+    def __init__(self, dig_tool_instance):
+        super().__init__(dig_tool_instance)
+        self.params = None
+        # The auto-walk start click reuses the most recent prediction delay
+        self.start_click_delay = 0
+        # Created on first use
+        self.auto_walk = None
+        self.auto_walk_actions = None
+
+    def process(self, frame):
+        self.params = frame.params
+        self.start_click_delay = frame.click_delay
+        self._process_auto_walk(frame)
+        self._process_click(frame)
+        self._process_dig_completion(frame)
+        return True
+
+    def _process_auto_walk(self, frame):
+        dig_tool = self.dig_tool
+        active = dig_tool.running and frame.params.auto_walk_enabled
+        auto_walk = self.auto_walk
+        if auto_walk is None:
+            if not active:
+                return
+            auto_walk = self._create_auto_walk()
+
+        # Transitions run on the machine's own thread at their deadlines; the
+        # frame loop only feeds it engagement changes
+        auto_walk.set_active(active, dig_tool.target_engaged)
+        if active:
+            auto_walk.set_engaged(dig_tool.target_engaged)
+
+    def _create_auto_walk(self):
+        self.auto_walk_actions = AutoWalkActions(self)
+        self.auto_walk = AutoWalkMachine(
+            self.auto_walk_actions, dig_disengage_delay=self.dig_disengage_delay / 1000.0
+        )
+        return self.auto_walk
+
+    def shutdown(self):
+        if self.auto_walk is not None:
+            self.auto_walk.set_active(False)
+        if self.auto_walk_actions is not None:
+            self.auto_walk_actions.shutdown()
+
+    def _process_click(self, frame):
+        # utils.input_management loads the Tk and win32 input backends, which
+        # the headless replay runs without
+        from utils.input_management import (
+            perform_instant_click,
+            record_click_debug,
+            schedule_click,
+        )
+
+        dig_tool = self.dig_tool
+        params = frame.params
+        automation_manager = dig_tool.automation_manager
+        click_scheduler = dig_tool.click_scheduler
+
+        if params.auto_walk_enabled:
+            should_allow_clicking = (
+                dig_tool.auto_walk_state == "digging"
+                and not automation_manager.is_selling
+                and dig_tool.target_engaged
+            )
+        else:
+            should_allow_clicking = dig_tool.target_engaged
+
+        click_pending = params.reschedule_pending_clicks and click_scheduler.is_pending(
+            DIG_CLICK_KEY
+        )
+        if not (
+            dig_tool.running
+            and should_allow_clicking
+            and frame.current_time_ms >= dig_tool.blind_until
+            and frame.sweet_spot_center is not None
+            and (not dig_tool.click_lock.locked() or click_pending)
+            and frame.should_click
+        ):
+            return
+
+        if click_pending:
+            # A fresher prediction moves the pending click rather than adding
+            # one; the click lock stays with the rescheduled request
+            if frame.prediction_used and frame.click_delay > 0:
+                if click_scheduler.reschedule_at(
+                    DIG_CLICK_KEY, frame.capture_timestamp + frame.click_delay
+                ):
+                    frame.click_rescheduled = True
+                    dig_tool.blind_until = (
+                        frame.current_time_ms + params.post_click_blindness
+                    )
+            return
+
+        # The auto-walk thread may take the lock since the check above; the
+        # frame loop skips this click rather than wait for it
+        if frame.click_delay != 0 and not dig_tool.click_lock.acquire(blocking=False):
+            return
+
+        automation_manager.update_click_activity()
+
+        dig_tool.blind_until = frame.current_time_ms + params.post_click_blindness
+
+        click_count = dig_tool.click_count
+        frame.click_sent = True
+
+        if frame.click_delay == 0:
+            perform_instant_click(dig_tool)
+        else:
+            schedule_click(
+                dig_tool,
+                frame.click_delay,
+                key=DIG_CLICK_KEY,
+                captured_at=frame.capture_timestamp,
+            )
+
+        # Queued after the click is handed to the scheduler, so debugging does
+        # not shift click timing
+        if params.debug_enabled:
+            record_click_debug(dig_tool, frame, click_count)
+
+    def _should_trigger_auto_sell(self, params):
+        dig_tool = self.dig_tool
+        sell_every_x_digs = params.sell_every_x_digs
+        return (
+            params.auto_sell_enabled
+            and dig_tool.automation_manager.sell_button_position is not None
+            and dig_tool.dig_count > 0
+            and dig_tool.dig_count % sell_every_x_digs == 0
+        )
+
+    def _notify_dig_completed(self, params):
+        from core.notifications import check_milestone_notifications
+
+        check_milestone_notifications(self.dig_tool)
+
+        if params.enable_item_detection:
+            from core.notifications import check_item_notifications
+
+            check_item_notifications(self.dig_tool)
+
+    def _process_dig_completion(self, frame):
+        # Auto-walk digs are completed by the state machine
+        dig_tool = self.dig_tool
+        params = frame.params
+        automation_manager = dig_tool.automation_manager
+        current_time_ms = frame.current_time_ms
+
+        if not params.auto_walk_enabled and dig_tool.running:
+            if dig_tool.target_engaged:
+                dig_tool.manual_dig_was_engaged = True
+                dig_tool.manual_dig_target_disengaged_time = 0
+            elif dig_tool.manual_dig_was_engaged and not dig_tool.target_engaged:
+                if dig_tool.manual_dig_target_disengaged_time == 0:
+                    dig_tool.manual_dig_target_disengaged_time = current_time_ms
+                elif (
+                    current_time_ms - dig_tool.manual_dig_target_disengaged_time
+                    > self.dig_disengage_delay
+                    and not automation_manager.is_selling
+                ):
+                    dig_tool.dig_count += 1
+                    automation_manager.update_dig_activity()
+                    dig_tool.manual_dig_was_engaged = False
+                    dig_tool.manual_dig_target_disengaged_time = 0
+
+                    logger.info("Manual dig completed #%s", dig_tool.dig_count)
+
+                    if self._should_trigger_auto_sell(params):
+                        logger.info("Manual mode auto-sell triggered! Will sell immediately")
+                        if automation_manager.is_auto_sell_ready():
+                            automation_manager.start_auto_sell()
+
+                    self._notify_dig_completed(params)
+
+
+class PublishStage(PipelineStage):
+    name = "publish"
+
+    def process(self, frame):
+        if self.dig_tool.results_queue.empty():
+            self._publish_preview(frame)
+        return True
+
+    def _build_debug_visualization(self, frame):
+        final_mask = frame.final_mask
+        detection_info = frame.detection_info
+        if final_mask is None or not detection_info:
+            return None
+
+        method = detection_info.get("method", "")
+        if "Otsu" not in method and "Color Picker" not in method:
+            return None
+
+        screenshot = frame.screenshot
+        if frame.zone_detection_area is not None:
+            debug_visualization = to_bgr(frame.zone_detection_area)
+        else:
+            debug_visualization = (
+                to_bgr(screenshot[: frame.height_80, :])
+                if frame.height_80 < screenshot.shape[0]
+                else to_bgr(screenshot)
+            )
+
+        if final_mask.shape[:2] == debug_visualization.shape[:2]:
+            overlay = debug_visualization.copy()
+            overlay[final_mask > 0] = [0, 255, 0]
+            debug_visualization = cv2.addWeighted(
+                debug_visualization, 0.7, overlay, 0.3, 0
+            )
+        elif final_mask.shape[1] == debug_visualization.shape[1]:
+            mask_height = min(final_mask.shape[0], debug_visualization.shape[0])
+            overlay = debug_visualization.copy()
+            overlay[:mask_height][final_mask[:mask_height] > 0] = [0, 255, 0]
+            debug_visualization = cv2.addWeighted(
+                debug_visualization, 0.7, overlay, 0.3, 0
+            )
+        return debug_visualization
+
+    def _publish_preview(self, frame):
+        dig_tool = self.dig_tool
+        height = frame.height
+        zone_y2 = frame.zone_y2
+        line_pos = frame.line_pos
+
+        preview_img = to_bgr(frame.screenshot)
+        if (
+            frame.sweet_spot_center is not None
+            and dig_tool.smoothed_zone_x is not None
+            and dig_tool.smoothed_zone_w is not None
+            and frame.sweet_spot_start is not None
+            and frame.sweet_spot_end is not None
+        ):
+            cv2.rectangle(
+                preview_img,
+                (int(dig_tool.smoothed_zone_x), 0),
+                (
+                    int(dig_tool.smoothed_zone_x + dig_tool.smoothed_zone_w),
+                    zone_y2 or height,
+                ),
+                (0, 255, 0),
+                2,
+            )
+            cv2.rectangle(
+                preview_img,
+                (int(frame.sweet_spot_start), 0),
+                (int(frame.sweet_spot_end), zone_y2 or height),
+                (0, 255, 255),
+                2,
+            )
+        if line_pos != -1:
+            cv2.line(preview_img, (line_pos, 0), (line_pos, height), (0, 0, 255), 1)
+        h, w = preview_img.shape[:2]
+        thumbnail = cv2.resize(
+            preview_img,
+            (150, int(150 * h / w)),
+            interpolation=cv2.INTER_NEAREST,
+        )
+
+        debug_visualization = self._build_debug_visualization(frame)
+
+        overlay_info = {
+            "sweet_spot_center": frame.sweet_spot_center,
+            "velocity": frame.display_velocity,
+            "acceleration": frame.acceleration,
+            "click_count": dig_tool.click_count,
+            "locked_color_hex": dig_tool.locked_color_hex,
+            "preview_thumbnail": thumbnail,
+            "dig_count": dig_tool.dig_count,
+            "automation_status": dig_tool.automation_manager.get_current_status(),
+            "sell_count": dig_tool.automation_manager.sell_count,
+            "target_engaged": dig_tool.target_engaged,
+            "line_detected": line_pos != -1,
+            "detection_info": (
+                frame.detection_info
+                if frame.detection_info is not None
+                else {"method": "Unknown", "threshold": "N/A"}
+            ),
+        }
+        try:
+            dig_tool.results_queue.put_nowait(
+                (
+                    preview_img,
+                    (
+                        debug_visualization
+                        if debug_visualization is not None
+                        else frame.final_mask
+                    ),
+                    overlay_info,
+                )
+            )
+        except queue.Full:
+            pass
+
+
+class FramePipeline:
+    def __init__(self, dig_tool_instance, stages=None):
+        self.dig_tool = dig_tool_instance
+        if stages is None:
+            stages = [
+                CaptureStage(dig_tool_instance),
+                LineDetectionStage(dig_tool_instance),
+                ZoneDetectionStage(dig_tool_instance),
+                PredictionStage(dig_tool_instance),
+                DecisionStage(dig_tool_instance),
+                ActionStage(dig_tool_instance),
+                PublishStage(dig_tool_instance),
+            ]
+        self.stages = list(stages)
+        self.frame = FrameContext()
+
+        self.stage_times = {}
+        self._stage_totals = {}
+        self._stage_counts = {}
+        self.reset_stage_timings()
+
+    def get_stage(self, name):
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        return None
+
+    def replace_stage(self, name, new_stage):
+        for index, stage in enumerate(self.stages):
+            if stage.name == name:
+                self.stages[index] = new_stage
+                self.reset_stage_timings()
+                return stage
+        raise KeyError(f"Unknown pipeline stage: {name}")
+
+    def reset_stage_timings(self):
+        self.stage_times = {stage.name: 0.0 for stage in self.stages}
+        self._stage_totals = {stage.name: 0.0 for stage in self.stages}
+        self._stage_counts = {stage.name: 0 for stage in self.stages}
+
+    def get_stage_timings(self, reset=False):
+        timings = {}
+        for name, total in self._stage_totals.items():
+            count = self._stage_counts[name]
+            timings[name] = (total / count) * 1000.0 if count else 0.0
+        if reset:
+            self.reset_stage_timings()
+        return timings
+
+    def shutdown(self):
+        for stage in self.stages:
+            stage.shutdown()
+
+    def process_frame(self, frame_start_time, current_time_ms, params):
+        frame = self.frame
+        frame.reset(frame_start_time, current_time_ms, params)
+
+        stage_times = self.stage_times
+        stage_totals = self._stage_totals
+        stage_counts = self._stage_counts
+        perf_counter = time.perf_counter
+
+        for stage in self.stages:
+            stage_start = perf_counter()
+            completed = stage.process(frame)
+            stage_time = perf_counter() - stage_start
+
+            name = stage.name
+            stage_times[name] = stage_time
+            stage_totals[name] += stage_time
+            stage_counts[name] += 1
+
+            if not completed:
+                return False
+        return True
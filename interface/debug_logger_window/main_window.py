@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import os
 import sys
-from .search_operations import SearchOperations
+from .search_operations import LEVEL_FILTER_ALL, LEVEL_HIDDEN_TAG, SearchOperations
 
 class DebugLoggerWindow:
     def __init__(self, logger_instance):
@@ -19,6 +19,8 @@ class DebugLoggerWindow:
         self.max_lines_var = None
         self.search_var = None
         self.search_case_var = None
+        self.search_regex_var = None
+        self.search_level_var = None
         self.search_results_label = None
         self.search_entry = None
         self.max_lines_entry = None
@@ -122,6 +124,15 @@ class DebugLoggerWindow:
         self.search_case_var = tk.BooleanVar()
         ttk.Checkbutton(search_frame, text="Case Sensitive", variable=self.search_case_var, command=self._on_search_change).pack(side=tk.LEFT, padx=(0, 10))
         
+        self.search_regex_var = tk.BooleanVar()
+        ttk.Checkbutton(search_frame, text="Regex", variable=self.search_regex_var, command=self._on_search_change).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(search_frame, text="Level:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_level_var = tk.StringVar(value=LEVEL_FILTER_ALL)
+        level_combo = ttk.Combobox(search_frame, textvariable=self.search_level_var, values=[LEVEL_FILTER_ALL] + [level.name for level in self.logger.log_levels], state="readonly", width=9)
+        level_combo.pack(side=tk.LEFT, padx=(0, 10))
+        level_combo.bind('<<ComboboxSelected>>', self._on_search_change)
+        
         self.search_results_label = ttk.Label(search_frame, text="")
         self.search_results_label.pack(side=tk.RIGHT)
 
@@ -187,6 +198,7 @@ class DebugLoggerWindow:
             self.console_text.tag_config(f"level_{level.name}", foreground=level_info["color"])
             
         self.console_text.tag_config("search_highlight", background="#FFFF00", foreground="#000000")
+        self.console_text.tag_config(LEVEL_HIDDEN_TAG, elide=True)
 
     def _populate_console_with_history(self):
         self.logger._populate_console_with_history_progressive()
@@ -246,6 +258,8 @@ class DebugLoggerWindow:
 
     def _clear_search(self):
         self.search_var.set("")
+        if self.search_level_var:
+            self.search_level_var.set(LEVEL_FILTER_ALL)
         if self.search_operations:
             self.search_operations.perform_search_operation(clear_only=True)
 
@@ -1,52 +1,183 @@
+import bisect
+import collections
+import re
 import tkinter as tk
+from array import array
 
+LEVEL_FILTER_ALL = "All"
+# Elided, so records below the level filter drop out of the console
+LEVEL_HIDDEN_TAG = "level_hidden"
+# Highlight ranges handed to a single tag_add call
+TAG_BATCH_SIZE = 512
+
+
+# Line index over the records shown in the console. Every inserted record
+# keeps its formatted text and the absolute line it starts on, so a search
+# runs over the stored text instead of reading the widget back, a new record
+# is matched on its own when it is appended, and trimming the top of the
+# console only moves the line base. Widget line N holds absolute line
+# first_line + N - 1.
 class SearchOperations:
     def __init__(self, window_instance):
         self.window = window_instance
         self.logger = window_instance.logger
+        self.entries = collections.deque()
+        self.line_starts = array("q")
+        self.match_counts = array("l")
+        self.first_line = 1
+        self.next_line = 1
+        self.total_matches = 0
+        self.pattern = None
+        self.min_level = None
+        self.invalid_pattern = False
+
+    def reset(self):
+        self.entries.clear()
+        self.line_starts = array("q")
+        self.match_counts = array("l")
+        self.first_line = 1
+        self.next_line = 1
+        self.total_matches = 0
+        self._update_results_label()
+
+    def line_count(self):
+        return self.next_line - self.first_line
+
+    def is_active(self):
+        return self.pattern is not None or self.min_level is not None
+
+    def append_entry(self, entry, formatted_message):
+        # formatted_message ends with a newline, so it spans one line per "\n"
+        start_line = self.next_line
+        self.entries.append((entry, formatted_message))
+        self.line_starts.append(start_line)
+        self.next_line += formatted_message.count("\n")
+        matches = 0
+        if self.is_active():
+            ranges = []
+            hidden = []
+            matches = self._match_entry(entry, formatted_message, start_line, ranges, hidden)
+            self._tag_ranges("search_highlight", ranges)
+            self._tag_ranges(LEVEL_HIDDEN_TAG, hidden)
+            self.total_matches += matches
+            self._update_results_label()
+        self.match_counts.append(matches)
+
+    def trim_lines(self, keep_lines):
+        # Drops whole records from the top until at most keep_lines remain
+        # and returns how many widget lines the caller has to delete
+        if self.line_count() <= keep_lines:
+            return 0
+        count = bisect.bisect_left(self.line_starts, self.next_line - keep_lines)
+        if count == 0:
+            return 0
+        new_first_line = self.line_starts[count] if count < len(self.line_starts) else self.next_line
+        removed_lines = new_first_line - self.first_line
+        for _ in range(count):
+            self.entries.popleft()
+        self.total_matches -= sum(self.match_counts[:count])
+        del self.line_starts[:count]
+        del self.match_counts[:count]
+        self.first_line = new_first_line
+        if self.is_active():
+            self._update_results_label()
+        return removed_lines
 
     def perform_search_operation(self, search_term=None, clear_only=False):
-        if clear_only or not search_term:
-            if self.window.console_text:
-                self.window.console_text.tag_remove("search_highlight", "1.0", tk.END)
-            if self.window.search_results_label:
-                self.window.search_results_label.config(text="")
-            return
-        
-        if not self.window.console_text:
+        console_text = self.window.console_text
+        if console_text:
+            console_text.tag_remove("search_highlight", "1.0", tk.END)
+            console_text.tag_remove(LEVEL_HIDDEN_TAG, "1.0", tk.END)
+        self.total_matches = 0
+        self.match_counts = array("l", [0]) * len(self.entries)
+        self._compile(None if clear_only else search_term)
+        if not console_text or not self.is_active():
+            self._update_results_label()
             return
-        
-        self.window.console_text.tag_remove("search_highlight", "1.0", tk.END)
-        
-        case_sensitive = self.window.search_case_var.get()
-        content = self.window.console_text.get("1.0", tk.END)
-        search_content = content if case_sensitive else content.lower()
-        search_term = search_term if case_sensitive else search_term.lower()
-        
-        matches = 0
-        start_pos = 0
-        
-        while True:
-            pos = search_content.find(search_term, start_pos)
-            if pos == -1:
-                break
-            
-            matches += 1
-            line_start = content.rfind('\n', 0, pos) + 1
-            line_num = content[:pos].count('\n') + 1
-            char_num = pos - line_start
-            
-            start_index = f"{line_num}.{char_num}"
-            end_index = f"{line_num}.{char_num + len(search_term)}"
-            self.window.console_text.tag_add("search_highlight", start_index, end_index)
-            start_pos = pos + 1
-        
-        if self.window.search_results_label:
-            self.window.search_results_label.config(text=f"{matches} matches" if matches > 0 else "No matches")
+
+        ranges = []
+        hidden = []
+        for index, (entry, formatted_message) in enumerate(self.entries):
+            matches = self._match_entry(entry, formatted_message, self.line_starts[index], ranges, hidden)
+            if matches:
+                self.match_counts[index] = matches
+                self.total_matches += matches
+        self._tag_ranges("search_highlight", ranges)
+        self._tag_ranges(LEVEL_HIDDEN_TAG, hidden)
+        self._update_results_label()
 
     def clear_search_highlights(self):
-        if self.window.console_text:
-            self.window.console_text.tag_remove("search_highlight", "1.0", tk.END)
+        self.perform_search_operation(clear_only=True)
 
     def highlight_search_results(self, search_term):
         self.perform_search_operation(search_term)
+
+    def _compile(self, search_term):
+        self.pattern = None
+        self.invalid_pattern = False
+        self.min_level = None
+        level_var = getattr(self.window, "search_level_var", None)
+        if level_var is not None and level_var.get() != LEVEL_FILTER_ALL:
+            self.min_level = next(
+                (level.value for level in self.logger.log_levels if level.name == level_var.get()),
+                None,
+            )
+        if not search_term:
+            return
+        flags = 0 if self.window.search_case_var.get() else re.IGNORECASE
+        regex_var = getattr(self.window, "search_regex_var", None)
+        source = search_term if regex_var is not None and regex_var.get() else re.escape(search_term)
+        try:
+            self.pattern = re.compile(source, flags)
+        except re.error:
+            self.invalid_pattern = True
+
+    def _match_entry(self, entry, formatted_message, start_line, ranges, hidden):
+        line = start_line - self.first_line + 1
+        if self.min_level is not None and entry.level.value < self.min_level:
+            # The whole record, newline included
+            next_line = line + formatted_message.count("\n")
+            hidden.append(f"{line}.0")
+            hidden.append(f"{next_line}.0")
+            return 0
+        if self.pattern is None:
+            # Level filter alone counts each record it keeps
+            return 0 if self.invalid_pattern else 1
+
+        matches = 0
+        for match in self.pattern.finditer(formatted_message):
+            start, end = match.span()
+            if start == end:
+                continue
+            ranges.append(self._text_index(formatted_message, line, start))
+            ranges.append(self._text_index(formatted_message, line, end))
+            matches += 1
+        return matches
+
+    def _text_index(self, formatted_message, line, offset):
+        line_start = formatted_message.rfind("\n", 0, offset) + 1
+        if line_start:
+            line += formatted_message.count("\n", 0, line_start)
+        return f"{line}.{offset - line_start}"
+
+    def _tag_ranges(self, tag, ranges):
+        console_text = self.window.console_text
+        if not console_text or not ranges:
+            return
+        step = TAG_BATCH_SIZE * 2
+        for index in range(0, len(ranges), step):
+            console_text.tag_add(tag, *ranges[index : index + step])
+
+    def _update_results_label(self):
+        label = self.window.search_results_label
+        if not label:
+            return
+        if self.invalid_pattern:
+            text = "Invalid pattern"
+        elif not self.is_active():
+            text = ""
+        elif self.total_matches:
+            text = f"{self.total_matches} matches"
+        else:
+            text = "No matches"
+        label.config(text=text)
@@ -1052,6 +1052,8 @@ class MainWindow:
 
         create_dual_param_entry(panes['detection'].sub_frame, "Line Sensitivity:", 'line_sensitivity',
                                 "Line Detection Offset:", 'line_detection_offset')
+        create_checkbox_param(panes['detection'].sub_frame, "Track Line Between Frames", 'line_tracking_enabled')
+        create_checkbox_param(panes['detection'].sub_frame, "Track Zone Between Frames", 'zone_tracking_enabled')
         create_dual_param_entry(panes['detection'].sub_frame, "Zone Min Width:", 'zone_min_width',
                                 "Zone Max Width (%):", 'max_zone_width_percent')
         create_dual_param_entry(panes['detection'].sub_frame, "Zone Min Height (%):", 'min_zone_height_percent',
@@ -1124,6 +1126,8 @@ class MainWindow:
         
         create_param_entry(pred_subsection.content, "Game FPS:", 'target_fps')
         create_param_entry(pred_subsection.content, "Prediction Confidence:", 'prediction_confidence_threshold')
+        create_dropdown_param(pred_subsection.content, "Predictor:", 'prediction_method', ["velocity", "kalman"])
+        create_checkbox_param(pred_subsection.content, "Reschedule Pending Clicks", 'reschedule_pending_clicks')
 
         cursor_subsection = CollapsibleSubsection(panes['behavior'].sub_frame, "Cursor Settings",
                                                   "#fff0e8")  # Light orange for cursor settings
@@ -1270,6 +1274,10 @@ class MainWindow:
         
         self.inventory_close_delay_widgets = [self.inventory_close_delay_frame]
         
+        create_checkbox_param(auto_sell_subsection.content, "Confirm Sell Steps On Screen",
+                             'auto_sell_visual_confirmation',
+                             self.sell_dependent_widgets, 'sell')
+        
         create_checkbox_param(auto_sell_subsection.content, "Enable Post-Sell Engagement Monitoring",
                              'auto_sell_target_engagement_enabled',
                              self.sell_dependent_widgets, 'sell')
@@ -1348,9 +1356,13 @@ class MainWindow:
         create_param_entry(panes['discord'].sub_frame, "Milestone Interval:", 'milestone_interval', self.discord_dependent_widgets, 'discord')
         create_checkbox_param(panes['discord'].sub_frame, "Include Screenshot in Milestone Notifications",
                               'include_screenshot_in_discord', self.discord_dependent_widgets, 'discord')
+        create_param_entry(panes['discord'].sub_frame, "Screenshot Max Size (px):", 'discord_screenshot_max_dimension', self.discord_dependent_widgets, 'discord')
+        create_dropdown_param(panes['discord'].sub_frame, "Screenshot Encoding:", 'discord_screenshot_preset', ["fast", "balanced", "small"],
+                              self.discord_dependent_widgets, 'discord')
         
         live_stats_per_dig_checkbox = create_checkbox_param(panes['discord'].sub_frame, "Update Per Dig", 
                               'live_stats_per_dig_enabled', self.discord_dependent_widgets, 'discord')
+        create_param_entry(panes['discord'].sub_frame, "Min Seconds Between Updates:", 'live_stats_min_interval', self.discord_dependent_widgets, 'discord')
         
         test_discord_btn = create_section_button(panes['discord'].sub_frame, "Test Discord Ping", lambda: test_discord_ping(self.dig_tool))
         self.discord_dependent_widgets.append(test_discord_btn)
@@ -1419,6 +1431,9 @@ class MainWindow:
 
         create_checkbox_param(panes['debug'].sub_frame, "Save Debug Screenshots", 'debug_enabled')
         create_param_entry(panes['debug'].sub_frame, "Screenshot FPS:", 'screenshot_fps')
+        create_checkbox_param(panes['debug'].sub_frame, "Record Frames for Replay", 'record_frames')
+        create_checkbox_param(panes['debug'].sub_frame, "Record Frame Telemetry", 'telemetry_enabled')
+        create_param_entry(panes['debug'].sub_frame, "Telemetry Minutes Kept:", 'telemetry_minutes')
         create_section_button(panes['debug'].sub_frame, "Show Debug Console", lambda: show_debug_console(self.dig_tool))
 
         create_section_button(panes['debug'].sub_frame, "Color Modules Overlay", 
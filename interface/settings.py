@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import re
@@ -12,7 +13,7 @@ from utils.debug_logger import logger
 from utils.pattern_utils import update_walk_pattern_dropdown, open_custom_pattern_manager
 from utils.input_management import apply_keybinds
 from utils.ui_management import update_area_info, update_sell_info, update_cursor_info
-from utils.config_management import get_param
+from utils.config_management import DEFAULT_PARAMS, get_param
 
 from interface.settings_feedback_window import SettingsFeedbackWindow
 from interface.export_options_dialog import ExportOptionsDialog
@@ -26,88 +27,13 @@ class SettingsManager:
 
         self._ensure_settings_directory()
 
-        self.default_params = {
-            "line_sensitivity": 100,
-            "zone_min_width": 100,
-            "saturation_threshold": 0.5,
-            "min_zone_height_percent": 100,
-            "sweet_spot_width_percent": 20,
-            "velocity_based_width_enabled": False,
-            "velocity_width_multiplier": 1.5,
-            "velocity_max_factor": 2000.0,
-            "prediction_enabled": True,
-            "prediction_confidence_threshold": 0.6,
-            "zone_smoothing_factor": 1.0,
-            "line_exclusion_radius": 8,
-            "post_click_blindness": 50,
-            "max_zone_width_percent": 80,
-            "target_fps": 120,
-            "line_detection_offset": 5.0,
-            "system_latency": "auto",
-            "main_on_top": True,
-            "preview_on_top": True,
-            "debug_on_top": True,
-            "debug_enabled": False,
-            "screenshot_fps": 240,
-            "auto_sell_enabled": False,
-            "sell_every_x_digs": 10,
-            "sell_delay": 1000,
-            "auto_sell_method": "button_click",
-            "auto_sell_ui_sequence": "down,up,enter",
-            "auto_sell_ui_navigation_key": "\\",
-            "auto_sell_inventory_key": "g",
-            "auto_sell_inventory_open_delay": 900,
-            "auto_sell_inventory_close_delay": 900,
-            "auto_sell_target_engagement_enabled": True,
-            "auto_sell_target_engagement_timeout": 120.0, 
-            # Otsu detection parameters
-            "use_otsu_detection": False,
-            "otsu_min_area": 50,
-            "otsu_max_area": "",
-            "otsu_morph_kernel_size": 3,
-            "otsu_adaptive_area": True,
-            "otsu_area_percentile": 0.1,
-            "otsu_disable_color_lock": False,
-            # Color picker detection parameters
-            "use_color_picker_detection": False,
-            "picked_color_rgb": "",  # RGB color in hex format (e.g., "#FF0000")
-            "color_tolerance": 30,
-            "auto_walk_enabled": False,
-            "walk_duration": 500,
-            "max_wait_time": 5000,
-            "dynamic_walkspeed_enabled": False,
-            "initial_item_count": 0,
-            "initial_walkspeed_decrease": 0.0,
-            "auto_shovel_enabled": False,
-            "shovel_slot": 1,
-            "shovel_timeout": 5,
-            "auto_rejoin_enabled": False,
-            "roblox_server_link": "",
-            "rejoin_check_interval": 30,
-            "auto_rejoin_restart_delay": 60,
-            "auto_rejoin_discord_notifications": True,
-            "user_id": "",
-            "server_id": "",
-            "webhook_url": "",
-            "milestone_interval": 100,
-            "money_area": None,
-            "item_area": None,
-            "use_custom_cursor": False,
-            "shovel_equip_mode": "double",
-            "include_screenshot_in_discord": False,
-            "enable_money_detection": False,
-            "enable_item_detection": False,
-            "money_color_tolerance": 35,
-            "notification_rarities": ["scarce", "legendary", "mythical", "divine", "prismatic"],
-            "live_stats_screenshots_enabled": False,
-            "live_stats_screenshot_interval": 30,
-            "live_stats_per_dig_enabled": False,
-            "discord_enabled": False
-        }
+        self.default_params = copy.deepcopy(DEFAULT_PARAMS)
 
         self.param_descriptions = {
             "line_sensitivity": "How sharp the contrast must be to be considered a line. Higher values = less sensitive to weak edges.",
             "line_detection_offset": "Pixels to offset the detected line position. Positive = right, negative = left. Decimals allowed for precise positioning.",
+            "line_tracking_enabled": "Search for the line only in a narrow window around where it is expected to be, falling back to a full scan when it is not found there. Lowers CPU usage per frame.",
+            "zone_tracking_enabled": "Once the zone colour is locked, only convert and search the columns around the last zone, falling back to the full bar when the zone is not found there. Lowers CPU usage per frame.",
             "zone_min_width": "The minimum pixel width for a valid target zone. Smaller zones will be ignored.",
             "max_zone_width_percent": "The maximum width of a target zone as a percent of the capture width. Values above 100% allow detecting zones wider than the capture area (max 200%).",
             "min_zone_height_percent": "A target zone must span this percentage of the capture height to be valid. 100% = full height required.",
@@ -121,11 +47,16 @@ class SettingsManager:
             "post_click_blindness": "How long to wait after clicking before scanning again (milliseconds). Prevents multiple rapid clicks.",
             "prediction_enabled": "Predicts the line's movement to click earlier, compensating for input/display latency.",
             "prediction_confidence_threshold": "How confident the prediction must be (0.0-1.0). Higher = more conservative prediction.",
+            "prediction_method": "Line predictor used for click timing: 'velocity' (weighted velocity history) or 'kalman' (constant-acceleration Kalman filter, cheaper per frame with covariance-based confidence).",
+            "reschedule_pending_clicks": "While a predicted click is waiting to fire, let a newer prediction move it to a new time instead of waiting for it to finish. Works best with the 'kalman' predictor.",
             "main_on_top": "Keep the main window always on top of other windows.",
             "preview_on_top": "Keep the preview window always on top of other windows.",
             "debug_on_top": "Keep the debug window always on top of other windows.",
             "debug_enabled": "Save screenshots and debug information for every click performed.",
             "screenshot_fps": "Target frames per second for screenshot capture. Higher = lower latency but more CPU usage.",
+            "record_frames": "Record captured frames and timestamps to the debug folder so the session can be replayed and benchmarked offline.",
+            "telemetry_enabled": "Write a compact per-frame record (timings, detections, predictions, click decisions) to a ring journal in the debug folder for offline analysis of long runs.",
+            "telemetry_minutes": "Minutes of frames the telemetry journal keeps before overwriting the oldest. The file is created at full size: about 94 bytes per frame, so roughly 1.4 MB per minute at 240 screenshot FPS (15 minutes is about 20 MB).",
             "auto_sell_enabled": "Automatically sell items after a certain number of digs.",
             "sell_every_x_digs": "Number of digs before auto-selling items.",
             "sell_delay": "Delay in milliseconds before clicking the sell button.",
@@ -135,6 +66,7 @@ class SettingsManager:
             "auto_sell_inventory_key": "Key to open and close the inventory during auto-sell.",
             "auto_sell_inventory_open_delay": "Delay in milliseconds after opening inventory before executing sell sequence.",
             "auto_sell_inventory_close_delay": "Delay in milliseconds after closing inventory before completing auto-sell.",
+            "auto_sell_visual_confirmation": "Watch the screen around the sell button to move on as soon as each sell step has happened. The delays above become the longest each step may take.",
             "auto_sell_target_engagement_enabled": "Enable waiting for target engagement after auto-sell completion. When disabled, auto-sell will not wait for re-engagement. Helpful in casews where inventory might stay open.",
             "auto_sell_target_engagement_timeout": "Time to wait for target engagement after auto-sell completion (seconds). If no engagement detected, applies auto-sell fallback to re-close inventory.",
             "auto_walk_enabled": "Automatically move around while digging.",
@@ -180,6 +112,9 @@ class SettingsManager:
             "live_stats_screenshots_enabled": "Include screenshots in live stats message updates.",
             "live_stats_screenshot_interval": "Update live stats message with screenshot every X seconds.",
             "live_stats_per_dig_enabled": "Update Discord stats message after every dig.",
+            "discord_screenshot_max_dimension": "Longest side in pixels of screenshots sent to Discord; larger captures are downscaled before encoding. 0 keeps the full size.",
+            "discord_screenshot_preset": "WEBP encoding for Discord screenshots: 'fast' (least CPU, larger files), 'balanced', or 'small' (most CPU, smallest files).",
+            "live_stats_min_interval": "Minimum seconds between Discord stats message edits. Digs within this window are merged into one edit, and edits that would not change the message are skipped.",
             "discord_enabled": "Enable Discord notifications for milestones, rare items, and status updates."
         }
 
@@ -334,6 +269,8 @@ class SettingsManager:
                 "picked_color_rgb": lambda v: v in ["", None] or bool(re.match(r"^#[0-9A-Fa-f]{6}$", v)),
                 "otsu_max_area": lambda v: v in ["", None] or (isinstance(v, (int, str)) and int(v) >= 1),
                 "auto_sell_method": lambda v: isinstance(v, str) and v in ["button_click", "ui_navigation"],
+                "prediction_method": lambda v: isinstance(v, str) and v in ["velocity", "kalman"],
+                "discord_screenshot_preset": lambda v: isinstance(v, str) and v in ["fast", "balanced", "small"],
                 "auto_sell_ui_sequence": self._validate_ui_sequence,
                 "notification_rarities": self._validate_rarities,
                 "money_area": lambda v: self._validate_area_param(v),
@@ -351,6 +288,8 @@ class SettingsManager:
                 ("shovel_slot",): (0, 9),
                 ("shovel_timeout",): (1, None),
                 ("live_stats_screenshot_interval",): (1, None),
+                ("discord_screenshot_max_dimension",): (0, None),
+                ("telemetry_minutes",): (1, 240),
                 ("max_wait_time",): (1000, None),
                 ("money_color_tolerance",): (0, 100)
             },
@@ -358,21 +297,25 @@ class SettingsManager:
                 "line_sensitivity", "zone_min_width", "post_click_blindness", "sell_every_x_digs",
                 "sell_delay", "auto_sell_inventory_open_delay", "auto_sell_inventory_close_delay", "walk_duration", "max_wait_time", "otsu_min_area", "otsu_morph_kernel_size", "color_tolerance", "money_color_tolerance",
                 "auto_rejoin_restart_delay", "shovel_slot", "shovel_timeout", "target_fps", "screenshot_fps",
-                "milestone_interval", "initial_item_count", "rejoin_check_interval", "live_stats_screenshot_interval"
+                "milestone_interval", "initial_item_count", "rejoin_check_interval", "live_stats_screenshot_interval",
+                "discord_screenshot_max_dimension", "telemetry_minutes"
             ],
             "float_ranges": {
                 ("velocity_width_multiplier",): (0.0, 5.0),
                 ("zone_smoothing_factor",): (0.0, 2.0),
                 ("prediction_confidence_threshold",): (0.0, 1.0),
-                ("otsu_area_percentile",): (0.01, 10.0)
+                ("otsu_area_percentile",): (0.01, 10.0),
+                ("live_stats_min_interval",): (0.0, 3600.0)
             },
             "float_params": ["saturation_threshold", "line_detection_offset", "line_exclusion_radius", "velocity_max_factor", "auto_sell_target_engagement_timeout"],
             "bool_params": [
                 "prediction_enabled", "main_on_top", "preview_on_top", "debug_on_top", "debug_enabled",
-                "auto_sell_enabled", "auto_sell_target_engagement_enabled", "auto_walk_enabled", "use_custom_cursor",
+                "auto_sell_enabled", "auto_sell_visual_confirmation", "auto_sell_target_engagement_enabled", "auto_walk_enabled", "use_custom_cursor",
                 "auto_shovel_enabled", "use_otsu_detection", "otsu_adaptive_area", "otsu_disable_color_lock", "use_color_picker_detection",
                 "enable_money_detection", "enable_item_detection", "auto_rejoin_enabled", "auto_rejoin_discord_notifications",
-                "include_screenshot_in_discord", "live_stats_screenshots_enabled", "live_stats_per_dig_enabled", "discord_enabled"
+                "include_screenshot_in_discord", "live_stats_screenshots_enabled", "live_stats_per_dig_enabled", "discord_enabled",
+                "record_frames", "line_tracking_enabled", "zone_tracking_enabled",
+                "reschedule_pending_clicks", "telemetry_enabled"
             ],
             "string_params": ["user_id", "server_id", "webhook_url", "roblox_server_link", "auto_sell_inventory_key", "auto_sell_ui_navigation_key"]
         }
@@ -531,7 +474,7 @@ class SettingsManager:
                         value = get_param(self.dig_tool, key)
 
                         if (
-                            key in ["user_id", "server_id", "webhook_url", "milestone_interval", "money_area", "item_area", "include_screenshot_in_discord", "notification_rarities", "live_stats_screenshots_enabled", "live_stats_screenshot_interval", "live_stats_per_dig_enabled"]
+                            key in ["user_id", "server_id", "webhook_url", "milestone_interval", "money_area", "item_area", "include_screenshot_in_discord", "notification_rarities", "live_stats_screenshots_enabled", "live_stats_screenshot_interval", "live_stats_per_dig_enabled", "live_stats_min_interval", "discord_screenshot_max_dimension", "discord_screenshot_preset"]
                             and export_options
                             and not export_options.get("discord", True)
                         ):
@@ -0,0 +1,421 @@
+import collections
+import threading
+import time
+from enum import Enum
+
+from utils.debug_logger import logger
+
+
+TIMER_TICK = 0.005
+TIMER_SLOTS = 512
+
+MAX_CLICK_RETRIES = 2
+# Seconds the target has to stay disengaged before a dig counts as done
+DIG_DISENGAGE_DELAY = 1.5
+POST_DIG_SELL_DELAY = 2.0
+# A pending sell is dropped if another sell is still running after this long
+SELL_PENDING_TIMEOUT = 10.0
+SELL_MAX_WAIT = 30.0
+SELL_RESUME_DELAY = 0.5
+# How soon a step blocked by the click lock or a manual sell is tried again
+BUSY_RETRY_INTERVAL = 0.05
+
+
+# str values so code comparing auto_walk_state with "digging" keeps working
+class WalkState(str, Enum):
+    MOVE = "move"
+    CLICK_TO_START = "click_to_start"
+    WAIT_FOR_TARGET = "wait_for_target"
+    DIGGING = "digging"
+    SELLING = "selling"
+
+
+class WalkEvent(str, Enum):
+    ENGAGED = "engaged"
+    DISENGAGED = "disengaged"
+    WALK_DONE = "walk_done"
+    SELL_DONE = "sell_done"
+
+
+# Hashed timing wheel of named one-shot timers. Each key holds at most one
+# deadline, so re-arming a key replaces it; scheduling and cancelling are
+# O(1), which matters because engagement flickers cancel and re-arm the dig
+# timer on every change. Deadlines are bucketed by tick, and expired() walks
+# only the buckets between the last call and now, checking exact deadlines.
+class TimerWheel:
+    def __init__(self, tick=TIMER_TICK, slots=TIMER_SLOTS):
+        self.tick = tick
+        self.slots = [{} for _ in range(slots)]
+        self._timers = {}
+        self._last_tick = None
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def _tick_of(self, deadline):
+        return int(deadline // self.tick)
+
+    def schedule(self, key, deadline):
+        self.cancel(key)
+        tick = self._tick_of(deadline)
+        if self._last_tick is not None and tick < self._last_tick:
+            # Already due; park it where the next expired() call looks first
+            tick = self._last_tick
+        slot = tick % len(self.slots)
+        self.slots[slot][key] = deadline
+        self._timers[key] = (deadline, slot)
+
+    def cancel(self, key):
+        entry = self._timers.pop(key, None)
+        if entry is None:
+            return False
+        del self.slots[entry[1]][key]
+        return True
+
+    def clear(self):
+        for slot in self.slots:
+            slot.clear()
+        self._timers.clear()
+
+    def deadline(self, key):
+        entry = self._timers.get(key)
+        return entry[0] if entry is not None else None
+
+    def next_deadline(self):
+        if not self._timers:
+            return None
+        return min(deadline for deadline, _ in self._timers.values())
+
+    def expired(self, now):
+        # Removes and returns the keys due by now, earliest deadline first
+        now_tick = self._tick_of(now)
+        if self._last_tick is None:
+            # First scan: timers armed before it may sit in earlier ticks
+            next_deadline = self.next_deadline()
+            first_tick = now_tick if next_deadline is None else min(self._tick_of(next_deadline), now_tick)
+        else:
+            first_tick = min(self._last_tick, now_tick)
+        self._last_tick = now_tick
+        if not self._timers:
+            return []
+
+        slot_count = len(self.slots)
+        if now_tick - first_tick + 1 >= slot_count:
+            slots = range(slot_count)
+        else:
+            slots = (tick % slot_count for tick in range(first_tick, now_tick + 1))
+
+        due = []
+        for slot in slots:
+            bucket = self.slots[slot]
+            for key, deadline in bucket.items():
+                if deadline <= now:
+                    due.append((deadline, key))
+        due.sort(key=lambda entry: entry[0])
+        for _, key in due:
+            self.cancel(key)
+        return [key for _, key in due]
+
+
+# Auto-walk as an explicit state machine:
+#
+#   MOVE --walk started--> CLICK_TO_START --walk timer, click--> WAIT_FOR_TARGET
+#   WAIT_FOR_TARGET --engaged--> DIGGING --disengaged for 1.5s--> MOVE
+#   WAIT_FOR_TARGET --timeout, retries used up--> MOVE (next pattern step)
+#   MOVE --sell due after a dig--> SELLING --sell done or 30s--> MOVE
+#
+# Inputs are events posted from any thread (engagement changes from the
+# detection pipeline, walk and sell completion from their workers) and named
+# timers. start() runs a driver thread that sleeps until the next event or
+# deadline, so transitions fire at their deadlines instead of on the next
+# captured frame. Without the thread, post() and step() drive the machine
+# directly, which is how a fake clock can walk it through a dig.
+#
+# actions is the side the machine drives: is_selling(), next_walk_step()
+# returning (direction, duration_seconds, click_enabled), start_walk(),
+# start_click(delay) returning whether the click was queued (None delays it
+# by the latest prediction), max_wait_time() in seconds,
+# advance_pattern(), dig_completed() returning whether a sell is due,
+# start_sell() returning a future or None, and state_changed(state).
+class AutoWalkMachine:
+    def __init__(
+        self,
+        actions,
+        clock=time.perf_counter,
+        timer_tick=TIMER_TICK,
+        max_click_retries=MAX_CLICK_RETRIES,
+        dig_disengage_delay=DIG_DISENGAGE_DELAY,
+        post_dig_sell_delay=POST_DIG_SELL_DELAY,
+    ):
+        self.actions = actions
+        self.clock = clock
+        self.max_click_retries = max_click_retries
+        self.dig_disengage_delay = dig_disengage_delay
+        self.post_dig_sell_delay = post_dig_sell_delay
+        self.timers = TimerWheel(timer_tick)
+        self.state = WalkState.MOVE
+        self.engaged = False
+        self.active = False
+        self.walking = False
+        self.click_enabled = True
+        self.click_retries = 0
+        self.sell_pending_since = None
+        self.transitions = 0
+        # _lock guards the state and timers and is held while actions run;
+        # _condition only guards the event queue, so posting never waits on
+        # a slow action. _lock is always taken before _condition.
+        self._events = collections.deque()
+        self._condition = threading.Condition()
+        self._lock = threading.RLock()
+        self._wake = False
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="AutoWalk", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            thread = self._thread
+            self._thread = None
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def reset(self, engaged=False):
+        with self._lock:
+            self.timers.clear()
+            with self._condition:
+                self._events.clear()
+            self.engaged = engaged
+            self.walking = False
+            self.click_retries = 0
+            self.sell_pending_since = None
+            self._set_state(WalkState.DIGGING if engaged else WalkState.MOVE)
+            self.actions.state_changed(self.state)
+            if not engaged:
+                self._arm("move", 0.0)
+
+    def set_active(self, active, engaged=False):
+        # Turning on starts from a fresh MOVE (or DIGGING if already engaged);
+        # turning off drops every timer so nothing fires while paused
+        if active == self.active:
+            return
+        self.active = active
+        if active:
+            self.reset(engaged)
+            self.start()
+        else:
+            self.stop()
+            with self._lock:
+                self.timers.clear()
+
+    def set_engaged(self, engaged):
+        # Called every frame; only changes become events
+        if engaged != self.engaged:
+            self.post(WalkEvent.ENGAGED if engaged else WalkEvent.DISENGAGED)
+
+    def post(self, event):
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify()
+
+    def next_deadline(self):
+        with self._lock:
+            return self.timers.next_deadline()
+
+    def step(self):
+        # Handles queued events, then every timer due by now
+        with self._lock:
+            while True:
+                with self._condition:
+                    event = self._events.popleft() if self._events else None
+                if event is None:
+                    break
+                self._handle_event(event)
+            if not self.active:
+                return
+            while True:
+                due = self.timers.expired(self.clock())
+                if not due:
+                    break
+                for key in due:
+                    self._fire(key)
+
+    def _run(self):
+        while True:
+            deadline = self.next_deadline()
+            with self._condition:
+                if not self._running:
+                    return
+                # _wake is set by anything armed after the deadline was read
+                if not self._events and not self._wake:
+                    timeout = None if deadline is None else deadline - self.clock()
+                    if timeout is None or timeout > 0:
+                        self._condition.wait(timeout)
+                self._wake = False
+                if not self._running:
+                    return
+            try:
+                self.step()
+            except Exception as e:
+                logger.error(f"Auto-walk step failed: {e}")
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        logger.debug("Auto-walk %s -> %s", self.state.value, state.value)
+        self.state = state
+        self.transitions += 1
+        self.actions.state_changed(state)
+
+    def _arm(self, key, delay):
+        self.timers.schedule(key, self.clock() + max(delay, 0.0))
+        # Wake the driver in case this deadline is sooner than its sleep
+        with self._condition:
+            self._wake = True
+            self._condition.notify()
+
+    def _handle_event(self, event):
+        if event == WalkEvent.ENGAGED:
+            self.engaged = True
+            if self.state == WalkState.WAIT_FOR_TARGET:
+                self.timers.cancel("target_timeout")
+                self.click_retries = 0
+                self._set_state(WalkState.DIGGING)
+            elif self.state == WalkState.DIGGING:
+                self.timers.cancel("dig_done")
+        elif event == WalkEvent.DISENGAGED:
+            self.engaged = False
+            if self.state == WalkState.DIGGING:
+                self._arm("dig_done", self.dig_disengage_delay)
+        elif event == WalkEvent.WALK_DONE:
+            self.walking = False
+            if self.state == WalkState.MOVE and self.active and "move" not in self.timers:
+                self._arm("move", 0.0)
+        elif event == WalkEvent.SELL_DONE:
+            if self.state == WalkState.SELLING:
+                logger.info("Auto-sell completed, returning to movement")
+                self._resume_after_sell()
+
+    def _fire(self, key):
+        if key == "sell_timeout":
+            logger.warning("Auto-sell wait timeout reached, continuing operation")
+            self._resume_after_sell()
+            return
+        if self.actions.is_selling() and self.state != WalkState.SELLING:
+            # A sell started outside the machine; hold every step until it ends
+            if key == "sell" and self.clock() - self.sell_pending_since > SELL_PENDING_TIMEOUT:
+                logger.warning("Auto-sell pending timeout - another sell is still running, skipping")
+                self.sell_pending_since = None
+                self._arm("move", 0.0)
+                return
+            self._arm(key, BUSY_RETRY_INTERVAL)
+            return
+        if key == "move":
+            self._start_walk()
+        elif key == "walk":
+            self._click_to_start()
+        elif key == "target_timeout":
+            self._target_timeout()
+        elif key == "dig_done":
+            self._dig_done()
+        elif key == "sell":
+            self._start_sell()
+
+    def _start_walk(self):
+        if self.state != WalkState.MOVE or self.sell_pending_since is not None:
+            return
+        if self.walking:
+            # The previous step's keys are still held; WALK_DONE starts this one
+            return
+        direction, duration, click_enabled = self.actions.next_walk_step()
+        self.click_enabled = click_enabled
+        self.walking = True
+        self.actions.start_walk(direction)
+        self._set_state(WalkState.CLICK_TO_START)
+        self._arm("walk", duration)
+
+    def _click_to_start(self):
+        if self.state != WalkState.CLICK_TO_START:
+            return
+        if not self.click_enabled:
+            logger.debug("Skipping click for this step (click disabled)")
+            self.actions.advance_pattern()
+            self._set_state(WalkState.MOVE)
+            self._arm("move", 0.0)
+            return
+        if not self.actions.start_click(None):
+            self._arm("walk", BUSY_RETRY_INTERVAL)
+            return
+        self.click_retries = 0
+        self._set_state(WalkState.WAIT_FOR_TARGET)
+        if self.engaged:
+            self._set_state(WalkState.DIGGING)
+        else:
+            self._arm("target_timeout", self.actions.max_wait_time())
+
+    def _target_timeout(self):
+        if self.state != WalkState.WAIT_FOR_TARGET:
+            return
+        if self.click_retries < self.max_click_retries:
+            if not self.actions.start_click(0):
+                self._arm("target_timeout", BUSY_RETRY_INTERVAL)
+                return
+            self.click_retries += 1
+            logger.debug(
+                "Target engagement timeout - retry %s/%s", self.click_retries, self.max_click_retries
+            )
+            self._arm("target_timeout", self.actions.max_wait_time())
+            return
+        logger.warning(
+            "Target engagement failed after %s retries - advancing pattern", self.max_click_retries
+        )
+        self.actions.advance_pattern()
+        self.click_retries = 0
+        self._set_state(WalkState.MOVE)
+        self._arm("move", 0.0)
+
+    def _dig_done(self):
+        if self.state != WalkState.DIGGING or self.engaged:
+            return
+        sell_due = self.actions.dig_completed()
+        self.actions.advance_pattern()
+        self._set_state(WalkState.MOVE)
+        if sell_due:
+            logger.info("Auto-sell triggered! Will sell after %sms delay", int(self.post_dig_sell_delay * 1000))
+            self.sell_pending_since = self.clock()
+            self._arm("sell", self.post_dig_sell_delay)
+        else:
+            self._arm("move", 0.0)
+
+    def _start_sell(self):
+        pending_since = self.sell_pending_since
+        if pending_since is None:
+            return
+        self.sell_pending_since = None
+        job = self.actions.start_sell()
+        if job is None:
+            logger.warning("Auto-sell skipped: not ready (sell button, running state, or already selling)")
+            self._arm("move", 0.0)
+            return
+        self._set_state(WalkState.SELLING)
+        self._arm("sell_timeout", SELL_MAX_WAIT)
+        job.add_done_callback(lambda _: self.post(WalkEvent.SELL_DONE))
+
+    def _resume_after_sell(self):
+        self.timers.cancel("sell_timeout")
+        self._set_state(WalkState.MOVE)
+        self._arm("move", SELL_RESUME_DELAY)
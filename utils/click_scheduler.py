@@ -0,0 +1,213 @@
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+from utils.debug_logger import logger
+
+
+class ClickRequest:
+    __slots__ = ("deadline", "action", "key", "on_cancel", "state", "fired_at")
+
+    def __init__(self, deadline, action, key=None, on_cancel=None):
+        self.deadline = deadline
+        self.action = action
+        self.key = key
+        self.on_cancel = on_cancel
+        self.state = "pending"
+        self.fired_at = None
+
+    @property
+    def pending(self):
+        return self.state == "pending"
+
+    @property
+    def fire_error(self):
+        if self.fired_at is None:
+            return None
+        return self.fired_at - self.deadline
+
+
+# One long-lived thread fires every click at a perf_counter deadline. Waiting
+# is done in three phases: a condition wait that new requests can interrupt,
+# short sleeps once the deadline is within the OS timer granularity, and a
+# busy spin for the last couple of milliseconds.
+class ClickScheduler:
+    wait_margin = 0.02
+    sleep_step = 0.001
+    spin_threshold = 0.002
+
+    def __init__(self, error_history=512):
+        self._condition = threading.Condition()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._keyed = {}
+        self._thread = None
+        self._running = False
+        self.fire_errors = collections.deque(maxlen=error_history)
+        self.fired_count = 0
+        self.cancelled_count = 0
+        self.replaced_count = 0
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="ClickScheduler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            thread = self._thread
+            self._thread = None
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        self.cancel_all()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def schedule(self, delay, action, key=None, on_cancel=None):
+        return self.schedule_at(
+            time.perf_counter() + max(float(delay), 0.0), action, key, on_cancel
+        )
+
+    def schedule_at(self, deadline, action, key=None, on_cancel=None):
+        if not self.is_alive():
+            self.start()
+        request = ClickRequest(deadline, action, key, on_cancel)
+        with self._condition:
+            if key is not None:
+                previous = self._keyed.get(key)
+                if previous is not None and previous.pending:
+                    previous.state = "replaced"
+                    self.replaced_count += 1
+                self._keyed[key] = request
+            heapq.heappush(self._heap, (deadline, next(self._sequence), request))
+            self._condition.notify()
+        return request
+
+    def reschedule(self, key, delay):
+        return self.reschedule_at(key, time.perf_counter() + max(float(delay), 0.0))
+
+    def reschedule_at(self, key, deadline):
+        # Moves a still-pending request to a new deadline. Returns None when
+        # it has already fired or was cancelled, so the caller never ends up
+        # with two clicks for one decision.
+        with self._condition:
+            previous = self._keyed.get(key)
+            if previous is None or not previous.pending:
+                return None
+            previous.state = "replaced"
+            self.replaced_count += 1
+            request = ClickRequest(deadline, previous.action, key, previous.on_cancel)
+            self._keyed[key] = request
+            heapq.heappush(self._heap, (deadline, next(self._sequence), request))
+            self._condition.notify()
+        return request
+
+    def is_pending(self, key):
+        with self._condition:
+            request = self._keyed.get(key)
+            return request is not None and request.pending
+
+    def cancel(self, request_or_key):
+        with self._condition:
+            if isinstance(request_or_key, ClickRequest):
+                request = request_or_key
+            else:
+                request = self._keyed.get(request_or_key)
+            if request is None or not request.pending:
+                return False
+            request.state = "cancelled"
+            self.cancelled_count += 1
+            if request.key is not None and self._keyed.get(request.key) is request:
+                del self._keyed[request.key]
+        self._notify_cancelled(request)
+        return True
+
+    def cancel_all(self):
+        with self._condition:
+            cancelled = [entry[2] for entry in self._heap if entry[2].pending]
+            for request in cancelled:
+                request.state = "cancelled"
+            self.cancelled_count += len(cancelled)
+            self._heap = []
+            self._keyed.clear()
+        for request in cancelled:
+            self._notify_cancelled(request)
+        return len(cancelled)
+
+    def _notify_cancelled(self, request):
+        if request.on_cancel is None:
+            return
+        try:
+            request.on_cancel()
+        except Exception as e:
+            logger.error(f"Click cancel callback failed: {e}")
+
+    def get_stats(self):
+        with self._condition:
+            errors = sorted(self.fire_errors)
+            stats = {
+                "fired": self.fired_count,
+                "cancelled": self.cancelled_count,
+                "replaced": self.replaced_count,
+                "pending": sum(1 for entry in self._heap if entry[2].pending),
+            }
+        if errors:
+            p99_index = min(int(len(errors) * 0.99), len(errors) - 1)
+            stats["error_p50_ms"] = errors[len(errors) // 2] * 1000.0
+            stats["error_p99_ms"] = errors[p99_index] * 1000.0
+            stats["error_max_ms"] = errors[-1] * 1000.0
+        return stats
+
+    def _next_request(self):
+        heap = self._heap
+        while heap and not heap[0][2].pending:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                request = self._next_request()
+                if request is None:
+                    self._condition.wait()
+                    continue
+                remaining = request.deadline - time.perf_counter()
+                if remaining > self.wait_margin:
+                    self._condition.wait(remaining - self.wait_margin)
+                    continue
+
+            if remaining > self.spin_threshold:
+                time.sleep(min(remaining - self.spin_threshold, self.sleep_step))
+                continue
+            deadline = request.deadline
+            while time.perf_counter() < deadline:
+                pass
+
+            with self._condition:
+                # Replaced or cancelled while spinning
+                if not request.pending or not self._running:
+                    continue
+                request.state = "fired"
+                if request.key is not None and self._keyed.get(request.key) is request:
+                    del self._keyed[request.key]
+                fired_at = time.perf_counter()
+                request.fired_at = fired_at
+                self.fire_errors.append(fired_at - deadline)
+                self.fired_count += 1
+
+            try:
+                request.action()
+            except Exception as e:
+                logger.error(f"Scheduled click failed: {e}")
@@ -1,5 +1,98 @@
 import os
 import keyboard
+from utils.debug_logger import logger
+
+
+DEFAULT_PARAMS = {
+    "line_sensitivity": 100,
+    "zone_min_width": 100,
+    "saturation_threshold": 0.5,
+    "min_zone_height_percent": 100,
+    "sweet_spot_width_percent": 20,
+    "velocity_based_width_enabled": False,
+    "velocity_width_multiplier": 1.5,
+    "velocity_max_factor": 2000.0,
+    "prediction_enabled": True,
+    "prediction_confidence_threshold": 0.6,
+    "prediction_method": "velocity",
+    "reschedule_pending_clicks": False,
+    "zone_smoothing_factor": 1.0,
+    "line_exclusion_radius": 8,
+    "post_click_blindness": 50,
+    "max_zone_width_percent": 80,
+    "target_fps": 120,
+    "line_detection_offset": 5.0,
+    "line_tracking_enabled": True,
+    "zone_tracking_enabled": True,
+    "system_latency": "auto",
+    "main_on_top": True,
+    "preview_on_top": True,
+    "debug_on_top": True,
+    "debug_enabled": False,
+    "screenshot_fps": 240,
+    "auto_sell_enabled": False,
+    "sell_every_x_digs": 10,
+    "sell_delay": 1000,
+    "auto_sell_method": "button_click",
+    "auto_sell_ui_sequence": "down,up,enter",
+    "auto_sell_ui_navigation_key": "\\",
+    "auto_sell_inventory_key": "g",
+    "auto_sell_inventory_open_delay": 900,
+    "auto_sell_inventory_close_delay": 900,
+    "auto_sell_visual_confirmation": True,
+    "auto_sell_target_engagement_enabled": True,
+    "auto_sell_target_engagement_timeout": 120.0,
+    # Otsu detection parameters
+    "use_otsu_detection": False,
+    "otsu_min_area": 50,
+    "otsu_max_area": "",
+    "otsu_morph_kernel_size": 3,
+    "otsu_adaptive_area": True,
+    "otsu_area_percentile": 0.1,
+    "otsu_disable_color_lock": False,
+    # Color picker detection parameters
+    "use_color_picker_detection": False,
+    "picked_color_rgb": "",  # RGB color in hex format (e.g., "#FF0000")
+    "color_tolerance": 30,
+    "auto_walk_enabled": False,
+    "walk_duration": 500,
+    "max_wait_time": 5000,
+    "dynamic_walkspeed_enabled": False,
+    "initial_item_count": 0,
+    "initial_walkspeed_decrease": 0.0,
+    "auto_shovel_enabled": False,
+    "shovel_slot": 1,
+    "shovel_timeout": 5,
+    "auto_rejoin_enabled": False,
+    "roblox_server_link": "",
+    "rejoin_check_interval": 30,
+    "auto_rejoin_restart_delay": 60,
+    "auto_rejoin_discord_notifications": True,
+    "user_id": "",
+    "server_id": "",
+    "webhook_url": "",
+    "milestone_interval": 100,
+    "money_area": None,
+    "item_area": None,
+    "use_custom_cursor": False,
+    "shovel_equip_mode": "double",
+    "include_screenshot_in_discord": False,
+    "enable_money_detection": False,
+    "enable_item_detection": False,
+    "money_color_tolerance": 35,
+    "notification_rarities": ["scarce", "legendary", "mythical", "divine", "prismatic"],
+    "live_stats_screenshots_enabled": False,
+    "live_stats_screenshot_interval": 30,
+    "live_stats_per_dig_enabled": False,
+    "live_stats_min_interval": 5.0,
+    "discord_screenshot_max_dimension": 1280,
+    "discord_screenshot_preset": "balanced",
+    "discord_enabled": False,
+    "record_frames": False,
+    "telemetry_enabled": False,
+    "telemetry_minutes": 15
+}
+
 
 def ensure_debug_dir(dig_tool_instance):
     if get_param(dig_tool_instance, "debug_enabled") and not os.path.exists(
@@ -8,6 +101,29 @@ def ensure_debug_dir(dig_tool_instance):
         os.makedirs(dig_tool_instance.debug_dir)
 
 
+def _coerce_param_value(value, default_value):
+    if isinstance(value, str) and value.strip() == "":
+        return default_value
+
+    if default_value is not None:
+        if isinstance(default_value, bool):
+            return bool(value)
+        elif isinstance(default_value, int):
+            try:
+                return int(float(value)) if isinstance(value, str) else int(value)
+            except (ValueError, TypeError):
+                return default_value
+        elif isinstance(default_value, float):
+            try:
+                return float(value)
+            except (ValueError, TypeError):
+                return default_value
+        else:
+            return value
+
+    return value
+
+
 def get_param(dig_tool_instance, key):
     if key == "system_latency":
         from utils.system_utils import get_cached_system_latency
@@ -18,26 +134,7 @@ def get_param(dig_tool_instance, key):
     if key in dig_tool_instance.param_vars:
         try:
             value = dig_tool_instance.param_vars[key].get()
-            if isinstance(value, str) and value.strip() == "":
-                return default_value
-            
-            if default_value is not None:
-                if isinstance(default_value, bool):
-                    return bool(value)
-                elif isinstance(default_value, int):
-                    try:
-                        return int(float(value)) if isinstance(value, str) else int(value)
-                    except (ValueError, TypeError):
-                        return default_value
-                elif isinstance(default_value, float):
-                    try:
-                        return float(value)
-                    except (ValueError, TypeError):
-                        return default_value
-                else:
-                    return value
-            
-            return value
+            return _coerce_param_value(value, default_value)
         except:
             if default_value is not None:
                 try:
@@ -50,6 +147,73 @@ def get_param(dig_tool_instance, key):
     return attr_value if attr_value is not None else default_value
 
 
+class ParamSnapshot:
+    __slots__ = ("_values", "version")
+
+    def __init__(self, values, version=0):
+        object.__setattr__(self, "_values", dict(values))
+        object.__setattr__(self, "version", version)
+
+    def __getattr__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ParamSnapshot is immutable")
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def as_dict(self):
+        return dict(self._values)
+
+
+class ParamSnapshotStore:
+    # Params that are not backed by a Tk variable or change outside of traces
+    excluded_keys = ("system_latency",)
+
+    def __init__(self, dig_tool_instance):
+        self.dig_tool = dig_tool_instance
+        self._traced_vars = {}
+        self._rebuild_pending = False
+        self.current = ParamSnapshot({})
+
+    def _trace_new_vars(self):
+        for key, var in self.dig_tool.param_vars.items():
+            if key in self.excluded_keys or self._traced_vars.get(key) is var:
+                continue
+            try:
+                var.trace_add("write", self._on_param_write)
+                self._traced_vars[key] = var
+            except Exception as e:
+                logger.warning(f"Could not trace parameter {key}: {e}")
+
+    def _on_param_write(self, *args):
+        if self._rebuild_pending:
+            return
+        self._rebuild_pending = True
+        try:
+            self.dig_tool.root.after_idle(self.rebuild)
+        except Exception:
+            self._rebuild_pending = False
+
+    def rebuild(self):
+        self._rebuild_pending = False
+        self._trace_new_vars()
+        values = {}
+        for key in self.dig_tool.param_vars:
+            if key not in self.excluded_keys:
+                values[key] = get_param(self.dig_tool, key)
+        # Single reference assignment, so readers on other threads always see a whole snapshot
+        self.current = ParamSnapshot(values, self.current.version + 1)
+        return self.current
+
+
 def set_param(dig_tool_instance, key, value):
     if key in dig_tool_instance.param_vars:
         try:
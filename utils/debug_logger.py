@@ -1,13 +1,17 @@
 import time
+import collections
+import itertools
 from datetime import datetime
 from enum import Enum
-import queue
 import os
 import cv2
 import sys
 import io
 import signal
 import atexit
+import gzip
+import shutil
+import threading
 import tkinter as tk
 
 from tkinter import filedialog, messagebox
@@ -61,17 +65,31 @@ def get_debug_info(debug_dir=None):
     }
 
 
-def save_debug_screenshot(screenshot, line_pos, sweet_spot_start, sweet_spot_end, zone_y2_cached, click_count, debug_dir, smoothed_zone_x, smoothed_zone_w):
-    try:
+def render_debug_screenshot(screenshot, line_pos, sweet_spot_start, sweet_spot_end, zone_y2_cached, smoothed_zone_x, smoothed_zone_w):
+    if screenshot.ndim == 3 and screenshot.shape[2] == 4:
+        debug_img = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR)
+    else:
         debug_img = screenshot.copy()
-        height = debug_img.shape[0]
-        if smoothed_zone_x is not None:
-            cv2.rectangle(debug_img, (int(smoothed_zone_x), 0), (int(smoothed_zone_x + smoothed_zone_w), zone_y2_cached), (0, 255, 0), 3)
-        if sweet_spot_start is not None and sweet_spot_end is not None:
-            cv2.rectangle(debug_img, (int(sweet_spot_start), 0), (int(sweet_spot_end), zone_y2_cached), (0, 255, 255), 3)
-        if line_pos != -1:
-            cv2.line(debug_img, (line_pos, 0), (line_pos, height), (0, 0, 255), 2)
-        filename = f"click_{click_count + 1:03d}_{int(time.time())}.jpg"
+    height = debug_img.shape[0]
+    if smoothed_zone_x is not None:
+        cv2.rectangle(debug_img, (int(smoothed_zone_x), 0), (int(smoothed_zone_x + smoothed_zone_w), zone_y2_cached), (0, 255, 0), 3)
+    if sweet_spot_start is not None and sweet_spot_end is not None:
+        cv2.rectangle(debug_img, (int(sweet_spot_start), 0), (int(sweet_spot_end), zone_y2_cached), (0, 255, 255), 3)
+    if line_pos != -1:
+        cv2.line(debug_img, (line_pos, 0), (line_pos, height), (0, 0, 255), 2)
+    return debug_img
+
+
+def get_debug_screenshot_filename(click_count, timestamp=None):
+    if timestamp is None:
+        timestamp = time.time()
+    return f"click_{click_count + 1:03d}_{int(timestamp)}.jpg"
+
+
+def save_debug_screenshot(screenshot, line_pos, sweet_spot_start, sweet_spot_end, zone_y2_cached, click_count, debug_dir, smoothed_zone_x, smoothed_zone_w, timestamp=None):
+    try:
+        debug_img = render_debug_screenshot(screenshot, line_pos, sweet_spot_start, sweet_spot_end, zone_y2_cached, smoothed_zone_x, smoothed_zone_w)
+        filename = get_debug_screenshot_filename(click_count, timestamp)
         filepath = os.path.join(debug_dir, filename)
         cv2.imwrite(filepath, debug_img)
         return filename
@@ -79,12 +97,17 @@ def save_debug_screenshot(screenshot, line_pos, sweet_spot_start, sweet_spot_end
         return None
 
 
-def log_click_debug(click_count, line_pos, velocity, acceleration, sweet_spot_start, sweet_spot_end, prediction_used, confidence, filename, debug_log_path):
+def format_click_debug_entry(click_count, line_pos, velocity, acceleration, sweet_spot_start, sweet_spot_end, prediction_used, confidence, filename, timestamp=None):
+    if timestamp is None:
+        timestamp = time.time()
+    return (f"{int(timestamp * 1000)} - Click {click_count}: Line={line_pos}, Vel={velocity:.1f}, Acc={acceleration:.1f}, "
+            f"Sweet={sweet_spot_start:.1f}-{sweet_spot_end:.1f}, Pred={'Y' if prediction_used else 'N'}, "
+            f"Conf={confidence:.2f}, File={filename}")
+
+
+def log_click_debug(click_count, line_pos, velocity, acceleration, sweet_spot_start, sweet_spot_end, prediction_used, confidence, filename, debug_log_path, timestamp=None):
     try:
-        timestamp = int(time.time() * 1000)
-        log_entry = (f"{timestamp} - Click {click_count}: Line={line_pos}, Vel={velocity:.1f}, Acc={acceleration:.1f}, "
-                    f"Sweet={sweet_spot_start:.1f}-{sweet_spot_end:.1f}, Pred={'Y' if prediction_used else 'N'}, "
-                    f"Conf={confidence:.2f}, File={filename}")
+        log_entry = format_click_debug_entry(click_count, line_pos, velocity, acceleration, sweet_spot_start, sweet_spot_end, prediction_used, confidence, filename, timestamp)
         with open(debug_log_path, "a") as f:
             f.write(f"{log_entry}\n")
     except Exception:
@@ -98,6 +121,250 @@ class LogLevel(Enum):
     ERROR = 4
 
 
+# Plain ints so the level check in debug()/info()/warning() is one comparison
+_DEBUG_VALUE = LogLevel.DEBUG.value
+_INFO_VALUE = LogLevel.INFO.value
+_WARNING_VALUE = LogLevel.WARNING.value
+
+
+# One log call. The message is only %-formatted with its args, and the
+# monotonic timestamp only turned into a wall-clock string, when a sink
+# (console, file, latest.log) actually reads the record.
+class LogRecord:
+    __slots__ = ("timestamp_ns", "level", "msg", "args", "_message")
+
+    def __init__(self, timestamp_ns, level, msg, args):
+        self.timestamp_ns = timestamp_ns
+        self.level = level
+        self.msg = msg
+        self.args = args
+        self._message = None
+
+    @property
+    def message(self):
+        if self._message is None:
+            msg = str(self.msg)
+            if self.args:
+                try:
+                    msg = msg % self.args
+                except Exception:
+                    msg = f"{msg} {self.args!r}"
+            self._message = msg
+        return self._message
+
+
+# Appends log records to a file from its own thread. Logging threads only
+# push the record onto a deque; the writer wakes every flush_interval (or as
+# soon as a batch is waiting), formats the batch and writes it through one
+# large buffered handle. The file is rolled to path.1, path.2, ... once it
+# passes max_bytes or has been open for rotate_interval seconds, optionally
+# gzipping the rolled copies.
+class LogFileSink:
+    def __init__(
+        self,
+        path,
+        formatter,
+        header=None,
+        max_bytes=10 * 1024 * 1024,
+        rotate_interval=None,
+        backup_count=3,
+        compress=False,
+        roll_existing=False,
+        flush_interval=0.5,
+        batch_size=500,
+        max_pending=100000,
+        buffer_size=256 * 1024,
+    ):
+        self.path = path
+        self.formatter = formatter
+        self.header = header
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = max(int(backup_count), 0)
+        self.compress = compress
+        self.roll_existing = roll_existing
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self._pending = collections.deque(maxlen=max_pending)
+        self._wake = threading.Event()
+        # flush() waits on this until the writer has handled every record
+        # submitted before the call
+        self._progress = threading.Condition()
+        self._submit_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._closing = False
+        self._stream = None
+        self._size = 0
+        self._opened_at = 0.0
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rotations = 0
+
+    def submit(self, record):
+        if self._closing:
+            return
+        if self._thread is None:
+            self._start()
+        pending = self._pending
+        with self._submit_lock:
+            if len(pending) == pending.maxlen:
+                # The oldest waiting record falls off the deque
+                self.dropped += 1
+            pending.append(record)
+            self.submitted += 1
+        if len(pending) >= self.batch_size:
+            self._wake.set()
+
+    def flush(self, timeout=None):
+        # Wakes the writer; with a timeout, waits until every record submitted
+        # so far is written (or dropped) and returns whether that happened
+        if self._thread is None:
+            return True
+        target = self.submitted
+        self._wake.set()
+        if not timeout:
+            return False
+        with self._progress:
+            return self._progress.wait_for(lambda: self._handled() >= target, timeout)
+
+    def _handled(self):
+        return self.written + self.dropped + self.failed
+
+    def close(self, timeout=2.0):
+        self._closing = True
+        thread = self._thread
+        if thread is None:
+            return
+        self._wake.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="LogFileSink", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                closing = self._closing
+                self._drain()
+                if closing:
+                    break
+        finally:
+            self._close_stream()
+            with self._progress:
+                self._progress.notify_all()
+
+    def _drain(self):
+        pending = self._pending
+        while pending:
+            lines = []
+            try:
+                for _ in range(self.batch_size):
+                    lines.append(self.formatter(pending.popleft()))
+            except IndexError:
+                pass
+            if lines:
+                self._write("".join(lines), len(lines))
+        if self._stream is not None:
+            try:
+                self._stream.flush()
+            except Exception:
+                pass
+        with self._progress:
+            self._progress.notify_all()
+
+    def _write(self, text, count):
+        try:
+            if self._stream is None:
+                self._open()
+            elif self._should_rotate():
+                self._rotate()
+                self._open()
+            self._stream.write(text)
+            # max_bytes is compared against bytes on disk, not characters
+            self._size += len(text.encode("utf-8"))
+            self.written += count
+        except Exception as e:
+            self.failed += count
+            self._close_stream()
+            try:
+                print(f"Error writing log file {self.path}: {e}")
+            except:
+                pass
+
+    def _should_rotate(self):
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        return bool(
+            self.rotate_interval and time.time() - self._opened_at >= self.rotate_interval
+        )
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.roll_existing:
+            # The previous session's file is kept as the first backup
+            self.roll_existing = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                self._roll_files()
+        self._stream = open(self.path, "a", encoding="utf-8", buffering=self.buffer_size)
+        self._size = self._stream.tell()
+        self._opened_at = time.time()
+        if self.header and self._size == 0:
+            header = self.header() if callable(self.header) else self.header
+            self._stream.write(header)
+            self._size += len(header.encode("utf-8"))
+
+    def _close_stream(self):
+        stream = self._stream
+        self._stream = None
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def _rotate(self):
+        self._close_stream()
+        self._roll_files()
+        self.rotations += 1
+
+    def _backup_path(self, index):
+        suffix = ".gz" if self.compress else ""
+        return f"{self.path}.{index}{suffix}"
+
+    def _roll_files(self):
+        if self.backup_count == 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self._backup_path(index)
+            if os.path.exists(source):
+                os.replace(source, self._backup_path(index + 1))
+        if not self.compress:
+            os.replace(self.path, self._backup_path(1))
+            return
+        rolled = f"{self.path}.rolling"
+        os.replace(self.path, rolled)
+        try:
+            with open(rolled, "rb") as source, gzip.open(self._backup_path(1), "wb") as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+        finally:
+            os.remove(rolled)
+
+
 class ConsoleRedirector(io.TextIOBase):
     def __init__(self, logger_instance, log_level=LogLevel.INFO, stream_name="CONSOLE"):
         self.logger = logger_instance
@@ -125,8 +392,11 @@ class ConsoleRedirector(io.TextIOBase):
 
 
 class DebugLogger:
-    def __init__(self):
-        self.log_queue = queue.Queue(maxsize=1000)
+    def __init__(self, history_size=10000):
+        # Records waiting for the console window; the oldest are dropped if it
+        # falls behind. deque append/popleft are atomic, so logging threads
+        # never take a lock here.
+        self.log_queue = collections.deque(maxlen=1000)
         self.console_window = None
         self.console_text = None
         self.auto_scroll = True
@@ -135,13 +405,22 @@ class DebugLogger:
         self.save_to_file = False
         self.redirect_to_console = False
         self.logging_enabled = True
+        self._threshold = _DEBUG_VALUE
         self.log_file = None
-        self.log_history = []
-        self._last_update_time = 0
-        self._update_interval = 0.1
+        self.log_history = collections.deque(maxlen=history_size)
+        self._wall_origin = time.time()
+        self._monotonic_origin = time.monotonic_ns()
+        self._last_update_ns = 0
+        self._update_interval_ns = 100_000_000
         self._batch_size = 50
-        self._file_buffer = []
-        self._buffer_size = 100
+        self._file_sink = None
+        self.latest_log_sink = LogFileSink(
+            os.path.join(setup_debug_directory(), "latest.log"),
+            self._format_log_message,
+            header=self._latest_log_header,
+            compress=True,
+            roll_existing=True,
+        )
         self.capture_console_output = False
         self.original_stdout = None
         self.original_stderr = None
@@ -159,11 +438,11 @@ class DebugLogger:
         self._setup_exit_handlers()
 
     def _setup_exit_handlers(self):
-        atexit.register(self._save_latest_log)
+        atexit.register(self._close_file_sinks)
         def signal_handler(signum, frame):
             try:
                 self.error(f"Application terminated by signal {signum}")
-                self._save_latest_log()
+                self._close_file_sinks()
             except:
                 pass
             sys.exit(1)
@@ -175,52 +454,59 @@ class DebugLogger:
         except:
             pass
 
-    def debug(self, message):
-        self._log(LogLevel.DEBUG, message)
+    # Messages take %-style args, formatted only if a sink reads the record:
+    # logger.debug("Line at %d, velocity %.1f", line_pos, velocity)
+    def debug(self, message, *args):
+        if self._threshold <= _DEBUG_VALUE:
+            self._log(LogLevel.DEBUG, message, args)
 
-    def info(self, message):
-        self._log(LogLevel.INFO, message)
+    def info(self, message, *args):
+        if self._threshold <= _INFO_VALUE:
+            self._log(LogLevel.INFO, message, args)
 
-    def warning(self, message):
-        self._log(LogLevel.WARNING, message)
+    def warning(self, message, *args):
+        if self._threshold <= _WARNING_VALUE:
+            self._log(LogLevel.WARNING, message, args)
 
-    def error(self, message):
-        self._log(LogLevel.ERROR, message)
+    def error(self, message, *args):
+        self._log(LogLevel.ERROR, message, args)
 
-    def _log(self, level, message):
-        if not self.logging_enabled and level not in [LogLevel.ERROR, LogLevel.WARNING]:
+    def _log(self, level, message, args=()):
+        if level.value < self._threshold:
             return
         try:
-            if self.log_queue.full():
-                try:
-                    self.log_queue.get_nowait()
-                except queue.Empty:
-                    pass
-            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            log_entry = {"timestamp": timestamp, "level": level, "message": str(message)}
-            if len(self.log_history) > 10000:
-                self.log_history = self.log_history[-5000:]
-            self.log_history.append(log_entry)
-            if self.redirect_to_console and not str(message).startswith("[STDOUT]") and not str(message).startswith("[STDERR]"):
-                level_info = self.log_levels[level]
-                formatted_message = f"{timestamp} {level_info['prefix']} {message}"
-                print(formatted_message)
-            self.log_queue.put_nowait(log_entry)
+            record = LogRecord(time.monotonic_ns(), level, message, args)
+            self.log_history.append(record)
+            self.log_queue.append(record)
+            self.latest_log_sink.submit(record)
+            if self.redirect_to_console:
+                message_text = record.message
+                if not message_text.startswith("[STDOUT]") and not message_text.startswith("[STDERR]"):
+                    print(self._format_log_message(record), end="")
             if self.save_to_file and self.log_file:
-                self._buffer_file_write(log_entry)
-            current_time = time.time()
-            if (self.console_window and self.console_text and current_time - self._last_update_time > self._update_interval):
-                self._last_update_time = current_time
-                self.console_window.after_idle(self._update_console)
+                self._buffer_file_write(record)
+            if self.console_window and self.console_text:
+                now_ns = record.timestamp_ns
+                if now_ns - self._last_update_ns > self._update_interval_ns:
+                    self._last_update_ns = now_ns
+                    self.console_window.after_idle(self._update_console)
         except:
             pass
 
     def set_logging_enabled(self, enabled):
-        self.logging_enabled = enabled
         if enabled:
+            self.logging_enabled = True
+            self._threshold = _DEBUG_VALUE
             self.info("Debug logging manually enabled")
         else:
             self.info("Debug logging manually disabled")
+            self.logging_enabled = False
+            # Warnings and errors are always kept
+            self._threshold = _WARNING_VALUE
+
+    def format_timestamp(self, timestamp_ns):
+        wall_time = self._wall_origin + (timestamp_ns - self._monotonic_origin) / 1e9
+        return datetime.fromtimestamp(wall_time).strftime("%H:%M:%S.%f")[:-3]
 
     def enable_console_capture(self):
         if not self.capture_console_output:
@@ -263,43 +549,47 @@ class DebugLogger:
         if self.console_text:
             self._populate_console_with_history_progressive()
 
-    def _format_log_message(self, entry):
-        level_info = self.log_levels[entry["level"]]
-        return f"{entry['timestamp']} {level_info['prefix']} {entry['message']}\n"
+    def _format_log_message(self, record):
+        level_info = self.log_levels[record.level]
+        return f"{self.format_timestamp(record.timestamp_ns)} {level_info['prefix']} {record.message}\n"
 
     def _manage_console_state(self, enabled):
         if self.console_text:
             self.console_text.config(state="normal" if enabled else "disabled")
 
+    def _search_index(self):
+        if self.ui_window is not None:
+            return self.ui_window.search_operations
+        return None
+
     def _add_text_with_tags(self, formatted_message, entry):
-        self.console_text.insert(tk.END, formatted_message)
-        start_index = f"{int(self.console_text.index('end-1c').split('.')[0])}.0"
-        end_index = f"{int(self.console_text.index('end-1c').split('.')[0])}.end"
-        self.console_text.tag_add(f"level_{entry['level'].name}", start_index, end_index)
-        self.console_text.tag_config(f"level_{entry['level'].name}", foreground=self.log_levels[entry["level"]]["color"])
+        self.console_text.insert(tk.END, formatted_message, f"level_{entry.level.name}")
+        search_index = self._search_index()
+        if search_index is not None:
+            search_index.append_entry(entry, formatted_message)
 
     def _cleanup_old_lines(self):
-        line_count = int(self.console_text.index("end-1c").split(".")[0])
-        if line_count > self.max_lines:
-            lines_to_delete = line_count - int(self.max_lines * 0.8)
-            for _ in range(lines_to_delete):
-                try:
-                    self.console_text.delete("1.0", "2.0")
-                except tk.TclError:
-                    break
+        search_index = self._search_index()
+        if search_index is None or search_index.line_count() <= self.max_lines:
+            return
+        # Trim whole records in one delete instead of one line at a time
+        lines_to_delete = search_index.trim_lines(int(self.max_lines * 0.8))
+        if lines_to_delete:
+            try:
+                self.console_text.delete("1.0", f"{lines_to_delete + 1}.0")
+            except tk.TclError:
+                pass
 
     def _clear_console(self):
         if self.console_text:
             self.console_text.config(state="normal")
             self.console_text.delete("1.0", tk.END)
             self.console_text.config(state="disabled")
+        search_index = self._search_index()
+        if search_index is not None:
+            search_index.reset()
         self.log_history.clear()
-        self._file_buffer.clear()
-        while not self.log_queue.empty():
-            try:
-                self.log_queue.get_nowait()
-            except queue.Empty:
-                break
+        self.log_queue.clear()
         if hasattr(self, 'ui_window') and self.ui_window:
             self.ui_window._clear_search()
 
@@ -355,41 +645,51 @@ class DebugLogger:
             filename = filedialog.asksaveasfilename(parent=self.console_window, title="Export Logs", defaultextension=".log",
                 filetypes=[("Log files", "*.log"), ("Text files", "*.txt"), ("All files", "*.*")])
             if filename:
-                try:
-                    with open(filename, "w", encoding="utf-8") as f:
-                        for entry in self.log_history:
-                            f.write(self._format_log_message(entry))
-                    messagebox.showinfo("Export Logs", f"Logs exported to {filename}", parent=self.console_window)
-                except Exception as e:
-                    messagebox.showerror("Export Error", f"Failed to export logs: {e}", parent=self.console_window)
-
-    def _write_log_to_file(self, entry, file_handle=None):
-        formatted_message = self._format_log_message(entry)
-        if file_handle:
-            file_handle.write(formatted_message)
-        elif self.log_file:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(formatted_message)
+                records = list(self.log_history)
+                results = collections.deque()
+                threading.Thread(target=self._write_export, args=(filename, records, results), daemon=True).start()
+                self._poll_export(results)
 
-    def _buffer_file_write(self, entry):
+    def _write_export(self, filename, records, results):
+        # Runs off the UI thread; the result is picked up by _poll_export on the Tk thread
         try:
-            if self.log_file:
-                self._file_buffer.append(entry)
-                if len(self._file_buffer) >= self._buffer_size:
-                    self._flush_file_buffer()
-        except:
+            with open(filename, "w", encoding="utf-8", buffering=256 * 1024) as f:
+                for start in range(0, len(records), 1000):
+                    f.write("".join(self._format_log_message(entry) for entry in records[start:start + 1000]))
+            results.append(("Export Logs", f"Logs exported to {filename}", messagebox.showinfo))
+        except Exception as e:
+            results.append(("Export Error", f"Failed to export logs: {e}", messagebox.showerror))
+
+    def _poll_export(self, results):
+        window = self.console_window
+        if not window:
+            return
+        try:
+            if not results:
+                window.after(100, self._poll_export, results)
+                return
+            title, text, show = results.popleft()
+            show(title, text, parent=window)
+        except Exception:
             pass
 
-    def _flush_file_buffer(self):
+    def _buffer_file_write(self, entry):
         try:
-            if self.log_file and self._file_buffer:
-                with open(self.log_file, "a", encoding="utf-8") as f:
-                    for entry in self._file_buffer:
-                        self._write_log_to_file(entry, f)
-                self._file_buffer.clear()
+            sink = self._file_sink
+            if sink is None or sink.path != self.log_file:
+                if sink is not None:
+                    sink.close()
+                sink = LogFileSink(self.log_file, self._format_log_message)
+                self._file_sink = sink
+            sink.submit(entry)
         except:
             pass
 
+    def _flush_file_buffer(self):
+        if self._file_sink is not None:
+            self._file_sink.flush()
+        self.latest_log_sink.flush()
+
     def _on_console_close(self):
         self._flush_file_buffer()
         if self.console_window and self.console_window.winfo_exists():
@@ -410,10 +710,9 @@ class DebugLogger:
                 self.ui_window.max_lines_var.set(str(self.max_lines))
 
     def _perform_search_operation(self, search_term=None, clear_only=False):
-        if hasattr(self, 'ui_window') and self.ui_window:
-            from interface.debug_logger_window.search_operations import SearchOperations
-            search_ops = SearchOperations(self.ui_window)
-            search_ops.perform_search_operation(search_term, clear_only)
+        search_index = self._search_index()
+        if search_index is not None:
+            search_index.perform_search_operation(search_term, clear_only)
 
     def _on_search_change(self, event=None):
         if hasattr(self, 'ui_window') and self.ui_window and hasattr(self.ui_window, 'search_var'):
@@ -426,51 +725,24 @@ class DebugLogger:
         self._perform_search_operation(clear_only=True)
 
     def cleanup(self):
-        self._save_latest_log()
-        self._flush_file_buffer()
+        self._close_file_sinks()
         self.disable_console_capture() 
-        while not self.log_queue.empty():
-            try:
-                self.log_queue.get_nowait()
-            except queue.Empty:
-                break
+        self.log_queue.clear()
+
+    def _latest_log_header(self):
+        return ("Dig Tool Debug Log - Latest Session\n"
+                "=====================================\n"
+                f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                + "-" * 50 + "\n\n")
 
     def _save_latest_log(self):
-        try:
-            debug_dir = setup_debug_directory()
-            ensure_debug_directory(debug_dir)
-            latest_log_path = os.path.join(debug_dir, "latest.log")
-            with open(latest_log_path, "w", encoding="utf-8") as f:
-                f.write("Dig Tool Debug Log - Latest Session\n")
-                f.write("=====================================\n")
-                f.write(f"Saved at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("-" * 50 + "\n\n")
-                for entry in self.log_history:
-                    level_info = self.log_levels[entry["level"]]
-                    formatted_line = f"{entry['timestamp']} {level_info['prefix']} {entry['message']}\n"
-                    f.write(formatted_line)
-                if not self.log_queue.empty():
-                    f.write("\n--- Remaining Queue Messages ---\n")
-                    temp_queue = []
-                    while not self.log_queue.empty():
-                        try:
-                            entry = self.log_queue.get_nowait()
-                            temp_queue.append(entry)
-                            level_info = self.log_levels[entry["level"]]
-                            formatted_line = f"{entry['timestamp']} {level_info['prefix']} {entry['message']}\n"
-                            f.write(formatted_line)
-                        except queue.Empty:
-                            break
-                    for entry in temp_queue:
-                        try:
-                            self.log_queue.put_nowait(entry)
-                        except queue.Full:
-                            break
-        except Exception as e:
-            try:
-                print(f"Error saving latest.log: {e}")
-            except:
-                pass
+        # latest.log is written as records arrive; this only waits for the backlog
+        self.latest_log_sink.flush(timeout=2.0)
+
+    def _close_file_sinks(self):
+        if self._file_sink is not None:
+            self._file_sink.close()
+        self.latest_log_sink.close()
 
     def _populate_console_with_history_progressive(self):
         if not self.console_text or not self.log_history:
@@ -480,7 +752,11 @@ class DebugLogger:
         try:
             self.console_text.config(state="normal")
             self.console_text.delete("1.0", tk.END)
-            recent_logs = (self.log_history[-self.max_lines :] if len(self.log_history) > self.max_lines else self.log_history)
+            search_index = self._search_index()
+            if search_index is not None:
+                search_index.reset()
+            skip = max(len(self.log_history) - self.max_lines, 0)
+            recent_logs = list(itertools.islice(self.log_history, skip, None))
             self._history_load_index = 0
             self._history_to_load = recent_logs
             self.console_text.update_idletasks()
@@ -532,27 +808,26 @@ class DebugLogger:
         if not self.console_text:
             return
         formatted_message = self._format_log_message(entry)
-        self._manage_console_state(True)
         self._cleanup_old_lines()
         self._add_text_with_tags(formatted_message, entry)
-        self._manage_console_state(False)
-        if self.auto_scroll:
-            self.console_text.see(tk.END)
-        if hasattr(self, 'ui_window') and self.ui_window and hasattr(self.ui_window, 'search_var') and self.ui_window.search_var.get().strip():
-            self._perform_search_operation(self.ui_window.search_var.get().strip())
 
     def _update_console(self):
         if not self.console_text:
             return
         try:
             processed = 0
-            while not self.log_queue.empty() and processed < self._batch_size:
-                entry = self.log_queue.get_nowait()
-                self._add_log_entry(entry)
-                processed += 1
+            # One state toggle and one scroll per batch rather than per entry
+            self._manage_console_state(True)
+            try:
+                while self.log_queue and processed < self._batch_size:
+                    entry = self.log_queue.popleft()
+                    self._add_log_entry(entry)
+                    processed += 1
+            finally:
+                self._manage_console_state(False)
             if processed > 0 and self.auto_scroll:
                 self.console_text.see(tk.END)
-        except queue.Empty:
+        except IndexError:
             pass
 
 
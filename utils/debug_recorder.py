@@ -0,0 +1,247 @@
+import collections
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from utils.debug_logger import (
+    ensure_debug_directory,
+    format_click_debug_entry,
+    get_debug_screenshot_filename,
+    logger,
+    render_debug_screenshot,
+)
+
+
+DROP_POLICIES = ("oldest", "newest")
+
+
+class ClickDebugEntry:
+    __slots__ = ("image", "frame_slot", "copy_buffer", "info")
+
+    def __init__(self, image, frame_slot, copy_buffer, info):
+        self.image = image
+        self.frame_slot = frame_slot
+        self.copy_buffer = copy_buffer
+        self.info = info
+
+
+# Writes per-click debug screenshots and click log lines on a background
+# thread. The click path only pins the frame-ring slot the decision was made
+# on (or copies into a pooled buffer once the pin budget is spent) and queues
+# the metadata. The queue is bounded: when it is full the oldest or the newest
+# entry is dropped, and a click whose frame cannot be held is still logged,
+# just without a screenshot.
+class ClickDebugRecorder:
+    def __init__(
+        self, max_pending=16, max_pinned=1, copy_buffers=2, batch_size=8, drop_policy="oldest"
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.max_pending = max(int(max_pending), 1)
+        # Each pinned slot is one the capture thread cannot write into, so
+        # keep this well under the ring size
+        self.max_pinned = max(int(max_pinned), 0)
+        self.copy_buffers = max(int(copy_buffers), 0)
+        self.batch_size = max(int(batch_size), 1)
+        self.drop_policy = drop_policy
+        self._condition = threading.Condition()
+        self._pending = collections.deque()
+        self._free_buffers = []
+        self._allocated_buffers = 0
+        self._pinned = 0
+        self._thread = None
+        self._running = False
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.images_dropped = 0
+        self.write_errors = 0
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="ClickDebugRecorder", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        # Entries already queued are written before the worker exits
+        with self._condition:
+            self._running = False
+            thread = self._thread
+            self._thread = None
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, screenshot, frame_slot=None, **info):
+        if not self.is_alive():
+            self.start()
+        info.setdefault("timestamp", time.time())
+
+        copy_buffer = None
+        with self._condition:
+            self.submitted += 1
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                if self.drop_policy == "newest":
+                    return False
+                self._release_image(self._pending.popleft())
+
+            if screenshot is None:
+                frame_slot = None
+            elif frame_slot is not None and self._pinned < self.max_pinned:
+                frame_slot.pin()
+                self._pinned += 1
+            else:
+                frame_slot = None
+                copy_buffer = self._take_buffer(screenshot.shape)
+                if copy_buffer is None:
+                    self.images_dropped += 1
+
+        if copy_buffer is not None:
+            np.copyto(copy_buffer, screenshot)
+            image = copy_buffer
+        elif frame_slot is not None:
+            image = screenshot
+        else:
+            image = None
+
+        with self._condition:
+            self._pending.append(ClickDebugEntry(image, frame_slot, copy_buffer, info))
+            self._condition.notify()
+        return True
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "images_dropped": self.images_dropped,
+                "write_errors": self.write_errors,
+                "pending": len(self._pending),
+            }
+
+    def _take_buffer(self, shape):
+        shape = tuple(shape)
+        while self._free_buffers:
+            buffer = self._free_buffers.pop()
+            if buffer.shape == shape:
+                return buffer
+            self._allocated_buffers -= 1
+        if self._allocated_buffers >= self.copy_buffers:
+            return None
+        self._allocated_buffers += 1
+        return np.empty(shape, dtype=np.uint8)
+
+    def _release_image(self, entry):
+        # Called with the condition held
+        if entry.frame_slot is not None:
+            entry.frame_slot.release()
+            entry.frame_slot = None
+            self._pinned -= 1
+        if entry.copy_buffer is not None:
+            self._free_buffers.append(entry.copy_buffer)
+            entry.copy_buffer = None
+        entry.image = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(len(self._pending), self.batch_size))
+                ]
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        log_lines = {}
+        ready_dirs = set()
+        written = 0
+        errors = 0
+        for entry in batch:
+            info = entry.info
+            debug_img = None
+            try:
+                if entry.image is not None:
+                    debug_img = render_debug_screenshot(
+                        entry.image,
+                        info["line_pos"],
+                        info["sweet_spot_start"],
+                        info["sweet_spot_end"],
+                        info["zone_y2"],
+                        info["smoothed_zone_x"],
+                        info["smoothed_zone_w"],
+                    )
+            except Exception as e:
+                errors += 1
+                logger.error(f"Error rendering debug screenshot: {e}")
+            finally:
+                # The ring slot goes back to the capture thread before encoding
+                with self._condition:
+                    self._release_image(entry)
+
+            debug_dir = info["debug_dir"]
+            if debug_dir not in ready_dirs:
+                ensure_debug_directory(debug_dir)
+                ready_dirs.add(debug_dir)
+
+            filename = None
+            if debug_img is not None:
+                filename = get_debug_screenshot_filename(
+                    info["click_count"], info["timestamp"]
+                )
+                try:
+                    if not cv2.imwrite(os.path.join(debug_dir, filename), debug_img):
+                        filename = None
+                        errors += 1
+                except Exception as e:
+                    filename = None
+                    errors += 1
+                    logger.error(f"Error writing debug screenshot: {e}")
+
+            try:
+                log_lines.setdefault(info["debug_log_path"], []).append(
+                    format_click_debug_entry(
+                        info["click_count"] + 1,
+                        info["line_pos"],
+                        info["velocity"],
+                        info["acceleration"],
+                        info["sweet_spot_start"],
+                        info["sweet_spot_end"],
+                        info["prediction_used"],
+                        info["confidence"],
+                        filename,
+                        info["timestamp"],
+                    )
+                )
+                written += 1
+            except Exception as e:
+                errors += 1
+                logger.error(f"Error formatting click debug entry: {e}")
+
+        for debug_log_path, lines in log_lines.items():
+            try:
+                with open(debug_log_path, "a") as f:
+                    f.write("\n".join(lines) + "\n")
+            except Exception as e:
+                errors += 1
+                logger.error(f"Error writing click debug log: {e}")
+
+        with self._condition:
+            self.written += written
+            self.write_errors += errors
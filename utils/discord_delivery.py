@@ -0,0 +1,317 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.debug_logger import logger
+
+
+# Lower values leave the outbox first
+PRIORITY_ALERT = 0
+PRIORITY_NOTIFICATION = 1
+PRIORITY_LIVE_STATS = 2
+
+SUCCESS_STATUS_CODES = (200, 204)
+
+
+class DeliveryJob:
+    __slots__ = ("fn", "args", "kwargs", "priority", "name", "done", "result", "error")
+
+    def __init__(self, fn, args, kwargs, priority, name):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.name = name
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            return None
+        return self.result
+
+
+class RateLimitBucket:
+    __slots__ = ("remaining", "reset_at")
+
+    def __init__(self):
+        self.remaining = None
+        self.reset_at = 0.0
+
+
+def route_key(method, url):
+    # Webhook routes are limited per webhook and message, not per query string
+    return f"{method.upper()} {str(url).split('?', 1)[0]}"
+
+
+# All Discord traffic goes through one worker thread holding a keep-alive
+# session. Work is queued as jobs ordered by priority and then by arrival, so
+# alerts and notifications overtake live-stats edits that are still waiting.
+# A job runs on the worker and may issue several requests; request() called
+# from inside a job runs inline, and from any other thread it is queued as a
+# job of its own and waited on for up to request_wait_timeout. Requests wait
+# out exhausted rate-limit buckets before sending, honor retry_after on 429,
+# and back off with jitter on connection errors and 5xx responses.
+class DiscordDeliveryWorker:
+    def __init__(
+        self,
+        timeout=10.0,
+        max_attempts=5,
+        backoff_base=0.5,
+        backoff_max=30.0,
+        retry_after_max=60.0,
+        request_wait_timeout=120.0,
+        session_factory=None,
+    ):
+        self.timeout = timeout
+        self.max_attempts = max(int(max_attempts), 1)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.request_wait_timeout = request_wait_timeout
+        self._session_factory = session_factory or self._create_session
+        self._session = None
+        self._condition = threading.Condition()
+        self._outbox = []
+        self._delayed = []
+        self._sequence = itertools.count()
+        self._thread = None
+        self._running = False
+        self._stop_event = threading.Event()
+        self._route_buckets = {}
+        self._buckets = {}
+        self._global_reset_at = 0.0
+        self.jobs_run = 0
+        self.requests_sent = 0
+        self.requests_failed = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+    def _create_session(self):
+        session = requests.Session()
+        # One worker thread, so one pooled connection per host is enough
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="DiscordDelivery", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        # Jobs already queued are still delivered until the timeout runs out
+        with self._condition:
+            self._running = False
+            thread = self._thread
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        # Cuts short any rate-limit or backoff wait still in progress
+        self._stop_event.set()
+        with self._condition:
+            if self._thread is thread:
+                self._thread = None
+            dropped = len(self._outbox) + len(self._delayed)
+            for _, _, job in self._outbox + self._delayed:
+                job.done.set()
+            self._outbox = []
+            self._delayed = []
+        if dropped:
+            logger.warning("Discord delivery stopped with %s jobs undelivered", dropped)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def on_worker_thread(self):
+        return self._thread is threading.current_thread()
+
+    def submit(self, fn, *args, priority=PRIORITY_NOTIFICATION, name=None, delay=0.0, **kwargs):
+        # A delayed job joins the outbox at its priority once the delay is up
+        if not self.is_alive():
+            self.start()
+        job = DeliveryJob(fn, args, kwargs, priority, name or getattr(fn, "__name__", "job"))
+        with self._condition:
+            if delay > 0:
+                heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._sequence), job))
+            else:
+                heapq.heappush(self._outbox, (priority, next(self._sequence), job))
+            self._condition.notify()
+        return job
+
+    def request(self, method, url, priority=PRIORITY_NOTIFICATION, **kwargs):
+        if self.on_worker_thread():
+            return self._send(method, url, **kwargs)
+        job = self.submit(
+            self._send, method, url, priority=priority, name=f"{method} request", **kwargs
+        )
+        # A caller stuck behind a long backlog gives up and treats it as a failed send
+        if not job.done.wait(self.request_wait_timeout):
+            logger.warning(f"Discord {method} request not delivered within {self.request_wait_timeout:.0f}s")
+            return None
+        return job.result
+
+    def pending(self):
+        with self._condition:
+            return len(self._outbox) + len(self._delayed)
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                "pending": len(self._outbox) + len(self._delayed),
+                "jobs_run": self.jobs_run,
+                "requests_sent": self.requests_sent,
+                "requests_failed": self.requests_failed,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+            }
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    self._promote_delayed()
+                    if self._outbox or not self._running:
+                        break
+                    timeout = None
+                    if self._delayed:
+                        timeout = self._delayed[0][0] - time.monotonic()
+                    self._condition.wait(timeout)
+                if not self._outbox:
+                    break
+                _, _, job = heapq.heappop(self._outbox)
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+            except Exception as e:
+                job.error = e
+                logger.error(f"Error in Discord delivery job {job.name}: {e}")
+            finally:
+                job.done.set()
+                with self._condition:
+                    self.jobs_run += 1
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _promote_delayed(self):
+        # Called with the condition held
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, sequence, job = heapq.heappop(self._delayed)
+            heapq.heappush(self._outbox, (job.priority, sequence, job))
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            self._stop_event.wait(seconds)
+
+    def _backoff(self, attempt):
+        # Equal jitter: at least half the exponential step, at most all of it
+        step = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return step / 2 + random.uniform(0, step / 2)
+
+    def _wait_for_bucket(self, key):
+        now = time.monotonic()
+        wait_until = self._global_reset_at
+        bucket = self._buckets.get(self._route_buckets.get(key))
+        if bucket is not None and bucket.remaining == 0:
+            wait_until = max(wait_until, bucket.reset_at)
+        if wait_until > now:
+            logger.debug("Waiting %.2fs for Discord rate limit on %s", wait_until - now, key)
+            self._sleep(wait_until - now)
+
+    def _update_bucket(self, key, headers):
+        bucket_id = headers.get("X-RateLimit-Bucket") or key
+        self._route_buckets[key] = bucket_id
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            bucket = self._buckets[bucket_id] = RateLimitBucket()
+        try:
+            if "X-RateLimit-Remaining" in headers:
+                bucket.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset-After" in headers:
+                bucket.reset_at = time.monotonic() + float(headers["X-RateLimit-Reset-After"])
+        except ValueError:
+            bucket.remaining = None
+
+    def _retry_after(self, response):
+        retry_after = None
+        try:
+            body = response.json()
+            retry_after = float(body.get("retry_after"))
+            is_global = bool(body.get("global"))
+        except Exception:
+            is_global = False
+        if retry_after is None:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 1.0))
+            except ValueError:
+                retry_after = 1.0
+        if response.headers.get("X-RateLimit-Global", "").lower() == "true":
+            is_global = True
+        retry_after = min(max(retry_after, 0.0), self.retry_after_max)
+        return retry_after, is_global
+
+    def _send(self, method, url, **kwargs):
+        if self._session is None:
+            self._session = self._session_factory()
+        kwargs.setdefault("timeout", self.timeout)
+        key = route_key(method, url)
+        response = None
+        for attempt in range(self.max_attempts):
+            if self._stop_event.is_set():
+                break
+            if attempt:
+                with self._condition:
+                    self.retries += 1
+            self._wait_for_bucket(key)
+            try:
+                response = self._session.request(method, str(url), **kwargs)
+            except requests.RequestException as e:
+                logger.warning("Discord request failed (attempt %s): %s", attempt + 1, e)
+                response = None
+                self._sleep(self._backoff(attempt))
+                continue
+            finally:
+                with self._condition:
+                    self.requests_sent += 1
+
+            self._update_bucket(key, response.headers)
+            if response.status_code == 429:
+                retry_after, is_global = self._retry_after(response)
+                with self._condition:
+                    self.rate_limited += 1
+                # A little jitter so a burst of waiters does not retry in step
+                delay = retry_after + random.uniform(0, min(1.0, retry_after * 0.1 + 0.05))
+                if is_global:
+                    self._global_reset_at = time.monotonic() + delay
+                logger.warning(
+                    "Discord rate limited%s, retrying in %.2fs",
+                    " (global)" if is_global else "",
+                    delay,
+                )
+                self._sleep(delay)
+                continue
+            if response.status_code >= 500:
+                logger.warning(
+                    "Discord returned %s (attempt %s)", response.status_code, attempt + 1
+                )
+                self._sleep(self._backoff(attempt))
+                continue
+            return response
+
+        with self._condition:
+            self.requests_failed += 1
+        return response
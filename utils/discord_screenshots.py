@@ -0,0 +1,159 @@
+import collections
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from PIL import Image
+
+from utils.debug_logger import logger
+from utils.screen_capture import ScreenCapture
+
+
+# WEBP settings per preset; method trades encode time for size (0 fastest, 6 smallest)
+SCREENSHOT_PRESETS = {
+    "fast": {"quality": 50, "method": 0},
+    "balanced": {"quality": 40, "method": 3},
+    "small": {"quality": 25, "method": 6},
+}
+DEFAULT_SCREENSHOT_PRESET = "balanced"
+DEFAULT_MAX_DIMENSION = 1280
+
+
+def bbox_contains(outer, inner):
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[2] >= inner[2]
+        and outer[3] >= inner[3]
+    )
+
+
+def fit_to_max_dimension(image, max_dimension):
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if not max_dimension or longest <= max_dimension:
+        return image
+    scale = max_dimension / longest
+    size = (max(int(round(width * scale)), 1), max(int(round(height * scale)), 1))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def to_rgb(image):
+    if image.ndim == 3 and image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2RGB)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def encode_webp(rgb_image, preset=DEFAULT_SCREENSHOT_PRESET):
+    options = SCREENSHOT_PRESETS.get(preset, SCREENSHOT_PRESETS[DEFAULT_SCREENSHOT_PRESET])
+    buffer = io.BytesIO()
+    Image.fromarray(rgb_image).save(buffer, format="WEBP", **options)
+    return buffer.getvalue()
+
+
+# Screenshots for Discord attachments. When the main loop's capture thread
+# published a recent frame that covers the requested area, the area is cropped
+# out of that frame instead of grabbing the screen again; anything else is a
+# fresh grab of just that area. The crop is downscaled to the maximum dimension
+# while the frame is pinned, and the WEBP encode runs on a single encoder
+# thread. Encodes of ring frames are cached by frame id, area and settings, so
+# notifications asking for the same frame share one encode.
+class DiscordScreenshotSource:
+    def __init__(self, dig_tool_instance=None, max_frame_age=1.0, cache_size=4):
+        self.dig_tool = dig_tool_instance
+        self.max_frame_age = max_frame_age
+        self.cache_size = max(int(cache_size), 1)
+        self.screen_capture = ScreenCapture()
+        self._encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DiscordEncoder")
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._monitor_bbox = None
+        self.frame_hits = 0
+        self.cache_hits = 0
+        self.grabs = 0
+
+    def close(self):
+        self._encoder.shutdown(wait=False)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "frame_hits": self.frame_hits,
+                "cache_hits": self.cache_hits,
+                "grabs": self.grabs,
+            }
+
+    def monitor_bbox(self):
+        if self._monitor_bbox is None:
+            self._monitor_bbox = self.screen_capture.primary_monitor_bbox()
+        return self._monitor_bbox
+
+    def capture(self, bbox=None, max_dimension=DEFAULT_MAX_DIMENSION, preset=DEFAULT_SCREENSHOT_PRESET, timeout=10.0):
+        try:
+            if bbox is None:
+                bbox = self.monitor_bbox()
+            if bbox is None:
+                return None
+            future = self._encode_from_ring(bbox, max_dimension, preset)
+            if future is None:
+                future = self._encode_fresh_grab(bbox, max_dimension, preset)
+            if future is None:
+                return None
+            return future.result(timeout)
+        except Exception as e:
+            logger.error(f"Error capturing screenshot for Discord: {e}")
+            return None
+
+    def _latest_ring_slot(self):
+        capture_thread = getattr(self.dig_tool, "capture_thread", None)
+        if capture_thread is None or not capture_thread.is_alive():
+            return None
+        return capture_thread.ring.pin_latest()
+
+    def _encode_from_ring(self, bbox, max_dimension, preset):
+        slot = self._latest_ring_slot()
+        if slot is None:
+            return None
+        try:
+            frame_bbox = slot.bbox
+            if (
+                slot.buffer is None
+                or frame_bbox is None
+                or time.perf_counter() - slot.timestamp > self.max_frame_age
+                or not bbox_contains(frame_bbox, bbox)
+            ):
+                return None
+
+            key = (slot.frame_id, tuple(bbox), max_dimension, preset)
+            with self._lock:
+                future = self._cache.get(key)
+                if future is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return future
+
+            left, top = bbox[0] - frame_bbox[0], bbox[1] - frame_bbox[1]
+            crop = slot.buffer[top : top + bbox[3] - bbox[1], left : left + bbox[2] - bbox[0]]
+            # Both steps allocate, so the frame can go back to the ring afterwards
+            rgb = to_rgb(fit_to_max_dimension(crop, max_dimension))
+        finally:
+            slot.release()
+
+        future = self._encoder.submit(encode_webp, rgb, preset)
+        with self._lock:
+            self.frame_hits += 1
+            self._cache[key] = future
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return future
+
+    def _encode_fresh_grab(self, bbox, max_dimension, preset):
+        view = self.screen_capture.capture(bbox, region_key="discord", bgra=True)
+        if view is None:
+            return None
+        rgb = to_rgb(fit_to_max_dimension(view, max_dimension))
+        with self._lock:
+            self.grabs += 1
+        return self._encoder.submit(encode_webp, rgb, preset)
@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from utils.debug_logger import logger
+
+
+CLIP_FORMAT_VERSION = 1
+CLIP_FRAMES_FILE = "frames.raw"
+CLIP_TIMESTAMPS_FILE = "timestamps.raw"
+CLIP_META_FILE = "meta.json"
+
+
+# A clip is a directory holding a raw uint8 frame stack, a float64 timestamp
+# stream (seconds since the first frame, perf_counter based) and a JSON
+# header. Both streams are append-only while recording and memory-mapped
+# when read back.
+class FrameRecorder:
+    def __init__(
+        self,
+        clip_dir,
+        params=None,
+        game_area=None,
+        system_latency_ms=None,
+        max_frames=None,
+    ):
+        self.clip_dir = clip_dir
+        self.params = dict(params) if params else {}
+        self.game_area = list(game_area) if game_area else None
+        self.system_latency_ms = system_latency_ms
+        self.max_frames = max_frames
+        self.frame_count = 0
+        self.skipped_frames = 0
+        self.frame_shape = None
+        self.closed = False
+        self._start_time = None
+        # The capture thread appends while the main loop may stop the recording
+        self._lock = threading.Lock()
+
+        os.makedirs(clip_dir, exist_ok=True)
+        self._frames_file = open(os.path.join(clip_dir, CLIP_FRAMES_FILE), "wb")
+        self._timestamps_file = open(
+            os.path.join(clip_dir, CLIP_TIMESTAMPS_FILE), "wb"
+        )
+
+    def add_frame(self, frame, timestamp=None):
+        with self._lock:
+            return self._add_frame(frame, timestamp)
+
+    def _add_frame(self, frame, timestamp):
+        if self.closed:
+            return False
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        if self.frame_shape is None:
+            self.frame_shape = tuple(frame.shape)
+            self._start_time = timestamp
+        elif tuple(frame.shape) != self.frame_shape:
+            # The container holds a single frame size; resized game areas are dropped
+            self.skipped_frames += 1
+            return False
+
+        if self.max_frames is not None and self.frame_count >= self.max_frames:
+            self.skipped_frames += 1
+            return False
+
+        self._frames_file.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+        self._timestamps_file.write(
+            np.float64(timestamp - self._start_time).tobytes()
+        )
+        self.frame_count += 1
+        return True
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for stream in (self._frames_file, self._timestamps_file):
+            try:
+                stream.close()
+            except Exception as e:
+                logger.error(f"Error closing frame recording stream: {e}")
+
+        meta = {
+            "version": CLIP_FORMAT_VERSION,
+            "frame_count": self.frame_count,
+            "frame_shape": list(self.frame_shape) if self.frame_shape else None,
+            "dtype": "uint8",
+            "skipped_frames": self.skipped_frames,
+            "game_area": self.game_area,
+            "system_latency_ms": self.system_latency_ms,
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "params": self.params,
+        }
+        with open(os.path.join(self.clip_dir, CLIP_META_FILE), "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+
+
+class RecordingCapture:
+    def __init__(self, camera, recorder):
+        self.camera = camera
+        self.recorder = recorder
+
+    def capture(self, bbox=None, region_key=None, bgra=False):
+        screenshot = self.camera.capture(bbox=bbox, region_key=region_key, bgra=bgra)
+        if screenshot is not None and not self.recorder.closed:
+            try:
+                self.recorder.add_frame(screenshot, time.perf_counter())
+            except Exception as e:
+                logger.error(f"Frame recording failed, stopping recorder: {e}")
+                self.recorder.close()
+        return screenshot
+
+    def __getattr__(self, name):
+        return getattr(self.camera, name)
+
+
+class FrameClip:
+    def __init__(self, clip_dir, preload=False):
+        self.clip_dir = clip_dir
+        with open(os.path.join(clip_dir, CLIP_META_FILE), "r") as f:
+            self.meta = json.load(f)
+
+        version = self.meta.get("version")
+        if version != CLIP_FORMAT_VERSION:
+            raise ValueError(f"Unsupported clip format version: {version}")
+
+        frame_count = int(self.meta.get("frame_count", 0))
+        frame_shape = self.meta.get("frame_shape")
+        if frame_count <= 0 or not frame_shape:
+            raise ValueError(f"Clip has no frames: {clip_dir}")
+
+        self.frames = np.memmap(
+            os.path.join(clip_dir, CLIP_FRAMES_FILE),
+            dtype=np.uint8,
+            mode="r",
+            shape=(frame_count,) + tuple(frame_shape),
+        )
+        if preload:
+            self.frames = np.array(self.frames)
+        self.timestamps = np.fromfile(
+            os.path.join(clip_dir, CLIP_TIMESTAMPS_FILE),
+            dtype=np.float64,
+            count=frame_count,
+        )
+        self.params = self.meta.get("params") or {}
+        game_area = self.meta.get("game_area")
+        self.game_area = tuple(game_area) if game_area else None
+        self.system_latency_ms = self.meta.get("system_latency_ms")
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def frame_shape(self):
+        return self.frames.shape[1:]
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1]) if len(self.timestamps) else 0.0
+
+    @property
+    def recorded_fps(self):
+        if len(self.timestamps) < 2 or self.duration <= 0:
+            return 0.0
+        return (len(self.timestamps) - 1) / self.duration
+
+
+class ReplayCapture:
+    def __init__(self, clip, realtime=False, loop=False):
+        self.clip = clip if isinstance(clip, FrameClip) else FrameClip(clip)
+        self.realtime = realtime
+        self.loop = loop
+        self.frame_index = -1
+        self.timestamp = 0.0
+        self._loop_offset = 0.0
+        self._replay_start = None
+
+    @property
+    def exhausted(self):
+        return not self.loop and self.frame_index >= len(self.clip) - 1
+
+    def rewind(self):
+        self.frame_index = -1
+        self.timestamp = 0.0
+        self._loop_offset = 0.0
+        self._replay_start = None
+
+    def capture(self, bbox=None, region_key=None, bgra=False):
+        clip = self.clip
+        next_index = self.frame_index + 1
+        if next_index >= len(clip):
+            if not self.loop:
+                self.frame_index = len(clip)
+                return None
+            frame_interval = 1.0 / clip.recorded_fps if clip.recorded_fps else 0.0
+            self._loop_offset += clip.duration + frame_interval
+            next_index = 0
+
+        timestamp = float(clip.timestamps[next_index]) + self._loop_offset
+        if self.realtime:
+            now = time.perf_counter()
+            if self._replay_start is None:
+                self._replay_start = now - timestamp
+            delay = self._replay_start + timestamp - now
+            if delay > 0:
+                time.sleep(delay)
+
+        self.frame_index = next_index
+        self.timestamp = timestamp
+        frame = clip.frames[next_index]
+        if not bgra and frame.shape[2] == 4:
+            return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        return frame
+
+    def clear_cache(self):
+        pass
+
+    def close(self):
+        pass
@@ -4,62 +4,75 @@ import ctypes
 import tkinter as tk
 import keyboard
 from interface.components import GameOverlay, AutoWalkOverlay
-from utils.debug_logger import logger, save_debug_screenshot, log_click_debug, ensure_debug_directory
+from utils.debug_logger import logger
+from utils.click_scheduler import ClickRequest, ClickScheduler
 from utils.config_management import get_param, validate_keybind
 from utils.system_utils import send_click
 
 
-def perform_click_action(
-    delay, running, use_custom_cursor, cursor_position, click_lock
-):
-    if delay > 0:
-        time.sleep(float(delay))
-        
-    if not running:
-        return
+def perform_click_action(running, use_custom_cursor, cursor_position, click_lock):
+    try:
+        if not running:
+            return
 
-    if use_custom_cursor and cursor_position:
-        try:
-            ctypes.windll.user32.SetCursorPos(*cursor_position)
-        except:
-            pass
+        if use_custom_cursor and cursor_position:
+            try:
+                ctypes.windll.user32.SetCursorPos(*cursor_position)
+            except:
+                pass
 
-    send_click()
-    if click_lock.locked():
-        click_lock.release()
+        send_click()
+    finally:
+        if click_lock.locked():
+            click_lock.release()
 
 
-def cleanup_click_threads(dig_tool_instance):
-    dig_tool_instance._click_thread_pool = [
-        t for t in dig_tool_instance._click_thread_pool if t.is_alive()
-    ]
+def use_custom_cursor(dig_tool_instance):
+    # Clicks fire off the Tk thread, so read the published snapshot rather
+    # than the Tk variable
+    return dig_tool_instance.param_snapshot.current.get("use_custom_cursor", False)
 
 
-def perform_click(dig_tool_instance, delay=0):
+def perform_click(dig_tool_instance):
+    running = dig_tool_instance.running
     perform_click_action(
-        delay,
-        dig_tool_instance.running,
-        get_param(dig_tool_instance, "use_custom_cursor"),
+        running,
+        use_custom_cursor(dig_tool_instance),
         dig_tool_instance.cursor_position,
         dig_tool_instance.click_lock,
     )
-    dig_tool_instance.click_count += 1
+    if running:
+        dig_tool_instance.click_count += 1
+
+
+def _release_click_lock(dig_tool_instance):
+    if dig_tool_instance.click_lock.locked():
+        dig_tool_instance.click_lock.release()
+
+
+def schedule_click(dig_tool_instance, delay=0, key=None, captured_at=None):
+    # The caller holds click_lock; it is released once the click fires or the
+    # request is cancelled, and carried over when the request is rescheduled.
+    # A delay predicted from a frame counts from when that frame was captured.
+    start = time.perf_counter() if captured_at is None else captured_at
+    return dig_tool_instance.click_scheduler.schedule_at(
+        start + max(float(delay), 0.0),
+        lambda: perform_click(dig_tool_instance),
+        key=key,
+        on_cancel=lambda: _release_click_lock(dig_tool_instance),
+    )
 
 
 def perform_instant_click(dig_tool_instance):
-    cleanup_click_threads(dig_tool_instance)
-    if len(dig_tool_instance._click_thread_pool) < dig_tool_instance._max_click_threads:
-        click_thread = threading.Thread(
-            target=lambda: _instant_click(dig_tool_instance), daemon=True
-        )
-        dig_tool_instance._click_thread_pool.append(click_thread)
-        click_thread.start()
+    dig_tool_instance.click_scheduler.schedule(
+        0, lambda: _instant_click(dig_tool_instance)
+    )
 
 
 def _instant_click(dig_tool_instance):
     if not dig_tool_instance.running:
         return
-    if get_param(dig_tool_instance, "use_custom_cursor") and dig_tool_instance.cursor_position:
+    if use_custom_cursor(dig_tool_instance) and dig_tool_instance.cursor_position:
         try:
             ctypes.windll.user32.SetCursorPos(*dig_tool_instance.cursor_position)
         except:
@@ -69,45 +82,26 @@ def _instant_click(dig_tool_instance):
     dig_tool_instance.click_count += 1
 
 
-def save_debug_screenshot_wrapper(
-    dig_tool_instance,
-    screenshot,
-    line_pos,
-    sweet_spot_start,
-    sweet_spot_end,
-    zone_y2_cached,
-    velocity,
-    acceleration,
-    prediction_used=False,
-    confidence=0.0,
-):
-    if not get_param(dig_tool_instance, "debug_enabled"):
-        return
-    ensure_debug_directory(dig_tool_instance.debug_dir)
-    filename = save_debug_screenshot(
-        screenshot,
-        line_pos,
-        sweet_spot_start,
-        sweet_spot_end,
-        zone_y2_cached,
-        dig_tool_instance.click_count,
-        dig_tool_instance.debug_dir,
-        dig_tool_instance.smoothed_zone_x,
-        dig_tool_instance.smoothed_zone_w,
+def record_click_debug(dig_tool_instance, frame, click_count):
+    # Only queues the click; the screenshot and log line are written by the
+    # debug recorder thread
+    dig_tool_instance.debug_recorder.submit(
+        frame.screenshot,
+        frame.frame_slot,
+        click_count=click_count,
+        line_pos=frame.line_pos,
+        sweet_spot_start=frame.sweet_spot_start,
+        sweet_spot_end=frame.sweet_spot_end,
+        zone_y2=frame.zone_y2,
+        velocity=frame.velocity,
+        acceleration=frame.acceleration,
+        prediction_used=frame.prediction_used,
+        confidence=frame.confidence,
+        smoothed_zone_x=dig_tool_instance.smoothed_zone_x,
+        smoothed_zone_w=dig_tool_instance.smoothed_zone_w,
+        debug_dir=dig_tool_instance.debug_dir,
+        debug_log_path=dig_tool_instance.debug_log_path,
     )
-    if filename:
-        log_click_debug(
-            dig_tool_instance.click_count + 1,
-            line_pos,
-            velocity,
-            acceleration,
-            sweet_spot_start,
-            sweet_spot_end,
-            prediction_used,
-            confidence,
-            filename,
-            dig_tool_instance.debug_log_path,
-        )
 
 
 def apply_keybinds(instance):
@@ -0,0 +1,150 @@
+import os
+from pathlib import Path
+
+from utils.debug_logger import logger
+
+
+CHUNK_SIZE = 64 * 1024
+# A line this long without a newline is not a log line worth keeping
+MAX_PARTIAL_LINE = 1024 * 1024
+
+
+# Follows a growing log file through one open handle. Each read picks up from
+# the last offset in fixed-size chunks and hands out buffers that end on a
+# line boundary; a trailing partial line is held back until its newline is
+# written. A file that shrank below the offset was truncated and is read again
+# from the start, and a path that now names a different file is reopened.
+class LogTail:
+    def __init__(self, path, chunk_size=CHUNK_SIZE, max_partial_line=MAX_PARTIAL_LINE):
+        self.path = Path(path)
+        self.chunk_size = max(int(chunk_size), 1)
+        self.max_partial_line = max_partial_line
+        self.position = 0
+        self.bytes_read = 0
+        self.truncations = 0
+        self._file = None
+        self._identity = None
+        self._partial = b""
+        self._discarding = False
+
+    def is_open(self):
+        return self._file is not None
+
+    def line_offset(self):
+        # Offset just past the last whole line handed out
+        return self.position - len(self._partial)
+
+    def open(self, position=None):
+        # Starts at the end of the file unless given an offset to resume from
+        self.close()
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        if position is None or position > stat.st_size:
+            position = stat.st_size
+        self.position = self._file.seek(position)
+        self._partial = b""
+        self._discarding = False
+        return self
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._partial = b""
+        self._discarding = False
+
+    def read_chunks(self):
+        # Yields buffers of whole lines, each ending with b"\n"
+        if self._file is None:
+            return
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.position:
+            logger.info("Log file %s was truncated, reading from the start", self.path.name)
+            self.truncations += 1
+            self._partial = b""
+            self._discarding = False
+            self.position = self._file.seek(0)
+
+        got_data = False
+        while True:
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                break
+            got_data = True
+            self.position += len(chunk)
+            self.bytes_read += len(chunk)
+            last_newline = chunk.rfind(b"\n")
+            if last_newline < 0:
+                if self._discarding:
+                    continue
+                self._partial += chunk
+                if len(self._partial) > self.max_partial_line:
+                    # Skip the rest of this overlong line up to its newline
+                    self._partial = b""
+                    self._discarding = True
+                continue
+            start = 0
+            if self._discarding:
+                start = chunk.find(b"\n") + 1
+                self._discarding = False
+            if self._partial:
+                buffer = self._partial + chunk[: last_newline + 1]
+            else:
+                buffer = chunk[start : last_newline + 1]
+            self._partial = chunk[last_newline + 1 :]
+            if buffer:
+                yield buffer
+
+        if not got_data and self._replaced():
+            logger.info("Log file %s was replaced, reopening", self.path.name)
+            self.open(position=0)
+            yield from self.read_chunks()
+
+    def _replaced(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_dev, stat.st_ino) != self._identity
+
+
+# Finds every keyword across a whole buffer of lines at once. Each keyword is
+# located with bytes.find, which scans in C; CPython's re only takes its fast
+# literal search when a pattern starts with one literal, so an alternation of
+# keywords ends up several times slower than one find pass per keyword. Only
+# lines holding a keyword are decoded, and each line reports the keyword that
+# starts first in it, once.
+class KeywordMatcher:
+    def __init__(self, keywords):
+        self.keywords = [(name, keyword.encode("utf-8")) for name, keyword in keywords]
+
+    def _hits(self, buffer):
+        hits = []
+        for order, (name, keyword) in enumerate(self.keywords):
+            index = buffer.find(keyword)
+            while index >= 0:
+                hits.append((index, order, name))
+                index = buffer.find(keyword, index + len(keyword))
+        hits.sort()
+        return hits
+
+    def scan(self, buffer):
+        # Yields (name, line) for each matching line in a buffer of whole lines
+        line_end = -1
+        for index, _, name in self._hits(buffer):
+            if index <= line_end:
+                continue
+            line_start = buffer.rfind(b"\n", 0, index) + 1
+            line_end = buffer.find(b"\n", index)
+            if line_end < 0:
+                line_end = len(buffer)
+            line = buffer[line_start:line_end].decode("utf-8", errors="ignore").strip()
+            yield name, line
+
+    def match_line(self, line):
+        hits = self._hits(line.encode("utf-8", errors="ignore"))
+        return hits[0][2] if hits else None
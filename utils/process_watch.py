@@ -0,0 +1,78 @@
+import time
+
+from utils.debug_logger import logger
+
+
+RESCAN_BACKOFF_MIN = 2.0
+RESCAN_BACKOFF_MAX = 15.0
+
+
+# Liveness check for one named process. The process table is walked once to
+# find the PID, then only that process is checked; psutil's is_running()
+# compares the creation time as well, so a reused PID does not count. After
+# a miss the full scan is retried no sooner than the backoff, which doubles
+# on every empty scan up to rescan_backoff_max. reset() forces a scan on the
+# next check, for when the process is known to have been restarted.
+class ProcessWatcher:
+    def __init__(
+        self,
+        name_fragment,
+        rescan_backoff_min=RESCAN_BACKOFF_MIN,
+        rescan_backoff_max=RESCAN_BACKOFF_MAX,
+        clock=time.monotonic,
+    ):
+        self.name_fragment = name_fragment
+        self.rescan_backoff_min = rescan_backoff_min
+        self.rescan_backoff_max = max(rescan_backoff_max, rescan_backoff_min)
+        self.clock = clock
+        self.process = None
+        self.scans = 0
+        self._backoff = rescan_backoff_min
+        self._next_scan_time = 0.0
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process is not None else None
+
+    def reset(self):
+        self.process = None
+        self._backoff = self.rescan_backoff_min
+        self._next_scan_time = 0.0
+
+    def is_running(self):
+        if self.process is not None:
+            if self._process_alive(self.process):
+                return True
+            logger.debug("Process %s (%s) exited", self.process.pid, self.name_fragment)
+            self.process = None
+            self._backoff = self.rescan_backoff_min
+            self._next_scan_time = 0.0
+
+        now = self.clock()
+        if now < self._next_scan_time:
+            return False
+        self.process = self._scan()
+        if self.process is not None:
+            self._backoff = self.rescan_backoff_min
+            return True
+        self._next_scan_time = now + self._backoff
+        self._backoff = min(self._backoff * 2, self.rescan_backoff_max)
+        return False
+
+    def _process_alive(self, process):
+        import psutil
+
+        try:
+            return process.is_running()
+        except psutil.Error:
+            return False
+
+    def _scan(self):
+        import psutil
+
+        self.scans += 1
+        for process in psutil.process_iter(["name"]):
+            name = process.info.get("name")
+            if name and self.name_fragment in name:
+                return process
+        return None
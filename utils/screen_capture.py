@@ -1,14 +1,27 @@
 import cv2
 import numpy as np
 import threading
+import time
 import mss
 import os
-import io
-from PIL import Image
 from concurrent.futures import ThreadPoolExecutor
 from utils.debug_logger import logger
 
 
+# Frames captured with bgra=True keep mss's 4-channel layout. Detection reads
+# them directly; anything that draws on or saves a frame converts it here.
+def to_bgr(image):
+    if image.ndim == 3 and image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image.copy()
+
+
+def gray_conversion_code(image):
+    if image.ndim == 3 and image.shape[2] == 4:
+        return cv2.COLOR_BGRA2GRAY
+    return cv2.COLOR_BGR2GRAY
+
+
 class ScreenCapture:
     def __init__(self):
         self._last_bbox = None
@@ -16,8 +29,6 @@ class ScreenCapture:
         self._thread_local = threading.local()
         self._reuse_array = None
         self._last_size = None
-        self._raw_buffer = None
-        self._bgr_view = None
         self._capture_executor = None
         self._region_cache = {}
         os.environ["MSS_COMPRESSION"] = "0"
@@ -30,7 +41,7 @@ class ScreenCapture:
             self._thread_local.sct = mss.mss(compression_level=0)
         return self._thread_local.sct
 
-    def capture(self, bbox=None, region_key=None):
+    def capture(self, bbox=None, region_key=None, bgra=False):
         if not bbox:
             return None
         left, top, right, bottom = bbox
@@ -70,23 +81,22 @@ class ScreenCapture:
                         self._region_cache[region_key] = self._cached_monitor
             if self._last_size != current_size:
                 self._reuse_array = None
-                self._raw_buffer = None
-                self._bgr_view = None
                 self._last_size = current_size
             sct = self._get_sct()
-            if self._raw_buffer is None:
-                total_pixels = width * height
-                self._raw_buffer = np.empty(total_pixels * 4, dtype=np.uint8)
-                self._reuse_array = np.empty((height, width, 3), dtype=np.uint8)
             screenshot = sct.grab(self._cached_monitor)
-            raw_data = np.frombuffer(screenshot.bgra, dtype=np.uint8)
+            # mss hands out a fresh bytearray per grab, so the view stays valid
+            # for as long as a consumer holds on to it
+            raw_data = np.frombuffer(screenshot.raw, dtype=np.uint8)
             if raw_data.size == width * height * 4:
                 bgra_view = raw_data.reshape((height, width, 4))
-                # MSS returns BGRA, OpenCV expects BGR, so map: B->B, G->G, R->R
-                self._reuse_array[:, :, 0] = bgra_view[:, :, 0]  # B->B
-                self._reuse_array[:, :, 1] = bgra_view[:, :, 1]  # G->G
-                self._reuse_array[:, :, 2] = bgra_view[:, :, 2]  # R->R
+                if bgra:
+                    return bgra_view
+                if self._reuse_array is None:
+                    self._reuse_array = np.empty((height, width, 3), dtype=np.uint8)
+                cv2.cvtColor(bgra_view, cv2.COLOR_BGRA2BGR, dst=self._reuse_array)
             else:
+                if self._reuse_array is None:
+                    self._reuse_array = np.empty((height, width, 3), dtype=np.uint8)
                 img_data = np.frombuffer(screenshot.rgb, dtype=np.uint8)
                 img_rgb = img_data.reshape((height, width, 3))
                 # Convert RGB to BGR for OpenCV
@@ -96,10 +106,10 @@ class ScreenCapture:
             logger.error(f"MSS capture failed: {e}")
             return None
 
-    def capture_async(self, bbox=None, region_key=None):
+    def capture_async(self, bbox=None, region_key=None, bgra=False):
         if not self._capture_executor:
-            return self.capture(bbox, region_key)
-        future = self._capture_executor.submit(self.capture, bbox, region_key)
+            return self.capture(bbox, region_key, bgra)
+        future = self._capture_executor.submit(self.capture, bbox, region_key, bgra)
         return future
 
     def clear_cache(self):
@@ -156,22 +166,203 @@ class ScreenCapture:
         return self.capture(bbox)
 
     # BytesIO buffer for attachment uploads
-    def capture_for_discord(self, bbox=None):
+    def primary_monitor_bbox(self):
         try:
-            if bbox:
-                left, top, right, bottom = bbox
-                monitor = {"top": top, "left": left, "width": right - left, "height": bottom - top}
-            else:
-                sct = self._get_sct()
-                monitor = sct.monitors[1]
-            
-            sct = self._get_sct()
-            screenshot = sct.grab(monitor)
-            img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
-            buffer = io.BytesIO()
-            img.save(buffer, format='WEBP', quality=25, optimize=True)
-            buffer.seek(0)
-            return buffer
+            monitor = self._get_sct().monitors[1]
+            return (
+                monitor["left"],
+                monitor["top"],
+                monitor["left"] + monitor["width"],
+                monitor["top"] + monitor["height"],
+            )
         except Exception as e:
-            logger.error(f"Error capturing screenshot for Discord: {e}")
+            logger.error(f"Could not read monitor geometry: {e}")
+            return None
+
+
+class FrameSlot:
+    def __init__(self, ring, index):
+        self.ring = ring
+        self.index = index
+        self.buffer = None
+        self.frame_id = 0
+        self.timestamp = 0.0
+        self.capture_duration = 0.0
+        self.bbox = None
+        self.pins = 0
+
+    def ensure_buffer(self, shape):
+        if self.buffer is None or self.buffer.shape != shape:
+            self.buffer = np.empty(shape, dtype=np.uint8)
+        return self.buffer
+
+    def pin(self):
+        self.ring.pin(self)
+
+    def release(self):
+        self.ring.release(self)
+
+
+# Fixed set of reusable frame buffers shared by one producer and its consumers.
+# Consumers only ever take the newest published slot and pin it while they read
+# it; the producer only writes into slots that are neither newest nor pinned.
+class FrameRing:
+    def __init__(self, size=4):
+        self.slots = [FrameSlot(self, index) for index in range(max(size, 3))]
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._lock)
+        self._latest = None
+        self._write_index = 0
+        self._next_frame_id = 1
+        self.last_consumed_id = 0
+        self.published_frames = 0
+        self.dropped_frames = 0
+        self.skipped_writes = 0
+
+    def allocate(self, shape):
+        with self._lock:
+            for slot in self.slots:
+                if slot.pins == 0 and slot is not self._latest:
+                    slot.ensure_buffer(shape)
+
+    def acquire_write_slot(self):
+        with self._lock:
+            slot_count = len(self.slots)
+            for offset in range(slot_count):
+                slot = self.slots[(self._write_index + offset) % slot_count]
+                if slot.pins == 0 and slot is not self._latest:
+                    self._write_index = (slot.index + 1) % slot_count
+                    return slot
+            self.skipped_writes += 1
             return None
+
+    def publish(self, slot, timestamp, capture_duration=0.0, bbox=None):
+        with self._lock:
+            slot.frame_id = self._next_frame_id
+            slot.timestamp = timestamp
+            slot.capture_duration = capture_duration
+            slot.bbox = bbox
+            self._next_frame_id += 1
+            latest = self._latest
+            if latest is not None and latest.frame_id > self.last_consumed_id:
+                self.dropped_frames += 1
+            self._latest = slot
+            self.published_frames += 1
+            self._frame_ready.notify_all()
+
+    def take_latest(self, after_frame_id=0, timeout=None):
+        with self._lock:
+            if not self._frame_ready.wait_for(
+                lambda: self._latest is not None
+                and self._latest.frame_id > after_frame_id,
+                timeout,
+            ):
+                return None
+            slot = self._latest
+            slot.pins += 1
+            self.last_consumed_id = slot.frame_id
+            return slot
+
+    def pin_latest(self):
+        # For readers outside the main loop: pins the newest frame without
+        # marking it consumed, so drop accounting is unaffected
+        with self._lock:
+            slot = self._latest
+            if slot is not None:
+                slot.pins += 1
+            return slot
+
+    def pin(self, slot):
+        with self._lock:
+            slot.pins += 1
+
+    def release(self, slot):
+        with self._lock:
+            if slot.pins > 0:
+                slot.pins -= 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "published": self.published_frames,
+                "dropped": self.dropped_frames,
+                "skipped_writes": self.skipped_writes,
+            }
+
+
+class CaptureThread:
+    def __init__(self, dig_tool_instance, ring_size=4):
+        self.dig_tool = dig_tool_instance
+        self.ring = FrameRing(ring_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="CaptureProducer"
+        )
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _get_capture_interval(self):
+        param_snapshot = getattr(self.dig_tool, "param_snapshot", None)
+        screenshot_fps = 240
+        if param_snapshot is not None:
+            screenshot_fps = param_snapshot.current.get("screenshot_fps", 240)
+        return 1.0 / max(screenshot_fps, 1)
+
+    def _run(self):
+        dig_tool = self.dig_tool
+        ring = self.ring
+        perf_counter = time.perf_counter
+        wait = self._stop_event.wait
+        frame_shape = None
+
+        while not self._stop_event.is_set():
+            interval = self._get_capture_interval()
+            bbox = dig_tool.game_area
+            if bbox is None:
+                wait(0.01)
+                continue
+
+            grab_start = perf_counter()
+            try:
+                view = dig_tool.cam.capture(
+                    bbox=bbox, region_key=dig_tool.region_key, bgra=True
+                )
+            except Exception as e:
+                logger.error(f"Capture thread grab failed: {e}")
+                view = None
+            grab_end = perf_counter()
+
+            if view is not None:
+                if view.shape != frame_shape:
+                    frame_shape = view.shape
+                    ring.allocate(frame_shape)
+                slot = ring.acquire_write_slot()
+                if slot is not None:
+                    np.copyto(slot.ensure_buffer(view.shape), view)
+                    # The grab happens somewhere inside the call; the midpoint
+                    # is the best available estimate of when the pixels were read
+                    ring.publish(
+                        slot,
+                        (grab_start + grab_end) * 0.5,
+                        grab_end - grab_start,
+                        tuple(bbox),
+                    )
+
+            remaining = interval - (perf_counter() - grab_start)
+            if remaining > 0:
+                # time.sleep uses a high-resolution timer; Event.wait does not on Windows
+                time.sleep(remaining)
@@ -0,0 +1,241 @@
+import time
+
+import cv2
+
+from utils.debug_logger import logger
+
+
+# Hue/saturation histogram of a region; value is left out so brightness
+# changes from the game's day cycle move the score less
+HISTOGRAM_BINS = [30, 32]
+HISTOGRAM_RANGES = [0, 180, 0, 256]
+# Correlation with the capture taken before the inventory key was pressed
+PANEL_OPEN_MAX_CORRELATION = 0.75
+PANEL_CLOSED_MIN_CORRELATION = 0.9
+# Correlation between consecutive polls that counts as a change or as still
+CHANGED_MAX_CORRELATION = 0.9
+SETTLED_MIN_CORRELATION = 0.98
+SETTLED_POLLS = 3
+# Normalized template score, and how far the best match may sit from where
+# the button was learned, so a panel still sliding in does not count
+BUTTON_MATCH_MIN_SCORE = 0.8
+BUTTON_MATCH_MAX_OFFSET = 3
+BUTTON_MATCHED_POLLS = 2
+TEMPLATE_MARGIN = 8
+
+SELL_REGION_SIZE = (160, 80)
+POLL_INTERVAL = 0.05
+
+# The old fixed waits after the sell input, now the sell_processed timeouts
+SELL_PROCESSED_TIMEOUT = 2.5
+UI_SELL_PROCESSED_TIMEOUT = 3.0
+SELL_PROCESSED_MIN_WAIT = 0.5
+
+
+def region_around(position, size=SELL_REGION_SIZE):
+    x, y = int(position[0]), int(position[1])
+    half_width, half_height = size[0] // 2, size[1] // 2
+    return (x - half_width, y - half_height, x + half_width, y + half_height)
+
+
+def region_histogram(image):
+    hsv = cv2.cvtColor(image[:, :, :3], cv2.COLOR_BGR2HSV)
+    histogram = cv2.calcHist([hsv], [0, 1], None, HISTOGRAM_BINS, HISTOGRAM_RANGES)
+    cv2.normalize(histogram, histogram)
+    return histogram
+
+
+def histogram_correlation(histogram, other):
+    return float(cv2.compareHist(histogram, other, cv2.HISTCMP_CORREL))
+
+
+def to_gray(image):
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
+
+
+def template_match(image, template):
+    # Best normalized score and its offset from where the template was cut
+    image_gray = to_gray(image)
+    if image_gray.shape[0] < template.shape[0] or image_gray.shape[1] < template.shape[1]:
+        return 0.0, None
+    scores = cv2.matchTemplate(image_gray, template, cv2.TM_CCOEFF_NORMED)
+    _, best_score, _, best_location = cv2.minMaxLoc(scores)
+    offset = (best_location[0] - TEMPLATE_MARGIN, best_location[1] - TEMPLATE_MARGIN)
+    return float(best_score), offset
+
+
+# Matchers for the sell region. They only look at the image they are given,
+# so they run the same on live grabs and on recorded frames. The closed
+# reference is taken fresh before every sell; the sell button template is
+# learned once the panel has been seen open and kept until the sell button
+# position changes.
+class SellScreenMatcher:
+    def __init__(self):
+        self.closed_histogram = None
+        self.button_template = None
+        self.button_position = None
+
+    def set_closed_reference(self, region):
+        self.closed_histogram = region_histogram(region)
+
+    def closed_correlation(self, region):
+        if self.closed_histogram is None:
+            return None
+        return histogram_correlation(self.closed_histogram, region_histogram(region))
+
+    def inventory_open(self, region):
+        correlation = self.closed_correlation(region)
+        return correlation is not None and correlation < PANEL_OPEN_MAX_CORRELATION
+
+    def inventory_closed(self, region):
+        correlation = self.closed_correlation(region)
+        return correlation is not None and correlation >= PANEL_CLOSED_MIN_CORRELATION
+
+    def has_button_template(self, position=None):
+        if position is not None and self.button_position != tuple(position):
+            return False
+        return self.button_template is not None
+
+    def learn_sell_button(self, region, position=None):
+        height, width = region.shape[:2]
+        if height <= TEMPLATE_MARGIN * 2 or width <= TEMPLATE_MARGIN * 2:
+            return False
+        gray = to_gray(region)
+        self.button_template = gray[
+            TEMPLATE_MARGIN : height - TEMPLATE_MARGIN, TEMPLATE_MARGIN : width - TEMPLATE_MARGIN
+        ].copy()
+        self.button_position = tuple(position) if position is not None else None
+        return True
+
+    def sell_button_visible(self, region):
+        if self.button_template is None:
+            return False
+        score, offset = template_match(region, self.button_template)
+        return (
+            score >= BUTTON_MATCH_MIN_SCORE
+            and offset is not None
+            and max(abs(offset[0]), abs(offset[1])) <= BUTTON_MATCH_MAX_OFFSET
+        )
+
+
+# Waits out one sell step at a time by polling a small screen region until
+# its condition holds. Every wait keeps its old fixed delay as the timeout,
+# so a step the matchers never confirm takes exactly as long as before. With
+# no camera, or when a grab fails, the wait just sleeps out the timeout.
+# camera is anything with ScreenCapture's capture(); clock and sleep can be
+# a replay clock and a no-op to run the steps over a recorded clip.
+class SellVision:
+    def __init__(
+        self,
+        camera,
+        bbox,
+        matcher=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        poll_interval=POLL_INTERVAL,
+    ):
+        self.camera = camera
+        self.bbox = tuple(bbox) if bbox is not None else None
+        self.matcher = matcher or SellScreenMatcher()
+        self.clock = clock
+        self.sleep = sleep
+        self.poll_interval = poll_interval
+        self.step_times = {}
+
+    def capture(self):
+        if self.camera is None or self.bbox is None:
+            return None
+        try:
+            return self.camera.capture(self.bbox, region_key="sell_vision", bgra=True)
+        except Exception as e:
+            logger.debug(f"Sell region capture failed: {e}")
+            return None
+
+    def mark_closed(self):
+        region = self.capture()
+        if region is None:
+            return False
+        self.matcher.set_closed_reference(region)
+        return True
+
+    def pause(self, seconds):
+        if seconds > 0:
+            self.sleep(seconds)
+
+    def wait_until(self, name, condition, timeout, min_wait=0.0):
+        # condition(region) is polled until True; returns whether it was seen
+        start = self.clock()
+        deadline = start + timeout
+        while True:
+            region = self.capture()
+            now = self.clock()
+            if region is None:
+                self.pause(deadline - now)
+                self._record(name, None, timeout)
+                return False
+            # Conditions can keep state across polls, so every poll is checked
+            if condition(region) and now - start >= min_wait:
+                self._record(name, now - start, timeout)
+                return True
+            if now >= deadline:
+                self._record(name, None, timeout)
+                return False
+            self.pause(min(self.poll_interval, deadline - now))
+
+    def wait_inventory_open(self, timeout):
+        return self.wait_until("inventory_open", self.matcher.inventory_open, timeout)
+
+    def wait_inventory_closed(self, timeout):
+        return self.wait_until("inventory_closed", self.matcher.inventory_closed, timeout)
+
+    def wait_sell_button(self, timeout):
+        matched = [0]
+
+        def button_ready(region):
+            matched[0] = matched[0] + 1 if self.matcher.sell_button_visible(region) else 0
+            return matched[0] >= BUTTON_MATCHED_POLLS
+
+        return self.wait_until("sell_button", button_ready, timeout)
+
+    def snapshot(self):
+        # Histogram of the region right now, as the "before" of a later wait
+        region = self.capture()
+        return region_histogram(region) if region is not None else None
+
+    def wait_sell_processed(self, timeout, min_wait=0.0, before=None):
+        # The region has to differ from before (or from the first poll) and
+        # then hold still for a few polls
+        state = {"before": before, "previous": None, "changed": False, "still": 0}
+
+        def processed(region):
+            histogram = region_histogram(region)
+            previous, state["previous"] = state["previous"], histogram
+            if state["before"] is None:
+                state["before"] = histogram
+                return False
+            if not state["changed"]:
+                state["changed"] = (
+                    histogram_correlation(state["before"], histogram) < CHANGED_MAX_CORRELATION
+                )
+                return False
+            if histogram_correlation(previous, histogram) >= SETTLED_MIN_CORRELATION:
+                state["still"] += 1
+            else:
+                state["still"] = 0
+            return state["still"] >= SETTLED_POLLS
+
+        return self.wait_until("sell_processed", processed, timeout, min_wait)
+
+    def learn_sell_button(self, position=None):
+        region = self.capture()
+        return region is not None and self.matcher.learn_sell_button(region, position)
+
+    def _record(self, name, elapsed, timeout):
+        self.step_times[name] = elapsed
+        if elapsed is None:
+            logger.debug("Sell step %s not confirmed, waited the full %.2fs", name, timeout)
+        else:
+            logger.debug("Sell step %s confirmed after %.2fs (timeout %.2fs)", name, elapsed, timeout)
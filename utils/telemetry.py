@@ -0,0 +1,186 @@
+import json
+import os
+import time
+
+import numpy as np
+
+
+TELEMETRY_FORMAT_VERSION = 1
+TELEMETRY_MAGIC = b"DIGTLM01"
+TELEMETRY_PAGE_SIZE = 4096
+# Magic, record count (uint64) and header length (uint32) precede the JSON header
+TELEMETRY_PREFIX_SIZE = 20
+# Minutes of frames the ring holds before the oldest are overwritten; each
+# record is about 94 bytes, so 15 minutes at 240 fps is about 20 MB on disk
+DEFAULT_TELEMETRY_MINUTES = 15
+DEFAULT_TELEMETRY_FPS = 240
+DEFAULT_TELEMETRY_CAPACITY = DEFAULT_TELEMETRY_MINUTES * 60 * DEFAULT_TELEMETRY_FPS
+
+FLAG_RUNNING = 1
+FLAG_TARGET_ENGAGED = 2
+FLAG_SHOULD_CLICK = 4
+FLAG_PREDICTION_USED = 8
+FLAG_CLICK_SENT = 16
+FLAG_CLICK_RESCHEDULED = 32
+
+# timestamp is the frame's wall-clock time in seconds and frame_time the
+# interval since the previous frame; stage columns are seconds
+TELEMETRY_FIELDS = (
+    ("timestamp", "<f8"),
+    ("frame_time", "<f4"),
+    ("capture_time", "<f4"),
+    ("frame_id", "<u4"),
+    ("line_pos", "<i4"),
+    ("raw_zone_x", "<f4"),
+    ("raw_zone_w", "<f4"),
+    ("zone_x", "<f4"),
+    ("zone_w", "<f4"),
+    ("sweet_spot_start", "<f4"),
+    ("sweet_spot_end", "<f4"),
+    ("velocity", "<f4"),
+    ("acceleration", "<f4"),
+    ("click_delay", "<f4"),
+    ("confidence", "<f4"),
+    ("flags", "<u2"),
+)
+
+
+def build_record_dtype(stage_names):
+    fields = list(TELEMETRY_FIELDS)
+    fields.extend((f"stage_{name}", "<f4") for name in stage_names)
+    return np.dtype(fields)
+
+
+def records_offset(header_length):
+    # Records start on the first page boundary after the header
+    size = TELEMETRY_PREFIX_SIZE + header_length
+    return -(-size // TELEMETRY_PAGE_SIZE) * TELEMETRY_PAGE_SIZE
+
+
+def capacity_for_minutes(minutes, fps):
+    return max(int(float(minutes) * 60 * max(fps, 1)), 1)
+
+
+def _value_or_nan(value):
+    return np.nan if value is None else value
+
+
+# Fixed-size records in a memory-mapped ring. The header holds a JSON
+# description of the record layout and the number of records written so far;
+# the count is bumped after each record lands, so a journal left behind by a
+# crash reads back up to its last complete frame.
+class TelemetryJournal:
+    def __init__(self, path, stage_names, capacity=DEFAULT_TELEMETRY_CAPACITY, meta=None):
+        self.path = path
+        self.stage_names = tuple(stage_names)
+        self.capacity = max(int(capacity), 1)
+        self.dtype = build_record_dtype(self.stage_names)
+        self.closed = False
+
+        header = {
+            "version": TELEMETRY_FORMAT_VERSION,
+            "capacity": self.capacity,
+            "fields": [[name, self.dtype.fields[name][0].str] for name in self.dtype.names],
+            "stages": list(self.stage_names),
+            "created_at": time.time(),
+        }
+        header.update(meta or {})
+        header_bytes = json.dumps(header, default=str).encode("utf-8")
+        offset = records_offset(len(header_bytes))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._map = np.memmap(
+            path,
+            dtype=np.uint8,
+            mode="w+",
+            shape=(offset + self.capacity * self.dtype.itemsize,),
+        )
+        self._map[:8] = np.frombuffer(TELEMETRY_MAGIC, dtype=np.uint8)
+        self._map[16:20] = np.frombuffer(
+            np.uint32(len(header_bytes)).tobytes(), dtype=np.uint8
+        )
+        self._map[TELEMETRY_PREFIX_SIZE : TELEMETRY_PREFIX_SIZE + len(header_bytes)] = (
+            np.frombuffer(header_bytes, dtype=np.uint8)
+        )
+        self._count_view = self._map[8:16].view(np.uint64)
+        self.records = self._map[offset:].view(self.dtype)
+        self.count = 0
+
+    def append(self, frame, frame_time, stage_times, zone_x=None, zone_w=None, running=False, target_engaged=False):
+        if self.closed:
+            return
+        flags = 0
+        if running:
+            flags |= FLAG_RUNNING
+        if target_engaged:
+            flags |= FLAG_TARGET_ENGAGED
+        if frame.should_click:
+            flags |= FLAG_SHOULD_CLICK
+        if frame.prediction_used:
+            flags |= FLAG_PREDICTION_USED
+        if frame.click_sent:
+            flags |= FLAG_CLICK_SENT
+        if frame.click_rescheduled:
+            flags |= FLAG_CLICK_RESCHEDULED
+
+        record = (
+            frame.current_time_ms / 1000.0,
+            frame_time,
+            frame.capture_time,
+            frame.frame_id & 0xFFFFFFFF,
+            frame.line_pos,
+            _value_or_nan(frame.raw_zone_x),
+            _value_or_nan(frame.raw_zone_w),
+            _value_or_nan(zone_x),
+            _value_or_nan(zone_w),
+            _value_or_nan(frame.sweet_spot_start),
+            _value_or_nan(frame.sweet_spot_end),
+            frame.velocity,
+            frame.acceleration,
+            frame.click_delay,
+            frame.confidence,
+            flags,
+        ) + tuple(stage_times.get(name, 0.0) for name in self.stage_names)
+
+        self.records[self.count % self.capacity] = record
+        self.count += 1
+        self._count_view[0] = self.count
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._map.flush()
+        self.records = None
+        self._count_view = None
+        self._map = None
+
+
+def load_telemetry(path):
+    with open(path, "rb") as f:
+        prefix = f.read(TELEMETRY_PREFIX_SIZE)
+        if len(prefix) < TELEMETRY_PREFIX_SIZE or prefix[:8] != TELEMETRY_MAGIC:
+            raise ValueError(f"Not a telemetry journal: {path}")
+        count = int(np.frombuffer(prefix[8:16], dtype=np.uint64)[0])
+        header_length = int(np.frombuffer(prefix[16:20], dtype=np.uint32)[0])
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    version = header.get("version")
+    if version != TELEMETRY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported telemetry format version: {version}")
+
+    dtype = np.dtype([(name, fmt) for name, fmt in header["fields"]])
+    capacity = int(header["capacity"])
+    records = np.memmap(
+        path, dtype=dtype, mode="r", offset=records_offset(header_length), shape=(capacity,)
+    )
+    if count <= capacity:
+        ordered = np.array(records[:count])
+    else:
+        # Oldest record sits just after the write position once the ring wraps
+        start = count % capacity
+        ordered = np.concatenate((records[start:], records[:start]))
+    header["record_count"] = count
+    header["dropped_records"] = max(count - capacity, 0)
+    return header, ordered
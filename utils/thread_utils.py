@@ -101,3 +101,53 @@ def cleanup_thread_pool(thread_pool, max_threads=10):
         active_threads = [t for t in thread_pool if t.is_alive()]
     
     return active_threads
+
+
+# A flag one thread updates and others wait on. update() is a plain compare
+# when the value has not changed, so it can be called every frame; waiters are
+# woken on changes instead of polling. cancel is re-checked on interrupt() and
+# at least every cancel_check_interval seconds.
+class StateSignal:
+    def __init__(self, value=False, cancel_check_interval=0.25):
+        self._condition = threading.Condition()
+        self._value = value
+        self.cancel_check_interval = cancel_check_interval
+        self.changes = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    def update(self, value):
+        if value == self._value:
+            return False
+        with self._condition:
+            if value == self._value:
+                return False
+            self._value = value
+            self.changes += 1
+            self._condition.notify_all()
+        return True
+
+    def interrupt(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def wait_for(self, value, timeout=None, cancel=None):
+        # True once the signal holds value; False on timeout or cancel
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._value != value:
+                if cancel is not None and cancel():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                if cancel is not None:
+                    remaining = (
+                        self.cancel_check_interval
+                        if remaining is None
+                        else min(remaining, self.cancel_check_interval)
+                    )
+                self._condition.wait(remaining)
+            return True